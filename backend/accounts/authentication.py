@@ -10,6 +10,11 @@ from django.middleware.csrf import CsrfViewMiddleware
 from rest_framework import exceptions
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from devnote.query_budget import unbudgeted
+
+from .user_cache import user_cache
 
 logger = logging.getLogger("accounts")
 
@@ -47,7 +52,7 @@ class CookieJWTAuthentication(JWTAuthentication):
 
         if raw_token:
             token_from_cookie = True
-            logger.debug(f"Found token in cookie: {cookie_name}")
+            logger.debug("Found token in cookie: %s", cookie_name)
         else:
             # Fallback to Authorization header
             logger.debug("No token in cookie, checking Authorization header")
@@ -63,17 +68,18 @@ class CookieJWTAuthentication(JWTAuthentication):
                 logger.debug("No token in Authorization header")
                 return None
 
-        # Validate the token
+        # Validate the token, out of the query budget of the view
         try:
-            validated_token = self.get_validated_token(raw_token)
-            user = self.get_user(validated_token)
+            with unbudgeted(request):
+                validated_token = self.get_validated_token(raw_token)
+                user = self.get_user(validated_token)
 
         except InvalidToken as e:
-            logger.warning(f"Invalid token (will be ignored): {str(e)}")
+            logger.warning("Invalid token (will be ignored): %s", e)
             return None
 
         except Exception as e:
-            logger.exception(f"Authentication error: {str(e)}")
+            logger.exception("Authentication error: %s", e)
             return None
 
         if token_from_cookie and request.method not in (
@@ -84,9 +90,28 @@ class CookieJWTAuthentication(JWTAuthentication):
         ):
             self.enforce_csrf(request)
 
-        logger.debug(f"Successfully authenticated user: {user.email}")
+        logger.debug("Successfully authenticated user: %s", user)
         return (user, validated_token)
 
+    def get_user(self, validated_token):
+        """
+        The user a token was issued to. Under JWT_USER_CACHE it is read from the
+        in-process cache of accounts.user_cache when fresh, skipping the user
+        query of every authenticated request.
+        """
+        if not settings.JWT_USER_CACHE:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        issued_at = validated_token.get("iat")
+        user = user_cache.get(user_id, issued_at)
+
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.put(user_id, issued_at, user)
+
+        return user
+
     def enforce_csrf(self, request):
         """
         Enforce Django CSRF validation for unsafe cookie-authenticated requests.
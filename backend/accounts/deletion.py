@@ -0,0 +1,166 @@
+"""
+Deletion of accounts without the collector of Model.delete(), which would load
+every project, folder, document, snippet, TODO and posting of the user before
+deleting any of them, holding the write lock of the database all along.
+
+delete_account() purges the workspace of the user through workspace.purge, in
+chunks of ids deleted in a transaction each, children first; the user row goes
+last, with little left to cascade to. Under ACCOUNT_DELETION_ASYNC the request
+only deactivates the user and records an AccountDeletion, which the deleter
+thread of a server process, or the delete_accounts command, runs afterwards.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+from functools import cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from workspace.purge import purge_user_data
+
+from .models import AccountDeletion
+
+logger = logging.getLogger("accounts")
+
+
+def delete_account(user_id, chunk_size=None):
+    """
+    Delete a user with everything they own. Running it again after a failure
+    picks up where it stopped: the chunks deleted stay deleted.
+
+    Returns:
+        int: rows deleted, the user row included
+    """
+    counts = purge_user_data(
+        user_id, chunk_size or settings.ACCOUNT_DELETION_CHUNK_SIZE
+    )
+    user = get_user_model().objects.filter(pk=user_id).first()
+
+    if user is None:
+        return sum(counts.values())
+
+    # What is left to cascade to, tokens and admin log entries, is small
+    return sum(counts.values()) + user.delete()[0]
+
+
+def request_deletion(user):
+    """
+    Deactivate <user> at once, so no token of theirs authenticates any more,
+    and leave the deletion itself to the deleter thread.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        deletion = AccountDeletion.objects.create(user_id=user.pk)
+
+    deleter().wake()
+
+    return deletion
+
+
+def run_pending_deletions():
+    """
+    Run the pending deletions, oldest first, and those left running past
+    ACCOUNT_DELETION_STALE_AFTER by a deleter stopped mid-way. Each one is
+    claimed by a conditional update, so the deleters of several processes
+    never run the same one. Returns how many ran.
+    """
+    ran = 0
+
+    while True:
+        stale = timezone.now() - timedelta(
+            seconds=settings.ACCOUNT_DELETION_STALE_AFTER
+        )
+        deletion = (
+            AccountDeletion.objects.filter(
+                Q(status=AccountDeletion.PENDING)
+                | Q(status=AccountDeletion.RUNNING, claimed_at__lt=stale)
+                | Q(status=AccountDeletion.RUNNING, claimed_at__isnull=True)
+            )
+            .order_by("created_at")
+            .first()
+        )
+
+        if deletion is None:
+            return ran
+
+        if deletion.status == AccountDeletion.RUNNING:
+            logger.warning("Running again the deletion of account %s", deletion.user_id)
+
+        claimed = AccountDeletion.objects.filter(
+            id=deletion.id, status=deletion.status, claimed_at=deletion.claimed_at
+        ).update(status=AccountDeletion.RUNNING, claimed_at=timezone.now())
+
+        if not claimed:
+            continue
+
+        started = time.perf_counter()
+
+        try:
+            deleted = delete_account(deletion.user_id)
+        except Exception:
+            logger.exception("Deleting account %s failed", deletion.user_id)
+            outcome = AccountDeletion.FAILED
+        else:
+            logger.info(
+                "Deleted account %s, %d rows in %.2f s",
+                deletion.user_id,
+                deleted,
+                time.perf_counter() - started,
+            )
+            outcome = AccountDeletion.DONE
+
+        AccountDeletion.objects.filter(id=deletion.id).update(
+            status=outcome, finished_at=timezone.now()
+        )
+        ran += 1
+
+
+class AccountDeleter(threading.Thread):
+    """
+    Runs the pending account deletions in a daemon thread, every <interval>
+    seconds or as soon as woken by a new one.
+    """
+
+    def __init__(self, interval):
+        super().__init__(name="account-deleter", daemon=True)
+        self.interval = interval
+        self.woken = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.woken.wait(self.interval)
+            self.woken.clear()
+
+            if self.stopped.is_set():
+                return
+
+            try:
+                run_pending_deletions()
+            except Exception:
+                logger.exception("Running the pending account deletions failed")
+            finally:
+                connections.close_all()
+
+    def wake(self):
+        self.woken.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.woken.set()
+
+
+@cache
+def deleter():
+    """The deleter thread of this process, started on first use."""
+    thread = AccountDeleter(settings.ACCOUNT_DELETION_INTERVAL)
+    thread.start()
+
+    return thread
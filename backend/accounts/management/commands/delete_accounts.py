@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.deletion import run_pending_deletions
+from accounts.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = "Run the account deletions left pending, or failed with --retry."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retry",
+            action="store_true",
+            help="Run the failed deletions again as well.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry"]:
+            AccountDeletion.objects.filter(status=AccountDeletion.FAILED).update(
+                status=AccountDeletion.PENDING, finished_at=None
+            )
+
+        started = time.perf_counter()
+        ran = run_pending_deletions()
+        failed = AccountDeletion.objects.filter(status=AccountDeletion.FAILED).count()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ran {ran} account deletions in "
+                f"{time.perf_counter() - started:.2f} s, {failed} failed so far"
+            )
+        )
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.17 on 2026-10-17 01:35
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountDeletion",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Random identifier UUIDv4, handed to the client",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "user_id",
+                    models.UUIDField(
+                        help_text="Id of the user deleted, kept once the user row is gone"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        help_text="Where the deletion stands",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Date the deletion was requested"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Date the deletion finished or failed",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Account deletion",
+                "verbose_name_plural": "Account deletions",
+                "db_table": "devnote_account_deletions",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="devnote_acc_status_799b86_idx",
+                    )
+                ],
+            },
+        ),
+    ]
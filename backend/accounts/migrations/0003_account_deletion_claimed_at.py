@@ -0,0 +1,22 @@
+# Generated by Django 5.2.17 on 2026-10-17 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_account_deletion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="accountdeletion",
+            name="claimed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Date a deleter last started the deletion",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from uuid import uuid4
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from uuid6 import uuid7
@@ -69,3 +71,64 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.email
+
+
+class AccountDeletion(models.Model):
+    """
+    An account deletion run by the background worker of accounts.deletion.
+
+    It outlives the user, so a client signed out by the deletion can still
+    follow it: its id is the only credential the status endpoint asks for,
+    which is why it is random rather than a time-ordered UUIDv7.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid4,
+        editable=False,
+        help_text="Random identifier UUIDv4, handed to the client",
+    )
+
+    user_id = models.UUIDField(
+        help_text="Id of the user deleted, kept once the user row is gone"
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        help_text="Where the deletion stands",
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Date the deletion was requested"
+    )
+
+    claimed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Date a deleter last started the deletion"
+    )
+
+    finished_at = models.DateTimeField(
+        null=True, blank=True, help_text="Date the deletion finished or failed"
+    )
+
+    class Meta:
+        db_table = "devnote_account_deletions"
+        verbose_name = "Account deletion"
+        verbose_name_plural = "Account deletions"
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Deletion of {self.user_id} ({self.status})"
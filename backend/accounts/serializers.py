@@ -4,6 +4,8 @@ from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from .models import AccountDeletion
+
 User = get_user_model()
 
 
@@ -258,3 +260,17 @@ class DeleteAccountSerializer(serializers.Serializer):
         if not self.context["request"].user.check_password(value):
             raise serializers.ValidationError("Current password is incorrect.")
         return value
+
+
+class AccountDeletionSerializer(serializers.ModelSerializer):
+    """Serializer reporting where an account deletion stands.
+
+    Used by:
+    - POST /api/auth/account/delete/ under ACCOUNT_DELETION_ASYNC
+    - GET /api/auth/account/delete/{id}/
+    """
+
+    class Meta:
+        model = AccountDeletion
+        fields = ["id", "status", "created_at", "finished_at"]
+        read_only_fields = fields
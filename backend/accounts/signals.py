@@ -0,0 +1,19 @@
+"""Model hooks keeping the cache of authenticated users in step."""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+
+from .user_cache import user_cache
+
+
+def forget_user(sender, instance, **kwargs):
+    """A saved or deleted user must be read again on its next request."""
+    user_cache.invalidate(instance.pk)
+
+
+post_save.connect(
+    forget_user, sender=get_user_model(), dispatch_uid="user_cache_forget_saved"
+)
+post_delete.connect(
+    forget_user, sender=get_user_model(), dispatch_uid="user_cache_forget_deleted"
+)
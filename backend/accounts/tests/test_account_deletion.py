@@ -0,0 +1,236 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from accounts.deletion import AccountDeleter, delete_account, run_pending_deletions
+from accounts.models import AccountDeletion
+from workspace.models import (
+    TODO,
+    Document,
+    Folder,
+    Project,
+    SearchPosting,
+    Snippet,
+    TodoList,
+)
+
+User = get_user_model()
+
+
+def grow_workspace(user, projects=1, width=2):
+    """Projects of <user>, each with nested folders, items, lists and TODOs."""
+    for index in range(projects):
+        project = Project.objects.create(title=f"Deploy {index}", user=user)
+        todo_list = TodoList.objects.create(name="Sprint", project=project)
+        parent = None
+
+        for level in range(width):
+            parent = Folder.objects.create(
+                name=f"Level {level}", project=project, parent=parent
+            )
+            snippets = Folder.objects.create(
+                name=f"Helpers {level}", project=project, resource_type="snippets"
+            )
+
+            for item in range(width):
+                Document.objects.create(
+                    title=f"Deploy notes {item}", project=project, folder=parent
+                )
+                Snippet.objects.create(
+                    title=f"Deploy script {item}",
+                    content="pass",
+                    project=project,
+                    folder=snippets,
+                )
+                TODO.objects.create(
+                    title=f"Deploy {item}", project=project, list=todo_list
+                )
+
+
+class DeleteAccountTest(TestCase):
+    """Tests for the chunked deletion of an account"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="doomed@test.com", password="TestPass123!"
+        )
+        self.other = User.objects.create_user(
+            email="spared@test.com", password="TestPass123!"
+        )
+        grow_workspace(self.user, projects=2, width=3)
+        grow_workspace(self.other)
+
+    def test_everything_of_the_user_goes(self):
+        OutstandingToken.objects.create(
+            user=self.user,
+            jti="doomed",
+            token="x",
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+        spared = {
+            model: model.objects.filter(project__user=self.other).count()
+            for model in (Folder, Document, Snippet, TodoList, TODO)
+        }
+
+        delete_account(self.user.pk, chunk_size=2)
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(
+            list(Project.objects.values_list("user", flat=True)), [self.other.pk]
+        )
+        self.assertFalse(SearchPosting.objects.filter(user=self.user.pk).exists())
+        self.assertTrue(SearchPosting.objects.filter(user=self.other).exists())
+        self.assertIsNone(OutstandingToken.objects.get(jti="doomed").user_id)
+
+        for model, count in spared.items():
+            self.assertEqual(model.objects.count(), count)
+
+    def test_deleting_again_is_harmless(self):
+        delete_account(self.user.pk)
+
+        self.assertEqual(delete_account(self.user.pk), 0)
+
+    def test_queries_grow_with_chunks_not_rows(self):
+        """Test : a bigger workspace within one chunk runs the same queries"""
+        counts = []
+
+        for width in (2, 4):
+            user = User.objects.create_user(
+                email=f"width{width}@test.com", password="TestPass123!"
+            )
+            grow_workspace(user, width=width)
+
+            with CaptureQueriesContext(connection) as captured:
+                delete_account(user.pk)
+
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+@override_settings(ACCOUNT_DELETION_ASYNC=True)
+class AsyncDeleteAccountTest(APITestCase):
+    """Tests for the account deletions run after the request"""
+
+    def setUp(self):
+        self.password = "TestPass123!"
+        self.user = User.objects.create_user(
+            email="async@test.com", password=self.password
+        )
+        grow_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+
+        patcher = mock.patch("accounts.deletion.deleter")
+        self.deleter = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request_deletion(self):
+        return self.client.post(
+            "/api/auth/account/delete/",
+            {"current_password": self.password},
+            format="json",
+        )
+
+    def test_request_only_deactivates_the_user(self):
+        response = self.request_deletion()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], AccountDeletion.PENDING)
+        self.assertEqual(response.cookies["access_token"].value, "")
+        self.deleter.return_value.wake.assert_called_once()
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(Project.objects.filter(user=self.user).exists())
+
+    def test_status_follows_the_deletion(self):
+        deletion_id = self.request_deletion().data["id"]
+        self.client.force_authenticate(user=None)
+        url = f"/api/auth/account/delete/{deletion_id}/"
+
+        self.assertEqual(self.client.get(url).data["status"], AccountDeletion.PENDING)
+
+        self.assertEqual(run_pending_deletions(), 1)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], AccountDeletion.DONE)
+        self.assertIsNotNone(response.data["finished_at"])
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Project.objects.exists())
+
+    def test_unknown_deletion_not_found(self):
+        response = self.client.get(f"/api/auth/account/delete/{uuid4()}/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_failed_deletions_are_kept_for_a_retry(self):
+        self.request_deletion()
+
+        with mock.patch(
+            "accounts.deletion.delete_account", side_effect=RuntimeError("locked")
+        ):
+            run_pending_deletions()
+
+        self.assertEqual(AccountDeletion.objects.get().status, AccountDeletion.FAILED)
+
+        output = StringIO()
+        call_command("delete_accounts", "--retry", stdout=output)
+
+        self.assertIn("Ran 1 account deletions", output.getvalue())
+        self.assertEqual(AccountDeletion.objects.get().status, AccountDeletion.DONE)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_interrupted_deletion_is_run_again(self):
+        """Test : a deletion left running by a restart is claimed once stale"""
+        self.request_deletion()
+        deletion = AccountDeletion.objects.get()
+        AccountDeletion.objects.filter(pk=deletion.pk).update(
+            status=AccountDeletion.RUNNING, claimed_at=timezone.now()
+        )
+
+        # Its deleter may still be at work
+        self.assertEqual(run_pending_deletions(), 0)
+
+        AccountDeletion.objects.filter(pk=deletion.pk).update(
+            claimed_at=timezone.now() - timedelta(hours=2)
+        )
+
+        self.assertEqual(run_pending_deletions(), 1)
+        self.assertEqual(AccountDeletion.objects.get().status, AccountDeletion.DONE)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+
+class AccountDeleterTest(SimpleTestCase):
+    """Tests for the deleter thread"""
+
+    def test_deleter_runs_when_woken(self):
+        ran = threading.Event()
+
+        def run():
+            ran.set()
+            return 0
+
+        with mock.patch("accounts.deletion.run_pending_deletions", side_effect=run):
+            deleter = AccountDeleter(interval=60)
+            deleter.start()
+            deleter.wake()
+
+            self.assertTrue(ran.wait(timeout=5))
+
+            deleter.stop()
+            deleter.join(timeout=5)
+
+        self.assertFalse(deleter.is_alive())
@@ -1,9 +1,10 @@
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from django.test import override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from devnote import ratelimit
+
 User = get_user_model()
 
 
@@ -13,7 +14,7 @@ class AuthThrottlingTest(APITestCase):
 
     def setUp(self):
         """Set up test data and start from a clean rate-limit counter"""
-        cache.clear()
+        ratelimit.reset()
         self.login_url = "/api/auth/login/"
         self.credentials = {
             "email": "throttle@example.com",
@@ -28,7 +29,7 @@ class AuthThrottlingTest(APITestCase):
 
     def tearDown(self):
         """Leave the shared rate-limit counter clean for the other tests"""
-        cache.clear()
+        ratelimit.reset()
 
     def test_login_blocks_beyond_rate_limit(self):
         """Test : login allows 5 requests per minute then blocks with 403"""
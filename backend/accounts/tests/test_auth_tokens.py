@@ -0,0 +1,249 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.tokens import (
+    TokenPruner,
+    blacklist_outstanding_tokens,
+    prune_expired_tokens,
+    rotate_refresh_token,
+)
+from accounts.workers import start_workers
+
+User = get_user_model()
+
+
+class BlacklistOutstandingTokensTest(TestCase):
+    """Tests for the set-based blacklisting of the refresh tokens of a user"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="blacklist@test.com", password="TestPass123!"
+        )
+        self.other = User.objects.create_user(
+            email="other@test.com", password="TestPass123!"
+        )
+
+    def issue(self, user, count):
+        expires_at = timezone.now() + timedelta(days=7)
+        start = OutstandingToken.objects.count()
+
+        return OutstandingToken.objects.bulk_create(
+            OutstandingToken(
+                user=user,
+                jti=f"{user.pk}-{start + index}",
+                token="x",
+                expires_at=expires_at,
+            )
+            for index in range(count)
+        )
+
+    def test_every_token_of_the_user_is_blacklisted(self):
+        self.issue(self.user, 3)
+        self.issue(self.other, 2)
+
+        self.assertEqual(blacklist_outstanding_tokens(self.user), 3)
+
+        self.assertEqual(
+            BlacklistedToken.objects.filter(token__user=self.user).count(), 3
+        )
+        self.assertFalse(BlacklistedToken.objects.filter(token__user=self.other))
+
+    def test_blacklisted_tokens_are_left_alone(self):
+        first, _ = self.issue(self.user, 2)
+        blacklisted = BlacklistedToken.objects.create(token=first)
+
+        self.assertEqual(blacklist_outstanding_tokens(self.user), 1)
+        self.assertEqual(
+            BlacklistedToken.objects.get(token=first).blacklisted_at,
+            blacklisted.blacklisted_at,
+        )
+        self.assertEqual(blacklist_outstanding_tokens(self.user), 0)
+
+    def test_blacklisting_scales_flat_with_token_count(self):
+        """Test : blacklisting 1200 tokens runs as many queries as 4 do"""
+        queries = {}
+
+        # Past the 999 parameters a statement of SQLite may hold
+        for count in (4, 40, 1200):
+            BlacklistedToken.objects.all().delete()
+            OutstandingToken.objects.all().delete()
+            self.issue(self.user, count)
+
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(blacklist_outstanding_tokens(self.user), count)
+
+            queries[count] = len(captured)
+
+        self.assertEqual(len(set(queries.values())), 1, queries)
+
+
+class RotateRefreshTokenTest(TestCase):
+    """Tests for the rotation of refresh tokens"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="rotate@test.com", password="TestPass123!"
+        )
+
+    def test_rotation_issues_a_recorded_token(self):
+        old = RefreshToken.for_user(self.user)
+
+        new, user = rotate_refresh_token(str(old))
+
+        self.assertEqual(user, self.user)
+        self.assertTrue(OutstandingToken.objects.filter(jti=new["jti"]).exists())
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=old["jti"]))
+
+    def test_rotated_tokens_are_refused(self):
+        old = str(RefreshToken.for_user(self.user))
+        rotate_refresh_token(old)
+
+        with self.assertRaises(TokenError):
+            rotate_refresh_token(old)
+
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+
+    def test_unrecorded_tokens_are_recorded_then_blacklisted(self):
+        old = RefreshToken()
+        old["user_id"] = str(self.user.pk)
+
+        rotate_refresh_token(str(old))
+
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=old["jti"]))
+
+
+class ConcurrentRotationTest(TransactionTestCase):
+    """Tests for refreshes racing each other with the same token"""
+
+    THREADS = 16
+
+    def test_a_single_rotation_wins(self):
+        user = User.objects.create_user(email="race@test.com", password="TestPass123!")
+        old = str(RefreshToken.for_user(user))
+        start = threading.Barrier(self.THREADS)
+        outcomes = []
+
+        def rotate():
+            start.wait()
+
+            try:
+                while True:
+                    try:
+                        rotate_refresh_token(old)
+                        outcomes.append("rotated")
+                        return
+                    except TokenError:
+                        outcomes.append("refused")
+                        return
+                    except OperationalError:
+                        # The database was locked by another rotation
+                        continue
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=rotate) for _ in range(self.THREADS)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join(timeout=30)
+
+        self.assertEqual(outcomes.count("rotated"), 1)
+        self.assertEqual(outcomes.count("refused"), self.THREADS - 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+
+
+class PruneExpiredTokensTest(TestCase):
+    """Tests for the deletion of the expired refresh tokens"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="prune@test.com", password="TestPass123!"
+        )
+
+    def issue(self, count, expires_in):
+        expires_at = timezone.now() + expires_in
+        start = OutstandingToken.objects.count()
+
+        return OutstandingToken.objects.bulk_create(
+            OutstandingToken(
+                user=self.user,
+                jti=f"prune-{start + index}",
+                token="x",
+                expires_at=expires_at,
+            )
+            for index in range(count)
+        )
+
+    def test_expired_tokens_go_in_batches(self):
+        expired = self.issue(5, timedelta(days=-1))
+        live = self.issue(2, timedelta(days=1))
+        BlacklistedToken.objects.create(token=expired[0])
+        BlacklistedToken.objects.create(token=live[0])
+
+        self.assertEqual(prune_expired_tokens(batch_size=2), (5, 1))
+
+        self.assertEqual(
+            set(OutstandingToken.objects.values_list("id", flat=True)),
+            {token.id for token in live},
+        )
+        self.assertEqual(BlacklistedToken.objects.get().token_id, live[0].id)
+
+    def test_command_reports_throughput(self):
+        self.issue(3, timedelta(days=-1))
+        output = StringIO()
+
+        call_command("prune_tokens", "--batch-size", "2", stdout=output)
+
+        self.assertIn("Pruned 3 expired tokens (0 blacklisted)", output.getvalue())
+        self.assertIn("tokens/s", output.getvalue())
+        self.assertFalse(OutstandingToken.objects.exists())
+
+
+class TokenPrunerTest(SimpleTestCase):
+    """Tests for the periodic pruning thread"""
+
+    def test_pruner_runs_until_stopped(self):
+        pruned = threading.Event()
+
+        def prune():
+            pruned.set()
+            return 0, 0
+
+        with mock.patch("accounts.tokens.prune_expired_tokens", side_effect=prune):
+            pruner = TokenPruner(interval=0.01)
+            pruner.start()
+
+            self.assertTrue(pruned.wait(timeout=5))
+
+            pruner.stop()
+            pruner.join(timeout=5)
+
+        self.assertFalse(pruner.is_alive())
+
+    @override_settings(TOKEN_PRUNE_INTERVAL=60)
+    def test_pruner_started_by_the_server_only(self):
+        with mock.patch.object(TokenPruner, "start") as start:
+            apps.get_app_config("accounts").ready()
+            start.assert_not_called()
+
+            start_workers.__wrapped__()
+            start.assert_called_once()
@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.user_cache import UserCache, user_cache
+
+User = get_user_model()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class UserCacheTest(SimpleTestCase):
+    """Tests for the bounded, expiring cache of users"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = UserCache(maxsize=2, ttl=60, clock=self.clock)
+
+    def test_cached_users_are_copies(self):
+        user = User(email="copy@test.com")
+        self.cache.put(1, 100, user)
+
+        cached = self.cache.get(1, 100)
+        cached.email = "changed@test.com"
+
+        self.assertEqual(self.cache.get(1, 100).email, "copy@test.com")
+
+    def test_entries_are_keyed_by_issue_time(self):
+        self.cache.put(1, 100, User(email="first@test.com"))
+
+        self.assertIsNone(self.cache.get(1, 200))
+
+    def test_entries_expire(self):
+        self.cache.put(1, 100, User(email="expire@test.com"))
+
+        self.clock.now = 60
+
+        self.assertIsNone(self.cache.get(1, 100))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.put(1, 100, User(email="one@test.com"))
+        self.cache.put(2, 100, User(email="two@test.com"))
+        self.cache.get(1, 100)
+
+        self.cache.put(3, 100, User(email="three@test.com"))
+
+        self.assertIsNotNone(self.cache.get(1, 100))
+        self.assertIsNone(self.cache.get(2, 100))
+        self.assertEqual(len(self.cache), 2)
+
+    def test_invalidate_drops_every_token_of_a_user(self):
+        self.cache.put(1, 100, User(email="one@test.com"))
+        self.cache.put(1, 200, User(email="one@test.com"))
+        self.cache.put(2, 100, User(email="two@test.com"))
+
+        self.cache.invalidate(1)
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertIsNotNone(self.cache.get(2, 100))
+
+
+@override_settings(JWT_USER_CACHE=True, RATELIMIT_ENABLE=False)
+class CachedAuthenticationTest(APITestCase):
+    """Tests for the resolution of token users through the cache"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+
+        self.password = "SecureP@ss123"
+        self.user = User.objects.create_user(
+            email="cached@test.com", password=self.password
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def user_queries(self, url="/api/auth/me/"):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [query for query in captured if '"devnote_users"' in query["sql"]]
+
+    def test_repeated_requests_skip_the_user_query(self):
+        self.assertTrue(self.user_queries())
+        self.assertEqual(self.user_queries(), [])
+
+    @override_settings(JWT_USER_CACHE=False)
+    def test_disabled_cache_reads_the_user_every_time(self):
+        self.user_queries()
+
+        self.assertTrue(self.user_queries())
+
+    def test_saving_the_user_invalidates_it(self):
+        self.user_queries()
+
+        self.user.first_name = "Renamed"
+        self.user.save()
+
+        self.assertTrue(self.user_queries())
+        self.assertEqual(self.client.get("/api/auth/me/").data["first_name"], "Renamed")
+
+    def test_changing_the_password_invalidates_the_user(self):
+        self.user_queries()
+
+        response = self.client.post(
+            "/api/auth/password/",
+            {
+                "current_password": self.password,
+                "new_password": "BrandN3w@Pass",
+                "new_password2": "BrandN3w@Pass",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(user_cache), 0)
+
+    def test_deleted_account_tokens_stop_working(self):
+        self.user_queries()
+
+        response = self.client.post(
+            "/api/auth/account/delete/", {"current_password": self.password}
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get("/api/auth/me/")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,7 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from workspace.models import TODO, Document, Folder, Project, Snippet, TodoList
@@ -310,6 +313,69 @@ class ChangePasswordViewTest(APITestCase):
         self.assertEqual(accepted.status_code, status.HTTP_200_OK)
 
 
+class RefreshViewTest(APITestCase):
+    """Tests for the POST /api/auth/refresh/ endpoint"""
+
+    def setUp(self):
+        """Set up a user holding a refresh token"""
+        self.url = "/api/auth/refresh/"
+        self.user = User.objects.create_user(
+            email="john@example.com", password="SecureP@ss123"
+        )
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def refresh_with(self, token):
+        self.client.cookies["refresh_token"] = token
+        return self.client.post(self.url)
+
+    def test_refresh_rotates_the_token(self):
+        """Test: a new pair is set and the old refresh token is blacklisted"""
+        response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.cookies["refresh_token"].value, self.refresh)
+        self.assertTrue(response.cookies["access_token"].value)
+        self.assertEqual(
+            list(BlacklistedToken.objects.values_list("token__jti", flat=True)),
+            [RefreshToken(self.refresh, verify=False)["jti"]],
+        )
+
+    def test_refresh_token_works_once(self):
+        """Test: replaying a rotated refresh token is refused"""
+        self.refresh_with(self.refresh)
+
+        response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_runs_in_one_transaction(self):
+        """Test: the rotation takes three statements in a single transaction"""
+        self.client.cookies["refresh_token"] = self.refresh
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [query["sql"].split()[0].upper() for query in captured]
+        self.assertEqual(
+            statements, ["SAVEPOINT", "INSERT", "SELECT", "INSERT", "RELEASE"]
+        )
+
+    def test_refresh_for_a_deleted_user(self):
+        """Test: the token of a deleted account is refused"""
+        self.user.delete()
+
+        response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_without_cookie(self):
+        """Test: no refresh cookie means no new pair"""
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
 @override_settings(RATELIMIT_ENABLE=False)
 class DeleteAccountViewTest(APITestCase):
     """Tests for the DELETE /api/auth/account/ endpoint"""
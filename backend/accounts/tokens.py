@@ -0,0 +1,218 @@
+"""
+Helper functions for the refresh tokens kept by the simplejwt blacklist app
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, connections, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+logger = logging.getLogger("accounts")
+
+
+def blacklist_outstanding_tokens(user):
+    """
+    Blacklist every refresh token issued to a user that is not blacklisted yet.
+
+    The missing rows are inserted by a single INSERT ... SELECT, whatever the
+    number of tokens, where get_or_create would cost two queries per token and
+    a bulk insert would be cut in batches by the parameter limit of SQLite.
+    Being one write, it cannot interleave with the blacklisting of a
+    concurrent request.
+
+    Args:
+        user: the user whose refresh tokens must stop working
+
+    Returns:
+        int: the number of tokens blacklisted by this call
+    """
+
+    quote = connection.ops.quote_name
+    blacklisted = BlacklistedToken._meta
+    outstanding = OutstandingToken._meta
+    token_column = quote(blacklisted.get_field("token").column)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(blacklisted.db_table)} "
+            f"({token_column}, "
+            f"{quote(blacklisted.get_field('blacklisted_at').column)}) "
+            f"SELECT {quote(outstanding.pk.column)}, %s "
+            f"FROM {quote(outstanding.db_table)} "
+            f"WHERE {quote(outstanding.get_field('user').column)} = %s "
+            f"AND {quote(outstanding.pk.column)} NOT IN "
+            f"(SELECT {token_column} FROM {quote(blacklisted.db_table)})",
+            [
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+                outstanding.get_field("user").get_db_prep_value(user.pk, connection),
+            ],
+        )
+
+        return cursor.rowcount
+
+
+class RotatingRefreshToken(RefreshToken):
+    """
+    A refresh token about to be rotated. Its signature, expiry and type are
+    verified as usual, but the blacklist is left to rotate_refresh_token, which
+    finds out whether the token was used already by blacklisting it.
+    """
+
+    def check_blacklist(self):
+        pass
+
+
+def claim_outstanding_token(jti):
+    """
+    Blacklist the outstanding token <jti> with a single INSERT ... SELECT.
+
+    Being a write, the statement takes the write lock of the database as it
+    opens the transaction: two rotations of one token queue up on it, where
+    reading first would let both pass the blacklist check.
+
+    Returns:
+        bool: False when no outstanding row was found for the token
+
+    Raises:
+        IntegrityError: if the token is blacklisted already
+    """
+
+    quote = connection.ops.quote_name
+    blacklisted = BlacklistedToken._meta
+    outstanding = OutstandingToken._meta
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(blacklisted.db_table)} "
+            f"({quote(blacklisted.get_field('token').column)}, "
+            f"{quote(blacklisted.get_field('blacklisted_at').column)}) "
+            f"SELECT {quote(outstanding.pk.column)}, %s "
+            f"FROM {quote(outstanding.db_table)} "
+            f"WHERE {quote(outstanding.get_field('jti').column)} = %s",
+            [connection.ops.adapt_datetimefield_value(timezone.now()), jti],
+        )
+
+        return cursor.rowcount == 1
+
+
+def rotate_refresh_token(raw_token):
+    """
+    Blacklist a refresh token and issue the one replacing it, in one
+    transaction of three statements: the blacklisting, the read of the user
+    and the outstanding row of the new token.
+
+    Of concurrent rotations of one token, a single one succeeds.
+
+    Args:
+        raw_token (str): the refresh token sent by the client
+
+    Returns:
+        tuple: (the new RefreshToken, its user)
+
+    Raises:
+        TokenError: if the token is invalid, expired or rotated already
+        DoesNotExist: if its user is gone
+    """
+
+    old_token = RotatingRefreshToken(raw_token)
+    User = get_user_model()
+
+    try:
+        with transaction.atomic():
+            if not claim_outstanding_token(old_token[api_settings.JTI_CLAIM]):
+                # Issued without being recorded, blacklist() records it first
+                old_token.blacklist()
+
+            user = User.objects.get(
+                **{api_settings.USER_ID_FIELD: old_token[api_settings.USER_ID_CLAIM]}
+            )
+
+            return RefreshToken.for_user(user), user
+
+    except IntegrityError:
+        raise TokenError(_("Token is blacklisted"))
+
+
+def prune_expired_tokens(batch_size=None):
+    """
+    Delete the refresh tokens past their expiry, with their blacklist rows.
+
+    Every refresh rotation leaves an outstanding and a blacklisted row behind,
+    dead once the token expires. They go <batch_size> at a time, each batch in
+    a transaction of its own, so the tables are never locked for long.
+
+    Returns:
+        tuple: (outstanding rows deleted, blacklisted rows deleted)
+    """
+
+    batch_size = batch_size or settings.TOKEN_PRUNE_BATCH_SIZE
+    now = aware_utcnow()
+    outstanding = blacklisted = 0
+
+    while True:
+        with transaction.atomic():
+            expired = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by()
+                .values_list("id", flat=True)[:batch_size]
+            )
+
+            if not expired:
+                return outstanding, blacklisted
+
+            blacklisted += BlacklistedToken.objects.filter(
+                token_id__in=expired
+            ).delete()[0]
+
+            # Their blacklist rows gone, the tokens need no cascade: a plain
+            # delete would still load them, token text and all, to look for one
+            outstanding += OutstandingToken.objects.filter(id__in=expired)._raw_delete(
+                OutstandingToken.objects.db
+            )
+
+
+class TokenPruner(threading.Thread):
+    """
+    Runs prune_expired_tokens every <interval> seconds in a daemon thread,
+    started by the accounts app under TOKEN_PRUNE_INTERVAL.
+    """
+
+    def __init__(self, interval):
+        super().__init__(name="token-pruner", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            started = time.perf_counter()
+
+            try:
+                outstanding, blacklisted = prune_expired_tokens()
+            except Exception:
+                logger.exception("Pruning expired tokens failed")
+                continue
+            finally:
+                connections.close_all()
+
+            logger.info(
+                "Pruned %d expired tokens (%d blacklisted) in %.2f s",
+                outstanding,
+                blacklisted,
+                time.perf_counter() - started,
+            )
+
+    def stop(self):
+        self.stopped.set()
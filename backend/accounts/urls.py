@@ -1,6 +1,7 @@
 from django.urls import path
 
 from .views import (
+    AccountDeletionStatusView,
     ChangePasswordView,
     CSRFTokenView,
     DeleteAccountView,
@@ -20,4 +21,9 @@ urlpatterns = [
     path("refresh/", RefreshView.as_view(), name="refresh"),
     path("password/", ChangePasswordView.as_view(), name="change-password"),
     path("account/delete/", DeleteAccountView.as_view(), name="delete-account"),
+    path(
+        "account/delete/<uuid:deletion_id>/",
+        AccountDeletionStatusView.as_view(),
+        name="account-deletion-status",
+    ),
 ]
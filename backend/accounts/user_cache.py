@@ -0,0 +1,75 @@
+"""
+In-process cache of the users behind access tokens, so that an authenticated
+request need not read devnote_users again for every token it sees.
+
+Entries are keyed by user id and the token's issue time, live JWT_USER_CACHE_TTL
+seconds at most, and the least recently used ones go beyond
+JWT_USER_CACHE_SIZE. Saving or deleting a user drops its entries in this
+process; other processes keep theirs until the TTL runs out, which is why it
+stays short.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class UserCache:
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, issued_at):
+        """A copy of the cached user, None when missing or expired."""
+        key = (str(user_id), issued_at)
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            user, expires_at = entry
+
+            if expires_at <= self.clock():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+
+        # Each request gets its own instance, free to change without leaking
+        return copy.copy(user)
+
+    def put(self, user_id, issued_at, user):
+        key = (str(user_id), issued_at)
+
+        with self.lock:
+            self.entries[key] = (copy.copy(user), self.clock() + self.ttl)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drop every entry of a user, whatever token it was cached for."""
+        user_id = str(user_id)
+
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+user_cache = UserCache(settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_TTL)
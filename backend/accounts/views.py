@@ -1,29 +1,31 @@
 import logging
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django_ratelimit.decorators import ratelimit
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.token_blacklist.models import (
-    BlacklistedToken,
-    OutstandingToken,
-)
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from devnote.ratelimit import ratelimit
+
 from .cookie_utils import delete_auth_cookies, set_auth_cookies
-from .models import User
+from .deletion import delete_account, request_deletion
+from .models import AccountDeletion, User
 from .serializers import (
+    AccountDeletionSerializer,
     ChangePasswordSerializer,
     DeleteAccountSerializer,
     LoginSerializer,
     RegisterSerializer,
     UserSerializer,
 )
+from .tokens import blacklist_outstanding_tokens, rotate_refresh_token
 
 UserModel = get_user_model()
 
@@ -110,7 +112,7 @@ class LoginView(APIView):
 
         user = serializer.validated_data["user"]
 
-        logger.info(f"User '{user.username}' logged in successfully")
+        logger.info("User '%s' logged in successfully", user.username)
 
         refresh = RefreshToken.for_user(user)
         access_token = str(refresh.access_token)
@@ -174,7 +176,7 @@ class LogoutView(APIView):
             return response
 
         except TokenError as e:
-            logger.error(f"Logout error (TokenError): {str(e)}")
+            logger.error("Logout error (TokenError): %s", e)
 
             response = Response(
                 {"message": "Logged out (token was invalid)"}, status=status.HTTP_200_OK
@@ -184,7 +186,7 @@ class LogoutView(APIView):
             return response
 
         except Exception as e:
-            logger.error(f"Unexpected error during logout: {str(e)}")
+            logger.error("Unexpected error during logout: %s", e)
 
             response = Response(
                 {"message": "Logged out (with errors)"}, status=status.HTTP_200_OK
@@ -201,6 +203,10 @@ class RefreshView(APIView):
     """
     POST /api/auth/refresh/
     Refreshes the access token using the refresh token from cookies
+
+    The refresh token is rotated by accounts.tokens.rotate_refresh_token,
+    in one transaction: of concurrent refreshes sending the same token, only
+    one gets a new pair
     """
 
     permission_classes = [AllowAny]
@@ -215,27 +221,20 @@ class RefreshView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED,
                 )
 
-            old_token = RefreshToken(refresh_token_str)
-
-            user_id = old_token.payload.get("user_id")
-            user = UserModel.objects.get(id=user_id)
-
-            new_token = RefreshToken.for_user(user)
+            new_token, user = rotate_refresh_token(refresh_token_str)
             new_access_token = str(new_token.access_token)
             new_refresh_token = str(new_token)
 
-            old_token.blacklist()
-
             response = Response(
                 {"message": "Token refreshed successfully"}, status=status.HTTP_200_OK
             )
 
             set_auth_cookies(response, new_access_token, new_refresh_token)
-            logger.info(f"Token refreshed for user {user.email}")
+            logger.info("Token refreshed for user %s", user.email)
             return response
 
         except TokenError as e:
-            logger.warning(f"Token refresh failed (invalid token): {str(e)}")
+            logger.warning("Token refresh failed (invalid token): %s", e)
             return Response(
                 {"error": "Invalid or expired refresh token"},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -246,7 +245,7 @@ class RefreshView(APIView):
                 {"error": "User not found"}, status=status.HTTP_401_UNAUTHORIZED
             )
         except Exception as e:
-            logger.error(f"Unexpected error during token refresh: {str(e)}")
+            logger.error("Unexpected error during token refresh: %s", e)
             return Response(
                 {"error": "Token refresh failed"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -289,8 +288,7 @@ class ChangePasswordView(APIView):
 
         user = serializer.save()
 
-        for outstanding in OutstandingToken.objects.filter(user=user):
-            BlacklistedToken.objects.get_or_create(token=outstanding)
+        blacklist_outstanding_tokens(user)
 
         refresh = RefreshToken.for_user(user)
 
@@ -299,7 +297,7 @@ class ChangePasswordView(APIView):
         )
 
         set_auth_cookies(response, str(refresh.access_token), str(refresh))
-        logger.info(f"Password changed for user '{user.username}'")
+        logger.info("Password changed for user '%s'", user.username)
 
         return response
 
@@ -318,7 +316,12 @@ class DeleteAccountView(APIView):
     RFC 9110 and intermediaries are free to drop it in transit
 
     No token needs blacklisting: authentication resolves the user from
-    the database, so every token issued to the account dies with the row
+    the database, so every token issued to the account dies with the row.
+    Deleting it drops the user from accounts.user_cache too
+
+    The data of the account goes in chunks through accounts.deletion.
+    Under ACCOUNT_DELETION_ASYNC the user is only deactivated here, and
+    the answer is a 202 with the id to follow the deletion by
     """
 
     permission_classes = [IsAuthenticated]
@@ -342,10 +345,45 @@ class DeleteAccountView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         user = request.user
-        logger.info(f"Deleting account '{user.username}' ({user.email})")
-        user.delete()
 
-        response = Response(status=status.HTTP_204_NO_CONTENT)
+        if settings.ACCOUNT_DELETION_ASYNC:
+            deletion = request_deletion(user)
+            logger.info(
+                "Account deletion %s requested for '%s' (%s)",
+                deletion.id,
+                user.username,
+                user.email,
+            )
+            response = Response(
+                AccountDeletionSerializer(deletion).data,
+                status=status.HTTP_202_ACCEPTED,
+            )
+        else:
+            logger.info("Deleting account '%s' (%s)", user.username, user.email)
+            delete_account(user.pk)
+            response = Response(status=status.HTTP_204_NO_CONTENT)
+
         delete_auth_cookies(response)
 
         return response
+
+
+# ============================================
+# ENDPOINT : Account Deletion Status
+# ============================================
+@method_decorator(ratelimit(key="ip", rate="30/m", method="GET"), name="get")
+class AccountDeletionStatusView(APIView):
+    """
+    GET /api/auth/account/delete/{id}/
+    Where an account deletion run in the background stands
+
+    Open to anyone holding the id: by the time it is done, the account
+    it was requested with no longer exists to authenticate
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, deletion_id):
+        deletion = get_object_or_404(AccountDeletion, id=deletion_id)
+
+        return Response(AccountDeletionSerializer(deletion).data)
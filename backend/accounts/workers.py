@@ -0,0 +1,27 @@
+"""
+Background threads of the accounts app, run by the server processes only.
+
+The WSGI and ASGI entry points start them once the application is loaded.
+Management commands, the shell and the test suite never load those modules,
+so migrate, delete_accounts or prune_tokens do not start a second pruner or
+deleter of their own.
+"""
+
+from functools import cache
+
+from django.conf import settings
+
+
+@cache
+def start_workers():
+    if settings.TOKEN_PRUNE_INTERVAL:
+        from .tokens import TokenPruner
+
+        TokenPruner(settings.TOKEN_PRUNE_INTERVAL).start()
+
+    if settings.ACCOUNT_DELETION_ASYNC:
+        from .deletion import deleter
+
+        # Started now rather than on the first deletion, to pick up the ones a
+        # previous run of the server left pending
+        deleter()
@@ -0,0 +1,32 @@
+import pytest
+
+pytest_plugins = ["devnote.pytest_query_budget"]
+
+
+@pytest.fixture(autouse=True, scope="session")
+def ratelimit_store(django_test_environment):
+    """Count the hits of the suite in memory, apart from a running server."""
+    from django.test import override_settings
+
+    from devnote import ratelimit
+
+    with override_settings(RATELIMIT_STORE="devnote.ratelimit.MemoryStore"):
+        ratelimit.limiter.cache_clear()
+        yield
+
+    ratelimit.limiter.cache_clear()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def response_cache(django_test_environment):
+    """Keep the cached responses of the suite in memory, out of the tree."""
+    from django.conf import settings
+    from django.test import override_settings
+
+    responses = {
+        **settings.CACHES["responses"],
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+
+    with override_settings(CACHES={**settings.CACHES, "responses": responses}):
+        yield
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "devnote.settings")
 
 application = get_asgi_application()
+
+# Only the server loads this module, see accounts.workers
+from accounts.workers import start_workers  # noqa: E402
+
+start_workers()
@@ -0,0 +1,142 @@
+"""
+Logging pipeline of DevNote.
+
+Loggers hand their records to QueuedHandler, which only puts them on a
+bounded in-memory queue. A listener thread takes them off and runs the handlers
+doing I/O, the log file and the console, so a request never waits on the disk
+to log. JSONFormatter writes one JSON object per record, with the fields passed
+through extra= kept as keys of their own.
+"""
+
+import copy
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from django.utils.module_loading import import_string
+
+# Attributes of every LogRecord, any other one was passed through extra=
+RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", logging.NOTSET, "", 0, "", (), None))
+) | {"message", "asctime", "taskName"}
+
+
+def build_handler(spec):
+    """
+    A handler from a <spec> of dictConfig: its class, level and formatter,
+    the rest being the arguments of the class. Read key by key, so that
+    cfg:// references, such as the formatters, are resolved.
+    """
+    options = {key: spec[key] for key in spec}
+    handler = import_string(options.pop("class"))(
+        **{
+            key: value
+            for key, value in options.items()
+            if key not in ("level", "formatter")
+        }
+    )
+    handler.setLevel(options.get("level", logging.NOTSET))
+
+    if options.get("formatter") is not None:
+        handler.setFormatter(options["formatter"])
+
+    return handler
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in RECORD_ATTRIBUTES
+        )
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+class QueuedHandler(QueueHandler):
+    """
+    Queue of at most <maxsize> records in front of the handlers built from the
+    specs of <handlers>. A record finding the queue full is dropped, and
+    counted in dropped, rather than holding up the request.
+
+    The listener thread starts with the first record of each process: a
+    thread started before a server forks its workers does not run in them.
+    """
+
+    def __init__(self, handlers, maxsize=10000):
+        # Built first, so that logging.shutdown, closing handlers newest
+        # first, drains the queue into them before closing them
+        # handlers[index]: dictConfig only converts the items it indexes
+        self.targets = [
+            build_handler(handlers[index]) for index in range(len(handlers))
+        ]
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.listener = None
+        self.pid = None
+
+        super().__init__(queue.Queue(maxsize))
+
+    def listen(self):
+        """Start a listener over a queue of this process."""
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = QueueListener(
+            self.queue, *self.targets, respect_handler_level=True
+        )
+        self.listener.start()
+        self.pid = os.getpid()
+
+    def emit(self, record):
+        # Called under the lock of the handler, which logging renews on fork
+        if self.pid != os.getpid():
+            self.listen()
+
+        super().emit(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        """
+        Render the message and traceback while still on the logging thread:
+        the arguments may change, or run queries, once the call has returned.
+        The record stays otherwise whole for the formatters of the listener.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def close(self):
+        # logging.shutdown closes the queue first, so what it holds is drained
+        # into handlers still open
+        if self.pid == os.getpid():
+            self.listener.stop()
+            self.pid = None
+
+        super().close()
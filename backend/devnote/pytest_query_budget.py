@@ -0,0 +1,68 @@
+"""
+pytest plugin running the suite under the query budgets of devnote.query_budget.
+
+A request running more queries than the budget of its view fails the test that
+sent it. The terminal summary lists the endpoints that repeated a query shape,
+and under --query-report the busiest request of every endpoint.
+"""
+
+import pytest
+
+from devnote import query_budget
+
+REPORTS = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--query-report",
+        action="store_true",
+        help="List the queries run by the busiest request of every endpoint.",
+    )
+
+
+def pytest_configure(config):
+    busiest = config.stash[REPORTS] = {}
+
+    def keep(report):
+        current = busiest.get(report.endpoint)
+
+        if current is None or report.count > current.count:
+            busiest[report.endpoint] = report
+
+    query_budget.listeners.append(keep)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def query_budgets(django_test_environment):
+    from django.test import override_settings
+
+    with override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=True):
+        yield
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    reports = config.stash.get(REPORTS, {})
+    suspects = [
+        (endpoint, shape, times)
+        for endpoint, report in sorted(reports.items())
+        for shape, times in report.repeated()
+    ]
+
+    if suspects:
+        terminalreporter.section("repeated queries (likely N+1)")
+
+        for endpoint, shape, times in suspects:
+            terminalreporter.write_line(f"{endpoint}: {times}x {shape[:160]}")
+
+    if config.getoption("query_report") and reports:
+        terminalreporter.section("queries per endpoint")
+
+        for endpoint, report in sorted(
+            reports.items(), key=lambda item: item[1].count, reverse=True
+        ):
+            budget = "-" if report.budget is None else report.budget
+            terminalreporter.write_line(
+                f"{report.count:>4} queries {report.duration * 1000:>8.1f} ms "
+                f"budget {budget:>3}  {endpoint}"
+            )
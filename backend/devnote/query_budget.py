@@ -0,0 +1,185 @@
+"""
+Accounting of the SQL queries each request runs.
+
+QueryBudgetMiddleware counts and times the queries of a request through a
+connection execute wrapper, and logs them per view action. It warns about
+SELECTs run again and again with the same shape within one request, the mark
+of an N+1. A view declares its budget in a query_budget attribute: a number,
+or a dict of numbers keyed by action. Under QUERY_BUDGET_STRICT, as in the test
+suite, a request running more queries than its budget raises
+QueryBudgetExceeded instead of logging a warning.
+
+Budgets cover the work of the view: the queries authenticating the request,
+whose number depends on how it was authenticated, are counted apart.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("devnote")
+
+# Placeholder runs of IN lists and multi-row inserts, folded into one
+PLACEHOLDER_RUN = re.compile(r"%s(?:, %s)+")
+
+# Callables receiving the QueryReport of every request, like the pytest plugin
+listeners = []
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_shape(sql):
+    """A query with its placeholder runs folded, equal for every row it is run for."""
+    return PLACEHOLDER_RUN.sub("%s, ...", sql)
+
+
+@dataclass
+class QueryReport:
+    endpoint: str
+    budget: int | None = None
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    exempt: int = 0
+    exempting: bool = False
+
+    def record(self, execute, sql, params, many, context):
+        """Execute wrapper counting and timing every query of the request."""
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.exempt += self.exempting
+            self.shapes[query_shape(sql)] += 1
+
+    def repeated(self, threshold=None):
+        """(shape, times) of the SELECTs run at least <threshold> times."""
+        threshold = threshold or settings.QUERY_BUDGET_REPEAT_THRESHOLD
+
+        return [
+            (shape, times)
+            for shape, times in self.shapes.most_common()
+            if times >= threshold and shape.lstrip().upper().startswith("SELECT")
+        ]
+
+    @property
+    def budgeted(self):
+        """The queries held to the budget."""
+        return self.count - self.exempt
+
+    def over_budget(self):
+        return self.budget is not None and self.budgeted > self.budget
+
+
+@contextmanager
+def unbudgeted(request):
+    """Count the queries run within apart from the budget of <request>."""
+    report = getattr(request, "query_report", None)
+
+    if report is None:
+        yield
+        return
+
+    report.exempting = True
+
+    try:
+        yield
+    finally:
+        report.exempting = False
+
+
+def action_of(request, view_func):
+    """
+    The DRF view class serving a request and its action: the viewset action,
+    or the lowercase method on a plain APIView. (None, None) off DRF.
+    """
+    view_class = getattr(view_func, "cls", None)
+
+    if view_class is None:
+        return None, None
+
+    actions = getattr(view_func, "actions", None) or {}
+
+    return view_class, actions.get(request.method.lower(), request.method.lower())
+
+
+def endpoint_of(request, view_func):
+    """The name of the view action serving a request, and its query budget."""
+    view_class, action = action_of(request, view_func)
+
+    if view_class is None:
+        return request.resolver_match.view_name, None
+
+    budget = getattr(view_class, "query_budget", None)
+
+    if isinstance(budget, dict):
+        budget = budget.get(action)
+
+    return f"{view_class.__name__}.{action}", budget
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        report = QueryReport(endpoint=request.path)
+        request.query_report = report
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(report.record))
+
+            response = self.get_response(request)
+
+        self.settle(report)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_report.endpoint, request.query_report.budget = endpoint_of(
+            request, view_func
+        )
+
+    def settle(self, report):
+        logger.info(
+            "%s ran %d queries in %.1f ms",
+            report.endpoint,
+            report.count,
+            report.duration * 1000,
+        )
+
+        for listener in listeners:
+            listener(report)
+
+        for shape, times in report.repeated():
+            logger.warning(
+                f"{report.endpoint} ran the same query {times} times, "
+                f"a likely N+1: {shape}"
+            )
+
+        if report.over_budget():
+            message = (
+                f"{report.endpoint} ran {report.budgeted} queries, "
+                f"over its budget of {report.budget}"
+            )
+
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+
+            logger.warning(message)
@@ -0,0 +1,303 @@
+"""
+Rate limiting of the API, counted in a store shared by the server processes.
+
+ratelimit() decorates view methods the way django_ratelimit's decorator did:
+the request gets a limited attribute and, past the rate, is refused with
+Ratelimited, a 403. Hits are counted over a sliding window: those of the
+current fixed window, plus those of the previous one weighted by how much of
+it the sliding window still covers.
+
+The counters live in RATELIMIT_STORE, SQLiteStore by default, a SQLite file
+which every process of the host writes to. Between two trips to the store, a
+process also grants up to RATELIMIT_LOCAL_SHARE of a limit on its own, as long
+as its last reading leaves that much headroom: callers far under their limit
+are served without touching the store. N processes may overshoot a limit by N
+such shares, which is why limits too small to have one always go to the store.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import cache, wraps
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from django_ratelimit.exceptions import Ratelimited
+
+RATE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# Callers kept in memory by a process before the expired ones are dropped
+LOCAL_STATES = 4096
+
+
+def parse_rate(rate):
+    """(limit, period in seconds) of a rate like "30/m" or "100/5m"."""
+    match = RATE.match(rate)
+
+    if match is None:
+        raise ImproperlyConfigured(f"Invalid rate: {rate!r}")
+
+    limit, multiplier, unit = match.groups()
+
+    return int(limit), int(multiplier or 1) * PERIODS[unit]
+
+
+def client_ip(request):
+    ip = request.META.get("REMOTE_ADDR")
+
+    if not ip:
+        raise ImproperlyConfigured("REMOTE_ADDR is empty, the client IP is unknown")
+
+    return ip
+
+
+def user_or_ip(request):
+    if request.user.is_authenticated:
+        return str(request.user.pk)
+
+    return client_ip(request)
+
+
+KEYS = {
+    "ip": client_ip,
+    "user": lambda request: str(request.user.pk),
+    "user_or_ip": user_or_ip,
+}
+
+
+class RateLimitStore(ABC):
+    """
+    Hit counters, per caller and fixed window. add() must be atomic across
+    every process sharing the store.
+    """
+
+    @abstractmethod
+    def add(self, key, window, hits, expires_at):
+        """
+        Count <hits> more in <window> of <key>, kept until <expires_at>.
+
+        Returns:
+            tuple: (hits of the window, hits of the window before)
+        """
+
+    @abstractmethod
+    def clear(self):
+        """Forget every counter."""
+
+
+class MemoryStore(RateLimitStore):
+    """Counters of this process alone, for a single process server."""
+
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def add(self, key, window, hits, expires_at):
+        with self.lock:
+            count = self.counts.get((key, window), (0, expires_at))[0] + hits
+            self.counts[(key, window)] = (count, expires_at)
+            previous = self.counts.get((key, window - 1), (0, None))[0]
+
+            if len(self.counts) > LOCAL_STATES:
+                now = time.time()
+                self.counts = {
+                    slot: entry for slot, entry in self.counts.items() if entry[1] > now
+                }
+
+        return count, previous
+
+    def clear(self):
+        with self.lock:
+            self.counts.clear()
+
+
+class SQLiteStore(RateLimitStore):
+    """
+    Counters in the SQLite file at RATELIMIT_SQLITE_PATH, shared by every
+    process of the host. Each thread keeps a connection of its own.
+    """
+
+    # Adds between two purges of the expired counters
+    PURGE_EVERY = 1000
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.RATELIMIT_SQLITE_PATH)
+        self.local = threading.local()
+        self.adds = 0
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS hits ("
+                "key TEXT NOT NULL, "
+                "bucket INTEGER NOT NULL, "
+                "count INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "PRIMARY KEY (key, bucket)"
+                ") WITHOUT ROWID"
+            )
+            self.local.connection = connection
+
+        return connection
+
+    def add(self, key, window, hits, expires_at):
+        connection = self.connection()
+        self.adds += 1
+
+        # IMMEDIATE takes the write lock first, the read seeing the write
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            connection.execute(
+                "INSERT INTO hits (key, bucket, count, expires_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key, bucket) "
+                "DO UPDATE SET count = count + excluded.count",
+                (key, window, hits, expires_at),
+            )
+            counts = dict(
+                connection.execute(
+                    "SELECT bucket, count FROM hits WHERE key = ? AND bucket >= ?",
+                    (key, window - 1),
+                )
+            )
+
+            if self.adds % self.PURGE_EVERY == 0:
+                connection.execute(
+                    "DELETE FROM hits WHERE expires_at < ?", (time.time(),)
+                )
+
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        return counts.get(window, 0), counts.get(window - 1, 0)
+
+    def clear(self):
+        self.connection().execute("DELETE FROM hits")
+
+
+@dataclass
+class LocalCount:
+    """What a process knows of a caller: its last reading, and hits since."""
+
+    window: int
+    expires_at: float
+    current: int = 0
+    previous: int = 0
+    pending: int = 0
+    read: bool = False
+
+    def estimate(self, weight):
+        return self.previous * weight + self.current + self.pending
+
+
+class SlidingWindowLimiter:
+    def __init__(self, store, local_share=0.0, clock=time.time):
+        self.store = store
+        self.local_share = local_share
+        self.clock = clock
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def hit(self, key, limit, period):
+        """Count a hit of <key>, True if it goes over <limit> per <period>."""
+        now = self.clock()
+        window, elapsed = divmod(now, period)
+        window = int(window)
+        weight = 1 - elapsed / period
+        share = int(limit * self.local_share)
+
+        with self.lock:
+            count = self.counts.get(key)
+
+            if count is None or count.window != window:
+                count = self.counts[key] = LocalCount(window, (window + 2) * period)
+
+            # Clearly under the limit: granted without a trip to the store
+            if (
+                count.read
+                and count.pending < share
+                and count.estimate(weight) + 1 <= limit - share
+            ):
+                count.pending += 1
+                return False
+
+            hits = count.pending + 1
+            count.pending = 0
+
+        current, previous = self.store.add(key, window, hits, count.expires_at)
+
+        with self.lock:
+            if count.current <= current:
+                count.current, count.previous = current, previous
+                count.read = True
+
+            if len(self.counts) > LOCAL_STATES:
+                self.counts = {
+                    key: count
+                    for key, count in self.counts.items()
+                    if count.expires_at > now
+                }
+
+        return previous * weight + current > limit
+
+    def clear(self):
+        with self.lock:
+            self.counts.clear()
+
+        self.store.clear()
+
+
+@cache
+def limiter():
+    return SlidingWindowLimiter(
+        import_string(settings.RATELIMIT_STORE)(), settings.RATELIMIT_LOCAL_SHARE
+    )
+
+
+def reset():
+    """Forget every hit, in this process and in the store."""
+    limiter().clear()
+
+
+def ratelimit(key, rate, method=None, block=True):
+    """
+    Limit a view method to <rate> hits per caller, the caller being named by
+    <key>: "ip", "user" or "user_or_ip". Only requests of <method> count,
+    when given.
+    """
+    limit, period = parse_rate(rate)
+    identify = KEYS[key]
+
+    def decorator(view):
+        group = f"{view.__module__}.{view.__qualname__}"
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            limited = (
+                getattr(settings, "RATELIMIT_ENABLE", True)
+                and (method is None or request.method == method)
+                and limiter().hit(f"{group}:{identify(request)}", limit, period)
+            )
+            request.limited = limited or getattr(request, "limited", False)
+
+            if limited and block:
+                raise Ratelimited()
+
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
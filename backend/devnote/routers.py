@@ -0,0 +1,94 @@
+"""
+Routing of reads to the read database, READ_DATABASE_ALIAS, when one is set up.
+
+Only the view actions a view names in its read_replica_actions attribute read
+from it, and only on GET. A request stops reading from it at its first write,
+and inside a transaction, so it always reads back what it wrote from the
+primary. Everything else stays on the primary, "default".
+"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .query_budget import action_of
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+@dataclass
+class ReadRoute:
+    """Set on the requests allowed to read from the read database."""
+
+    pinned: bool = False
+
+
+route = ContextVar("read_route", default=None)
+
+
+def reads_from_replica():
+    current = route.get()
+
+    return (
+        current is not None
+        and not current.pinned
+        and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+    )
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if settings.READ_DATABASE_ALIAS and reads_from_replica():
+            return settings.READ_DATABASE_ALIAS
+
+        return None
+
+    def db_for_write(self, model, **hints):
+        current = route.get()
+
+        if current is not None:
+            current.pinned = True
+
+        # Even for an object read from the read database
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, settings.READ_DATABASE_ALIAS}
+
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == settings.READ_DATABASE_ALIAS:
+            return False
+
+        return None
+
+
+class ReadReplicaMiddleware:
+    def __init__(self, get_response):
+        if not settings.READ_DATABASE_ALIAS:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = route.set(None)
+
+        try:
+            return self.get_response(request)
+        finally:
+            route.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class, action = action_of(request, view_func)
+
+        if request.method in SAFE_METHODS and action in getattr(
+            view_class, "read_replica_actions", ()
+        ):
+            route.set(ReadRoute())
@@ -57,6 +57,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "devnote.query_budget.QueryBudgetMiddleware",
+    "devnote.routers.ReadReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -101,6 +103,82 @@ DATABASES = {
     }
 }
 
+# Production profile of SQLite, on by default outside DEBUG. The WAL journal
+# lets reads run alongside the writer; write transactions take the lock as they
+# begin, waiting for it up to the timeout, rather than failing with "database
+# is locked" when a read inside them turns into a write; and connections live
+# across requests. python manage.py sqlite_loadtest compares it to the bare one.
+SQLITE_PRODUCTION = env.bool("SQLITE_PRODUCTION", default=not DEBUG)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    # Synced at checkpoints rather than at each commit, which WAL keeps safe
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative, a size in KiB: 64 MiB of page cache per connection
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+SQLITE_PRODUCTION_PROFILE = {
+    "CONN_MAX_AGE": env.int("CONN_MAX_AGE", default=600),
+    "CONN_HEALTH_CHECKS": True,
+    "OPTIONS": {
+        "timeout": 20,  # seconds waited on a lock before giving up
+        "transaction_mode": "IMMEDIATE",
+        "init_command": ";".join(
+            f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+        ),
+    },
+}
+
+if SQLITE_PRODUCTION:
+    DATABASES["default"].update(SQLITE_PRODUCTION_PROFILE)
+
+# Optional read database, see devnote.routers: the listing, retrieve and search
+# actions read from it, out of the way of writers. READ_DATABASE=True opens the
+# database file a second time, read-only, unless READ_DATABASE_PATH points at a
+# replica of it. Never immutable=1, which would miss every write since opening.
+READ_DATABASE = env.bool("READ_DATABASE", default=False)
+READ_DATABASE_ALIAS = "read" if READ_DATABASE else None
+
+if READ_DATABASE:
+    READ_DATABASE_PATH = Path(
+        env("READ_DATABASE_PATH", default=str(DATABASES["default"]["NAME"]))
+    ).resolve()
+    DATABASES[READ_DATABASE_ALIAS] = {
+        **DATABASES["default"],
+        "NAME": f"{READ_DATABASE_PATH.as_uri()}?mode=ro",
+        "OPTIONS": {
+            "timeout": 20,
+            # The journal mode and syncing are the primary's business
+            "init_command": ";".join(
+                [
+                    f"PRAGMA {name}={value}"
+                    for name, value in SQLITE_PRAGMAS.items()
+                    if name not in ("journal_mode", "synchronous")
+                ]
+                + ["PRAGMA query_only=1"]
+            ),
+        },
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["devnote.routers.ReadReplicaRouter"]
+
+# Global search backend: "index" reads the inverted index of workspace.search,
+# "fts5" the SQLite FTS5 mirrors, falling back on the index without FTS5
+SEARCH_BACKEND = env("SEARCH_BACKEND", default="index")
+
+# Ids deleted per statement when a folder goes with its whole branch, or a
+# project with everything in it
+FOLDER_DELETE_CHUNK_SIZE = 500
+PROJECT_DELETE_CHUNK_SIZE = 500
+
+# Query accounting per request, see devnote.query_budget. The test suite turns
+# on strict mode, failing any request over the query budget of its view
+QUERY_BUDGET_ENABLED = env.bool("QUERY_BUDGET_ENABLED", default=DEBUG)
+QUERY_BUDGET_STRICT = env.bool("QUERY_BUDGET_STRICT", default=False)
+QUERY_BUDGET_REPEAT_THRESHOLD = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -173,6 +251,60 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_PATH": "/",
 }
 
+# Resolve the user of an access token from an in-process cache rather than
+# the database, see accounts.user_cache
+JWT_USER_CACHE = env.bool("JWT_USER_CACHE", default=False)
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_TTL = 60  # seconds
+
+# Cached responses of the project listings, see workspace.response_cache.
+# RESPONSE_CACHE is "file", in files under RESPONSE_CACHE_LOCATION shared by
+# the processes of the host, "locmem", in the memory of a single process
+# server, which alone sees the writes it serves, "off", or the path of any
+# other Django cache backend, shared by every host serving the API
+RESPONSE_CACHE = env("RESPONSE_CACHE", default="file")
+RESPONSE_CACHE_LOCATION = env(
+    "RESPONSE_CACHE_LOCATION", default=str(BASE_DIR / "response_cache")
+)
+RESPONSE_CACHE_TTL = 300  # seconds
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "responses": {
+        "BACKEND": {
+            "locmem": "django.core.cache.backends.locmem.LocMemCache",
+            "file": "django.core.cache.backends.filebased.FileBasedCache",
+            "off": "django.core.cache.backends.dummy.DummyCache",
+        }.get(RESPONSE_CACHE, RESPONSE_CACHE),
+        "LOCATION": RESPONSE_CACHE_LOCATION,
+        "TIMEOUT": RESPONSE_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Seconds between two prunings of the expired refresh tokens by a thread of
+# each server process, 0 leaves it to the prune_tokens command
+TOKEN_PRUNE_INTERVAL = env.int("TOKEN_PRUNE_INTERVAL", default=0)
+TOKEN_PRUNE_BATCH_SIZE = 1000
+
+# Account deletions go in chunks of ids, see accounts.deletion. Async, the
+# request only deactivates the user and a thread of the server process, woken
+# by it or every ACCOUNT_DELETION_INTERVAL seconds, deletes the account
+ACCOUNT_DELETION_ASYNC = env.bool("ACCOUNT_DELETION_ASYNC", default=False)
+ACCOUNT_DELETION_INTERVAL = 60
+ACCOUNT_DELETION_CHUNK_SIZE = 500
+# A deletion running for longer, its deleter gone with a restart, is run again
+ACCOUNT_DELETION_STALE_AFTER = 60 * 60
+
+# Rate limits of the API views, see devnote.ratelimit. The store holds the
+# hit counters of every process, and a process may grant this share of a limit
+# on its own between two trips to it
+RATELIMIT_STORE = env("RATELIMIT_STORE", default="devnote.ratelimit.SQLiteStore")
+RATELIMIT_SQLITE_PATH = env(
+    "RATELIMIT_SQLITE_PATH", default=str(BASE_DIR / "ratelimit.sqlite3")
+)
+RATELIMIT_LOCAL_SHARE = 0.1
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = env.list(
     "CORS_ALLOWED_ORIGINS",
@@ -242,6 +374,11 @@ AUTHENTICATION_BACKENDS = [
 LOGS_DIR = BASE_DIR / "logs"
 os.makedirs(LOGS_DIR, exist_ok=True)
 
+# Records below this level are dropped before any formatting takes place
+LOG_LEVEL = env("LOG_LEVEL", default="DEBUG" if DEBUG else "INFO")
+
+# Loggers only queue their records, a listener thread writes them out, see
+# devnote.log
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -250,36 +387,53 @@ LOGGING = {
             "format": "{levelname} {asctime} {module} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "devnote.log.JSONFormatter",
+        },
     },
     "handlers": {
-        "file": {
-            "level": "INFO",
-            "class": "logging.handlers.RotatingFileHandler",
-            "filename": LOGS_DIR / "devnote.log",
-            "maxBytes": 1024 * 1024 * 10,  # 10 MB
-            "backupCount": 5,
-            "formatter": "verbose",
-        },
-        "console": {
-            "level": "DEBUG",
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
+        # Builds the handlers it feeds, see devnote.log.QueuedHandler
+        "queue": {
+            "()": "devnote.log.QueuedHandler",
+            "handlers": [
+                {
+                    "class": "logging.StreamHandler",
+                    "level": "DEBUG",
+                    "formatter": "cfg://formatters.verbose",
+                },
+                {
+                    "class": "logging.handlers.RotatingFileHandler",
+                    "level": "INFO",
+                    "formatter": "cfg://formatters.json",
+                    "filename": LOGS_DIR / "devnote.log",
+                    "maxBytes": 1024 * 1024 * 10,  # 10 MB
+                    "backupCount": 5,
+                    # Opened by the first record written, after any fork
+                    "delay": True,
+                },
+            ],
+            "maxsize": 10000,
         },
     },
     "loggers": {
         "django": {
-            "handlers": ["file", "console"],
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": True,
         },
         "workspace": {
-            "handlers": ["file", "console"],
-            "level": "DEBUG",
+            "handlers": ["queue"],
+            "level": LOG_LEVEL,
             "propagate": False,
         },
         "accounts": {
-            "handlers": ["file", "console"],
-            "level": "DEBUG",
+            "handlers": ["queue"],
+            "level": LOG_LEVEL,
+            "propagate": False,
+        },
+        "devnote": {
+            "handlers": ["queue"],
+            "level": "INFO",
             "propagate": False,
         },
     },
@@ -0,0 +1,162 @@
+"""
+Concurrent read/write load on a scratch SQLite file, to compare the bare
+connection profile Django defaults to with SQLITE_PRODUCTION_PROFILE.
+
+Each thread acts as a stream of requests, each on a connection of its own
+unless the profile keeps them across requests. Writers make the shape of the
+hot writes of the API, a TODO toggle: read a row, then update it, in one
+transaction. Under a plain BEGIN the read lock has to turn into a write lock
+halfway, which SQLite refuses at once with "database is locked" whenever
+another connection is writing. Readers list a page of rows, as listings do.
+"""
+
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+ROWS = 1000
+
+PAGE_SIZE = 50
+
+# Alias of the scratch file, kept apart from the databases of the project
+ALIAS = "load"
+
+
+@dataclass
+class LoadResult:
+    profile: str
+    seconds: float
+    reads: int = 0
+    writes: int = 0
+    errors: int = 0
+
+    @property
+    def throughput(self):
+        """Requests served per second, reads and writes alike."""
+        return (self.reads + self.writes) / self.seconds
+
+
+def connections_for(path, profile):
+    # Django wants a default database, which stays the dummy backend here
+    return ConnectionHandler(
+        {
+            "default": {},
+            ALIAS: {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(path),
+                **profile,
+            },
+        }
+    )
+
+
+def seed(connections):
+    connection = connections[ALIAS]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TABLE todos ("
+            "id INTEGER PRIMARY KEY, title TEXT NOT NULL, "
+            "done INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        cursor.executemany(
+            "INSERT INTO todos (id, title, done, updated_at) VALUES (%s, %s, 0, 0)",
+            [(row, f"Task {row}") for row in range(ROWS)],
+        )
+
+    connection.close()
+
+
+def toggle(connection, row):
+    """Flip a TODO the way an atomic() block around a read then a write does."""
+    connection.set_autocommit(
+        False, force_begin_transaction_with_broken_autocommit=True
+    )
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT done FROM todos WHERE id = %s", [row])
+            (done,) = cursor.fetchone()
+            cursor.execute(
+                "UPDATE todos SET done = %s, updated_at = %s WHERE id = %s",
+                [1 - done, time.time(), row],
+            )
+
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.set_autocommit(True)
+
+
+def list_page(connection, row):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id, title, done FROM todos WHERE id >= %s ORDER BY id LIMIT %s",
+            [row, PAGE_SIZE],
+        )
+        cursor.fetchall()
+
+
+def run_load(profile, name, seconds=5.0, writers=8, readers=8, directory=None):
+    """
+    Run <writers> and <readers> threads for <seconds> against a fresh file
+    opened with <profile>, the keys of a DATABASES entry besides ENGINE and
+    NAME. Returns a LoadResult.
+    """
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        connections = connections_for(Path(scratch) / f"{name}.sqlite3", profile)
+        seed(connections)
+
+        result = LoadResult(name, seconds)
+        lock = threading.Lock()
+        start = threading.Barrier(writers + readers + 1)
+
+        def serve(request, counter):
+            start.wait()
+            deadline = time.perf_counter() + seconds
+            served = errors = 0
+
+            try:
+                while time.perf_counter() < deadline:
+                    connection = connections[ALIAS]
+
+                    try:
+                        request(connection, random.randrange(ROWS))
+                        served += 1
+                    except OperationalError:
+                        errors += 1
+                    finally:
+                        # What the end of each request does
+                        connection.close_if_unusable_or_obsolete()
+            finally:
+                connections[ALIAS].close()
+
+                with lock:
+                    setattr(result, counter, getattr(result, counter) + served)
+                    result.errors += errors
+
+        threads = [
+            threading.Thread(target=serve, args=(toggle, "writes"))
+            for _ in range(writers)
+        ] + [
+            threading.Thread(target=serve, args=(list_page, "reads"))
+            for _ in range(readers)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        start.wait()
+
+        for thread in threads:
+            thread.join()
+
+        return result
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "devnote.settings")
 
 application = get_wsgi_application()
+
+# Only the server loads this module, see accounts.workers
+from accounts.workers import start_workers  # noqa: E402
+
+start_workers()
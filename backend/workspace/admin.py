@@ -1,9 +1,26 @@
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.html import format_html
 
+from . import changes, counters, search
 from .models import TODO, Document, Folder, Project, Snippet
 
 
+def items_of(model):
+    """How many objects of <model> a listed project holds, as a subquery."""
+    items = (
+        model.objects.filter(project=OuterRef("pk"))
+        .order_by()
+        .values("project")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+
+    return Coalesce(Subquery(items), Value(0))
+
+
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     """
@@ -25,6 +42,19 @@ class ProjectAdmin(admin.ModelAdmin):
     list_filter = ("created_at", "updated_at")
     readonly_fields = ("id", "created_at", "updated_at", "items_summary")
     raw_id_fields = ("user",)
+    list_select_related = ("user",)
+
+    def get_queryset(self, request):
+        """Count the items of every listed project in the listing query."""
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                document_total=items_of(Document),
+                snippet_total=items_of(Snippet),
+                todo_total=items_of(TODO),
+            )
+        )
 
     def user_link(self, obj):
         """Display user as clickable link"""
@@ -38,9 +68,9 @@ class ProjectAdmin(admin.ModelAdmin):
 
     def items_count(self, obj):
         """Display count of documents, snippets, and todos"""
-        documents = obj.documents.count()
-        snippets = obj.snippets.count()
-        todos = obj.todos.count()
+        documents = obj.document_total
+        snippets = obj.snippet_total
+        todos = obj.todo_total
         total = documents + snippets + todos
 
         return format_html(
@@ -242,6 +272,19 @@ class SnippetAdmin(admin.ModelAdmin):
     code_stats.short_description = "Code Stats"
 
 
+def todos_updated(queryset):
+    """
+    Catch up on a bulk update of TODOs, which sends no signals: the search
+    index, the counters of their projects and the change log.
+    """
+    projects = Project.objects.filter(id__in=queryset.values("project_id"))
+
+    search.reindex(queryset)
+    counters.recount(projects)
+    changes.record_rows(queryset)
+    changes.record_rows(projects)
+
+
 @admin.register(TODO)
 class TODOAdmin(admin.ModelAdmin):
     """
@@ -331,21 +374,24 @@ class TODOAdmin(admin.ModelAdmin):
     # Bulk actions
     def mark_as_pending(self, request, queryset):
         """Bulk action: Mark selected TODOs as pending"""
-        updated = queryset.update(status="pending")
+        updated = queryset.update(status="pending", updated_at=timezone.now())
+        todos_updated(queryset)
         self.message_user(request, f"{updated} TODO(s) marked as pending.")
 
     mark_as_pending.short_description = "⏳ Mark as Pending"
 
     def mark_as_in_progress(self, request, queryset):
         """Bulk action: Mark selected TODOs as in progress"""
-        updated = queryset.update(status="in_progress")
+        updated = queryset.update(status="in_progress", updated_at=timezone.now())
+        todos_updated(queryset)
         self.message_user(request, f"{updated} TODO(s) marked as in progress.")
 
     mark_as_in_progress.short_description = "🔄 Mark as In Progress"
 
     def mark_as_done(self, request, queryset):
         """Bulk action: Mark selected TODOs as done"""
-        updated = queryset.update(status="done")
+        updated = queryset.update(status="done", updated_at=timezone.now())
+        todos_updated(queryset)
         self.message_user(request, f"{updated} TODO(s) marked as done.")
 
     mark_as_done.short_description = "✅ Mark as Done"
@@ -0,0 +1,154 @@
+"""
+The change log behind the incremental sync of /api/sync/.
+
+Every write to a project, folder, document, snippet, TODO list or TODO logs a
+Change naming the object, owned by the user the object belongs to, or a
+tombstone when the object goes. The entries an object had are dropped as its
+new one goes in, so the log keeps one entry per object, the latest.
+
+Signals log single saves and deletes, along with the rows whose counters they
+move, as what those rows show changes too. A project logs its tombstone as its
+delete starts, and the objects going with it log nothing. Bulk writes send no
+signals: they call record() or record_rows() on whatever they touched, as they
+recount it. Recording a project, TODO list or TODO also bumps the version of
+the cached responses of its owner, see workspace.response_cache.
+"""
+
+from collections import defaultdict
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
+
+from . import response_cache
+from .models import TODO, Change, Document, Folder, Project, Snippet, TodoList
+
+KINDS = {
+    Project: "projects",
+    Folder: "folders",
+    Document: "documents",
+    Snippet: "snippets",
+    TodoList: "todo_lists",
+    TODO: "todos",
+}
+
+
+@lru_cache(maxsize=4096)
+def project_owner(project_id):
+    """The user of a project, which never changes hands."""
+    return Project.objects.filter(pk=project_id).values_list("user", flat=True).first()
+
+
+def owner_of(instance):
+    if isinstance(instance, Project):
+        return instance.user_id
+
+    if "project" in instance._state.fields_cache:
+        return instance.project.user_id
+
+    return project_owner(instance.project_id)
+
+
+def record(objects, user_id, deleted=False):
+    """
+    Log the (model, id) pairs of <objects>, all of user <user_id>, as changed,
+    or as deleted. Returns the new entries.
+
+    Ids are UUIDv7s, unique across every table, so an id alone finds the
+    entries it replaces. These go once the new ones are in, older than the
+    first of them. Entry ids come from AUTOINCREMENT and are never handed out
+    twice, so a new entry sorts after every cursor a client already holds.
+    """
+    objects = list(dict.fromkeys(objects))
+
+    if not objects:
+        return []
+
+    entries = Change.objects.bulk_create(
+        Change(user_id=user_id, kind=KINDS[model], object_id=pk, deleted=deleted)
+        for model, pk in objects
+    )
+    Change.objects.filter(
+        object_id__in=[pk for _model, pk in objects], id__lt=entries[0].id
+    ).delete()
+
+    if any(model in response_cache.CACHED for model, _pk in objects):
+        response_cache.bump(user_id)
+
+    return entries
+
+
+def record_rows(queryset, user_id=None):
+    """
+    Log every row of <queryset> as changed, all of user <user_id>, or of their
+    own owners when not given.
+    """
+    model = queryset.model
+
+    if user_id is not None:
+        record([(model, pk) for pk in queryset.values_list("pk", flat=True)], user_id)
+        return
+
+    owner = "user" if model is Project else "project__user"
+    owned = defaultdict(list)
+
+    for pk, user_id in queryset.values_list("pk", owner):
+        owned[user_id].append((model, pk))
+
+    for user_id, objects in owned.items():
+        record(objects, user_id)
+
+
+def cascade_of(origin):
+    """The model a delete started from <origin> cascades from."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def deleted_with_account(origin):
+    """Whether a delete started from <origin> takes an account, and its log."""
+    return cascade_of(origin) is get_user_model()
+
+
+def deleted_with_project(origin):
+    """
+    Whether a delete started from <origin> takes a whole project, whose
+    tombstone tells the sync that everything in it went, or a whole account.
+    """
+    return cascade_of(origin) is Project or deleted_with_account(origin)
+
+
+def saved(instance, shifted=()):
+    """Log a saved object, with the rows whose counters the save moved."""
+    record([(type(instance), instance.pk), *shifted], owner_of(instance))
+
+
+def deleted(instance, shifted=(), origin=None):
+    """
+    Log the tombstone of a deleted object, with the rows whose counters the
+    delete moved, unless it went with its project.
+    """
+    if deleted_with_project(origin):
+        return
+
+    user_id = owner_of(instance)
+    record([(type(instance), instance.pk)], user_id, deleted=True)
+    record(shifted, user_id)
+
+
+def project_deleted(project):
+    """
+    Log the tombstone of a project about to be deleted, and drop the entries
+    of everything in it, which the tombstone stands for.
+    """
+    (tombstone,) = record([(Project, project.pk)], project.user_id, deleted=True)
+    held = reduce(
+        or_,
+        (
+            Q(object_id__in=model.objects.filter(project=project).values("pk"))
+            for model in KINDS
+            if model is not Project
+        ),
+    )
+
+    Change.objects.filter(held, user_id=project.user_id, id__lt=tombstone.id).delete()
@@ -0,0 +1,183 @@
+"""
+Counters denormalized on folders, projects and TODO lists, so that listings
+read how many children a row has instead of counting them on every request.
+
+Each counted object adds one to the counter of the row a foreign key of it
+points to, when it meets the condition of that counter. Signals move the
+counters as objects are created, saved and deleted, through F() updates that
+run in the transaction of the save or delete. Bulk updates bypass them, so
+whatever changes counted fields in bulk calls recount() afterwards; the
+recount command repairs any drift.
+"""
+
+from functools import cache
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import TODO, Document, Folder, Snippet
+
+# Counted model: (foreign key, counter on the row it points to, condition)
+COUNTED = {
+    Folder: [("parent", "folder_count", Q())],
+    Document: [("folder", "document_count", Q())],
+    Snippet: [("folder", "snippet_count", Q())],
+    TODO: [
+        ("project", "open_todos_count", Q(status__in=TODO.OPEN_STATUSES)),
+        ("list", "todo_count", Q()),
+    ],
+}
+
+
+@cache
+def watched_fields(model):
+    """Attributes an object of <model> is counted on: its keys and conditions."""
+    names = set()
+
+    for key, _counter, condition in COUNTED[model]:
+        names.add(model._meta.get_field(key).attname)
+        names.update(lookup.split("__")[0] for lookup, _value in condition.children)
+
+    return names
+
+
+def meets(instance, condition):
+    """Whether an object meets a condition made of plain field lookups."""
+    for lookup, value in condition.children:
+        field, _, operator = lookup.partition("__")
+        current = getattr(instance, field)
+
+        if operator == "in" and current not in value:
+            return False
+
+        if operator == "" and current != value:
+            return False
+
+    return True
+
+
+def tally(instance):
+    """The row each counter of an object counts it in, None when in none."""
+    return {
+        counter: (
+            getattr(instance, type(instance)._meta.get_field(key).attname)
+            if meets(instance, condition)
+            else None
+        )
+        for key, counter, condition in COUNTED[type(instance)]
+    }
+
+
+def stored_tally(instance):
+    """tally() of the row as stored."""
+    model = type(instance)
+    stored = model.objects.filter(pk=instance.pk).only(*watched_fields(model)).first()
+
+    return {} if stored is None else tally(stored)
+
+
+def remember(instance):
+    """Keep the tally an instance was loaded with, to diff it on save."""
+    if watched_fields(type(instance)) <= instance.__dict__.keys():
+        instance._counted_tally = tally(instance)
+    else:
+        instance.__dict__.pop("_counted_tally", None)
+
+
+def shift(model, key, counter, row_id, delta):
+    """Move a counter by <delta>, returning the (model, id) of the row moved."""
+    if row_id is None:
+        return None
+
+    target = model._meta.get_field(key).related_model
+    target.objects.filter(pk=row_id).update(**{counter: F(counter) + delta})
+
+    return target, row_id
+
+
+def apply(instance, before, after):
+    """
+    Move the counters an object left and joined between two tallies. Returns
+    the (model, id) of the rows moved.
+    """
+    model = type(instance)
+    shifted = []
+
+    for key, counter, _condition in COUNTED[model]:
+        old, new = before.get(counter), after.get(counter)
+
+        if old != new:
+            shifted.append(shift(model, key, counter, old, -1))
+            shifted.append(shift(model, key, counter, new, 1))
+
+    return [row for row in shifted if row is not None]
+
+
+def touches_counted(instance, update_fields):
+    """Whether a save may change what an object is counted in."""
+    if update_fields is None:
+        return True
+
+    saved_attnames = {instance._meta.get_field(name).attname for name in update_fields}
+
+    return bool(saved_attnames & watched_fields(type(instance)))
+
+
+def saving(instance, update_fields=None):
+    """
+    Read the stored tally of a row about to be saved when it was loaded with
+    deferred fields, while the database still holds what it is counted in.
+    """
+    if instance._state.adding or "_counted_tally" in instance.__dict__:
+        return
+
+    if touches_counted(instance, update_fields):
+        instance._counted_tally = stored_tally(instance)
+
+
+def saved(instance, created, update_fields=None):
+    if not touches_counted(instance, update_fields):
+        return []
+
+    before = {} if created else instance.__dict__.get("_counted_tally", {})
+    after = tally(instance)
+    shifted = apply(instance, before, after)
+    instance._counted_tally = after
+
+    return shifted
+
+
+def deleted(instance):
+    return apply(
+        instance, instance.__dict__.get("_counted_tally") or tally(instance), {}
+    )
+
+
+def counters_of(model):
+    """(counted model, foreign key, counter, condition) of the counters on <model>."""
+    return [
+        (counted, key, counter, condition)
+        for counted, specs in COUNTED.items()
+        for key, counter, condition in specs
+        if counted._meta.get_field(key).related_model is model
+    ]
+
+
+def recount(queryset):
+    """
+    Set every counter of the rows of a queryset from a fresh count, returning
+    how many rows were recounted.
+    """
+    recounted = 0
+
+    for counted, key, counter, condition in counters_of(queryset.model):
+        count = (
+            counted.objects.filter(condition, **{key: OuterRef("pk")})
+            .order_by()
+            .values(key)
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        recounted = queryset.update(**{counter: Coalesce(Subquery(count), Value(0))})
+
+    return recounted
@@ -0,0 +1,126 @@
+"""
+Conditional GETs on the workspace resources.
+
+Listings and single objects answer with a strong ETag, and a request sending
+it back in If-None-Match gets an empty 304 while nothing it would show changed,
+before any row is loaded or serialized. The ETag hashes aggregates read in one
+query over the rows the view would serve: how many there are, their latest
+updated_at, and what updated_at misses, declared by the view:
+
+- etag_aggregates, over columns written without stamping updated_at, such as
+  the counters workspace.counters keeps;
+- etag_depends_on, models whose latest change within the same projects the
+  representation depends on: the folders a folder_path names, the children
+  behind a counter.
+
+A counter falls without stamping anything only when a child is deleted, and
+rises only through a child stamped as it is written, so the sum of the counters
+of the rows, with the latest change of their children, tells every change.
+"""
+
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Subquery
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Project
+
+
+def etag(*values):
+    digest = hashlib.blake2b(repr(values).encode(), digest_size=16)
+
+    return f'"{digest.hexdigest()}"'
+
+
+def latest_change(model, projects):
+    """The latest updated_at of the <model> rows in <projects>, as a subquery."""
+    return Subquery(
+        model.objects.filter(project__in=projects)
+        .order_by("-updated_at")
+        .values("updated_at")[:1]
+    )
+
+
+def validator(queryset, aggregates=None, depends_on=()):
+    """
+    The aggregates of <queryset> making up its ETag, read in one query. rows
+    counts the rows, so an empty queryset tells itself apart.
+    """
+    queryset = queryset.order_by()
+    projects = queryset.values("pk" if queryset.model is Project else "project_id")
+
+    return queryset.aggregate(
+        rows=Count("pk"),
+        latest=Max("updated_at"),
+        **(aggregates or {}),
+        **{
+            f"latest_{model._meta.model_name}": Max(latest_change(model, projects))
+            for model in depends_on
+        },
+    )
+
+
+def if_none_match(request):
+    """The ETags of If-None-Match, compared weakly as RFC 9110 has it for GETs."""
+    header = request.headers.get("If-None-Match")
+
+    if not header:
+        return set()
+
+    return {tag.removeprefix("W/") for tag in parse_etags(header)}
+
+
+class ConditionalGetMixin:
+    """
+    list and retrieve of a viewset with ETags, answering 304 to a request whose
+    If-None-Match holds the current one.
+    """
+
+    etag_aggregates = {}
+    etag_depends_on = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        return self.conditional(queryset, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: lookup}
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # A malformed id, which the plain retrieve answers with a 404
+            return super().retrieve(request, *args, **kwargs)
+
+        return self.conditional(queryset, super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, queryset, respond, request, *args, **kwargs):
+        """
+        Answer with <respond> under the ETag of <queryset>, read before the
+        response is, so a write in between makes it stale rather than lost.
+        """
+        values = validator(queryset, self.etag_aggregates, self.etag_depends_on)
+
+        if self.detail and not values["rows"]:
+            return respond(request, *args, **kwargs)
+
+        tag = etag(request.user.pk, sorted(values.items()))
+        headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+        held = if_none_match(request)
+
+        if tag in held or "*" in held:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = respond(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+
+        return response
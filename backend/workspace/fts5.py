@@ -0,0 +1,165 @@
+"""
+SQLite FTS5 mirror of the documents, snippets and TODOs, an optional backend
+of the global search. Each table gets an external-content FTS5 table keyed by
+its rowid, kept in sync by triggers.
+
+A migration that rebuilds one of the mirrored tables (SQLite remakes a table
+for most field changes) drops its triggers and renumbers its rowids, so it must
+call install() again afterwards.
+"""
+
+from django.db.backends.signals import connection_created
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from django.db.utils import OperationalError
+from django.dispatch import receiver
+
+TABLES = {
+    "documents": ("devnote_documents", ("title", "content")),
+    "snippets": ("devnote_snippets", ("title", "content", "language", "description")),
+    "todos": ("devnote_todos", ("title", "description", "status", "priority")),
+}
+
+# bm25 weight of a title match, against 1 for every other column
+TITLE_WEIGHT = 10.0
+
+
+def fts_table(table):
+    return f"{table}_fts"
+
+
+def is_supported(connection):
+    """Whether the SQLite library behind the connection has FTS5 compiled in."""
+    if connection.vendor != "sqlite":
+        return False
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.devnote_fts5_probe USING fts5(x)")
+        except OperationalError:
+            return False
+
+        cursor.execute("DROP TABLE temp.devnote_fts5_probe")
+
+    return True
+
+
+def is_installed(connection):
+    """Whether every mirror table exists on the connection."""
+    if connection.vendor != "sqlite":
+        return False
+
+    names = [fts_table(table) for table, _columns in TABLES.values()]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN "
+            f"({', '.join(['%s'] * len(names))})",
+            names,
+        )
+        return cursor.fetchone()[0] == len(names)
+
+
+def installed(connection):
+    """
+    is_installed(), read once per database connection: the mirrors only come
+    and go with the migrations, and install() or uninstall() forget the
+    answer of their connection.
+    """
+    if getattr(connection, "fts5_installed", None) is None:
+        connection.fts5_installed = is_installed(connection)
+
+    return connection.fts5_installed
+
+
+@receiver(connection_created)
+def forget_installed(sender, connection, **kwargs):
+    connection.fts5_installed = None
+
+
+def install_statements(table, columns):
+    fts = fts_table(table)
+    listed = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {listed}) "
+        f"VALUES ('delete', old.rowid, {old_values});"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, {listed}) VALUES (new.rowid, {new_values});"
+
+    return [
+        *drop_trigger_statements(table),
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+        f"USING fts5({listed}, content='{table}')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {listed} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def drop_trigger_statements(table):
+    fts = fts_table(table)
+
+    return [f"DROP TRIGGER IF EXISTS {fts}_{event}" for event in ("ai", "ad", "au")]
+
+
+def install(connection):
+    """Create the mirrors and their triggers, then fill them from the tables."""
+    connection.fts5_installed = None
+
+    with connection.cursor() as cursor:
+        for table, columns in TABLES.values():
+            for statement in install_statements(table, columns):
+                cursor.execute(statement)
+
+
+def uninstall(connection):
+    connection.fts5_installed = None
+
+    with connection.cursor() as cursor:
+        for table, _columns in TABLES.values():
+            for statement in drop_trigger_statements(table):
+                cursor.execute(statement)
+
+            cursor.execute(f"DROP TABLE IF EXISTS {fts_table(table)}")
+
+
+def match_expression(terms):
+    """An FTS5 query asking for every term as a prefix, terms being \\w+ only."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def filter_matches(queryset, user, kind, terms):
+    """
+    Narrow a queryset to the objects of <user> matching every term, and
+    annotate their relevance as 'score', the bm25 rank negated so that the
+    best hit scores highest. The match runs once through the FTS5 index; the
+    rank is then read for the matching rows only.
+    """
+    table, columns = TABLES[kind]
+    fts = fts_table(table)
+    expression = match_expression(terms)
+    weights = ", ".join(
+        str(TITLE_WEIGHT if column == "title" else 1.0) for column in columns
+    )
+
+    matching = RawSQL(
+        f"SELECT {table}.id FROM {fts} "
+        f"JOIN {table} ON {table}.rowid = {fts}.rowid "
+        f"JOIN devnote_projects ON devnote_projects.id = {table}.project_id "
+        f"WHERE {fts} MATCH %s AND devnote_projects.user_id = %s",
+        (expression, user.id.hex),
+    )
+    score = RawSQL(
+        f"SELECT -bm25({fts}, {weights}) FROM {fts} "
+        f"WHERE {fts} MATCH %s AND {fts}.rowid = {table}.rowid",
+        (expression,),
+        output_field=FloatField(),
+    )
+
+    return (
+        queryset.filter(id__in=matching).annotate(score=score).order_by("-score", "id")
+    )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from workspace.models import Document
+from workspace.preview import document_preview
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Store the gallery preview of the documents that lack one."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every preview, after a change to the preview rules.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Document.objects.only("id", "content", "preview").order_by("pk")
+
+        if not options["all"]:
+            queryset = queryset.filter(preview="").exclude(content="")
+
+        updated = 0
+        batch = []
+
+        with transaction.atomic():
+            for document in queryset.iterator(chunk_size=BATCH_SIZE):
+                preview = document_preview(document.content)
+
+                if preview != document.preview:
+                    document.preview = preview
+                    batch.append(document)
+
+                if len(batch) >= BATCH_SIZE:
+                    Document.objects.bulk_update(batch, ["preview"])
+                    updated += len(batch)
+                    batch = []
+
+            Document.objects.bulk_update(batch, ["preview"])
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} document previews"))
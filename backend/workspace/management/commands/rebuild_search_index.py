@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from workspace import search
+from workspace.models import SearchPosting
+
+
+class Command(BaseCommand):
+    help = "Drop the search index and rebuild it from every indexed object."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            SearchPosting.objects.all().delete()
+
+            for model, (kind, _fields) in search.INDEXED.items():
+                indexed = 0
+                batch = []
+                queryset = model.objects.select_related(
+                    *search.related_to_owner(model)
+                ).order_by("pk")
+
+                for instance in queryset.iterator(chunk_size=search.BATCH_SIZE):
+                    batch.extend(search.postings_for(instance))
+                    indexed += 1
+
+                    if len(batch) >= search.BATCH_SIZE:
+                        SearchPosting.objects.bulk_create(
+                            batch, batch_size=search.BATCH_SIZE
+                        )
+                        batch = []
+
+                SearchPosting.objects.bulk_create(batch, batch_size=search.BATCH_SIZE)
+                self.stdout.write(f"Indexed {indexed} {kind}")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
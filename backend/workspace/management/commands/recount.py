@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from workspace import counters
+from workspace.models import Folder, Project, TodoList
+
+
+class Command(BaseCommand):
+    help = "Recompute the counters kept on folders, projects and TODO lists."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model in (Folder, Project, TodoList):
+                recounted = counters.recount(model.objects.all())
+                self.stdout.write(
+                    f"Recounted {recounted} {model._meta.verbose_name_plural}"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Counters recounted"))
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from devnote.sqlite_load import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of concurrent reads and writes on SQLite under "
+        "the bare connection profile and under SQLITE_PRODUCTION_PROFILE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=8)
+
+    def handle(self, *args, **options):
+        results = [
+            run_load(
+                profile,
+                name,
+                seconds=options["seconds"],
+                writers=options["writers"],
+                readers=options["readers"],
+            )
+            for name, profile in (
+                ("bare", {}),
+                ("production", settings.SQLITE_PRODUCTION_PROFILE),
+            )
+        ]
+
+        for result in results:
+            self.stdout.write(
+                f"{result.profile:>10}: {result.throughput:8.0f} requests/s "
+                f"({result.reads} reads, {result.writes} writes, "
+                f"{result.errors} locked out)"
+            )
+
+        bare, production = results
+        gain = production.throughput / max(bare.throughput, 1)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Production profile: {gain:.1f}x the throughput of the bare one"
+            )
+        )
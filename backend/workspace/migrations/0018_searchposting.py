@@ -0,0 +1,76 @@
+# Generated by Django 5.2.17 on 2026-10-16 22:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspace", "0017_project_is_favorite"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchPosting",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("projects", "Projects"),
+                            ("documents", "Documents"),
+                            ("snippets", "Snippets"),
+                            ("todos", "TODOs"),
+                        ],
+                        help_text="Kind of the indexed object",
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.UUIDField(help_text="Id of the indexed object")),
+                (
+                    "term",
+                    models.CharField(
+                        help_text="Lowercased token of the text", max_length=64
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="Owner of the indexed object",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Search posting",
+                "verbose_name_plural": "Search postings",
+                "db_table": "devnote_search_postings",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "kind", "term"],
+                        name="devnote_sea_user_id_93e6c5_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "object_id", "term"),
+                        name="unique_search_posting",
+                    )
+                ],
+            },
+        ),
+    ]
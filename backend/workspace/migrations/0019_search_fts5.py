@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from workspace import fts5
+
+
+def install_fts5(apps, schema_editor):
+    if fts5.is_supported(schema_editor.connection):
+        fts5.install(schema_editor.connection)
+
+
+def uninstall_fts5(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        fts5.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspace", "0018_searchposting"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_fts5, uninstall_fts5),
+    ]
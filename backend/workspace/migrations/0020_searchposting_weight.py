@@ -0,0 +1,21 @@
+# Generated by Django 5.2.17 on 2026-10-16 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspace", "0019_search_fts5"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchposting",
+            name="weight",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text="Occurrences of the term, title ones counting more, for ranking",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.17 on 2026-10-16 23:04
+
+from django.db import migrations, models
+
+
+def fill_tree_paths(apps, schema_editor):
+    Folder = apps.get_model("workspace", "Folder")
+
+    parents = dict(Folder.objects.values_list("id", "parent_id"))
+    paths = {}
+
+    def path_of(folder_id):
+        chain = []
+
+        while folder_id is not None and folder_id not in paths:
+            chain.append(folder_id)
+            folder_id = parents[folder_id]
+
+        path = paths.get(folder_id, "")
+
+        for chained_id in reversed(chain):
+            path = paths[chained_id] = f"{path}{chained_id.hex}/"
+
+        return path
+
+    folders = [
+        Folder(id=folder_id, tree_path=path_of(folder_id)) for folder_id in parents
+    ]
+
+    Folder.objects.bulk_update(folders, ["tree_path"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspace", "0020_searchposting_weight"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="folder",
+            name="tree_path",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Hex ids from the root folder down to this one, each closed by /",
+            ),
+        ),
+        migrations.RunPython(fill_tree_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="folder",
+            index=models.Index(
+                fields=["tree_path"], name="devnote_fol_tree_pa_9dfbd6_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.17 on 2026-10-16 23:24
+
+from django.db import migrations, models
+
+from workspace import fts5
+
+
+def reinstall_fts5(apps, schema_editor):
+    """Adding the column remade devnote_documents, dropping its FTS5 triggers."""
+    if fts5.is_installed(schema_editor.connection):
+        fts5.install(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspace", "0021_folder_tree_path"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fts5),
+        migrations.AddField(
+            model_name="document",
+            name="preview",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Plain-text excerpt of the content, shown on gallery cards",
+            ),
+        ),
+        migrations.RunPython(reinstall_fts5, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.17 on 2026-10-16 23:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+OPEN_STATUSES = ["pending", "in_progress"]
+
+
+def count_of(model, key, condition=Q()):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(condition, **{key: OuterRef("pk")})
+            .order_by()
+            .values(key)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Folder = apps.get_model("workspace", "Folder")
+    Document = apps.get_model("workspace", "Document")
+    Snippet = apps.get_model("workspace", "Snippet")
+    Project = apps.get_model("workspace", "Project")
+    TodoList = apps.get_model("workspace", "TodoList")
+    TODO = apps.get_model("workspace", "TODO")
+
+    Folder.objects.update(
+        folder_count=count_of(Folder, "parent"),
+        document_count=count_of(Document, "folder"),
+        snippet_count=count_of(Snippet, "folder"),
+    )
+    Project.objects.update(
+        open_todos_count=count_of(TODO, "project", Q(status__in=OPEN_STATUSES))
+    )
+    TodoList.objects.update(todo_count=count_of(TODO, "list"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspace", "0022_document_preview"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="folder",
+            name="document_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Documents filed directly in the folder",
+            ),
+        ),
+        migrations.AddField(
+            model_name="folder",
+            name="folder_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Direct subfolders of the folder"
+            ),
+        ),
+        migrations.AddField(
+            model_name="folder",
+            name="snippet_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Snippets filed directly in the folder",
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="open_todos_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="TODOs of the project left to do"
+            ),
+        ),
+        migrations.AddField(
+            model_name="todolist",
+            name="todo_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="TODOs held by the list"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
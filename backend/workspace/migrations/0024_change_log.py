@@ -0,0 +1,108 @@
+# Generated by Django 5.2.17 on 2026-10-17 02:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Model: (kind, owner lookup)
+LOGGED = {
+    "Project": ("projects", "user_id"),
+    "Folder": ("folders", "project__user_id"),
+    "Document": ("documents", "project__user_id"),
+    "Snippet": ("snippets", "project__user_id"),
+    "TodoList": ("todo_lists", "project__user_id"),
+    "TODO": ("todos", "project__user_id"),
+}
+
+
+def log_existing(apps, schema_editor):
+    """One entry per object already there, so a first sync sends them all."""
+    Change = apps.get_model("workspace", "Change")
+
+    for name, (kind, owner) in LOGGED.items():
+        rows = apps.get_model("workspace", name).objects.values_list("id", owner)
+        Change.objects.bulk_create(
+            (
+                Change(kind=kind, object_id=object_id, user_id=user_id)
+                for object_id, user_id in rows.iterator(chunk_size=2000)
+            ),
+            batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workspace", "0023_denormalized_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Change",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("projects", "Projects"),
+                            ("folders", "Folders"),
+                            ("documents", "Documents"),
+                            ("snippets", "Snippets"),
+                            ("todo_lists", "TODO lists"),
+                            ("todos", "TODOs"),
+                        ],
+                        help_text="Kind of the changed object",
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.UUIDField(help_text="Id of the changed object")),
+                (
+                    "deleted",
+                    models.BooleanField(
+                        default=False, help_text="Whether the object was deleted"
+                    ),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Date of the change",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="Owner of the changed object",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Change",
+                "verbose_name_plural": "Changes",
+                "db_table": "devnote_changes",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "id"], name="devnote_cha_user_id_0f87ff_idx"
+                    ),
+                    models.Index(
+                        fields=["object_id"], name="devnote_cha_object__e09ad7_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(log_existing, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,36 @@
+from uuid import UUID
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxLengthValidator
 from django.db import models, transaction
+from django.db.models import Count, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
 from uuid6 import uuid7
 
+from .preview import document_preview
+
+
+def without_counters(instance, update_fields):
+    """
+    Fields a save of a stored row writes: every loaded one but the counters,
+    which only move through workspace.counters, so that a stale instance never
+    writes an old count back.
+    """
+    if update_fields is not None or instance._state.adding:
+        return update_fields
+
+    deferred = instance.get_deferred_fields()
+
+    return [
+        field.name
+        for field in instance._meta.concrete_fields
+        if not field.primary_key
+        and field.name not in instance.COUNTERS
+        and field.attname not in deferred
+    ]
+
 
 class Project(models.Model):
     """
@@ -11,6 +38,8 @@ class Project(models.Model):
     Utilisation de UUIDv7 comme PK pour une meilleure performance en indexation
     """
 
+    COUNTERS = ("open_todos_count",)
+
     id = models.UUIDField(
         primary_key=True,
         default=uuid7,
@@ -68,6 +97,12 @@ class Project(models.Model):
         help_text="Date the project was archived, null while it is active",
     )
 
+    open_todos_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="TODOs of the project left to do",
+    )
+
     class Meta:
         db_table = "devnote_projects"
         verbose_name = "Project"
@@ -88,6 +123,10 @@ class Project(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = without_counters(self, kwargs.get("update_fields"))
+        super().save(*args, **kwargs)
+
 
 class Folder(models.Model):
     """
@@ -95,8 +134,16 @@ class Folder(models.Model):
     project. Folders nest without depth limit; a null parent means project root.
     A folder holds one kind of resource, told by resource_type, and a whole
     branch shares the type of its root.
+
+    tree_path materializes the chain of ids from the root down to the folder,
+    so ancestors come without a query and a whole branch is one indexed range.
+    The counts of direct children are kept on the row by workspace.counters.
     """
 
+    PATH_SEPARATOR = "/"
+
+    COUNTERS = ("folder_count", "document_count", "snippet_count")
+
     RESOURCE_TYPE_CHOICES = [
         ("documents", "Documents"),
         ("snippets", "Snippets"),
@@ -134,6 +181,25 @@ class Folder(models.Model):
         help_text="Parent folder, null for a folder at the project root",
     )
 
+    tree_path = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Hex ids from the root folder down to this one, each closed by /",
+    )
+
+    folder_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Direct subfolders of the folder"
+    )
+
+    document_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Documents filed directly in the folder"
+    )
+
+    snippet_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Snippets filed directly in the folder"
+    )
+
     created_at = models.DateTimeField(
         auto_now_add=True, help_text="Folder creation date"
     )
@@ -162,76 +228,102 @@ class Folder(models.Model):
         ]
         indexes = [
             models.Index(fields=["project", "resource_type", "parent"]),
+            models.Index(fields=["tree_path"]),
         ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def path_ids(cls, tree_path):
+        """Ids of a tree path, root first."""
+        return [UUID(segment) for segment in tree_path.split(cls.PATH_SEPARATOR)[:-1]]
+
+    @classmethod
+    def branch(cls, tree_path):
+        """
+        The folder at <tree_path> and every folder below it. Ids hold hex digits
+        only, all sorting after the separator, so the branch is one range.
+        """
+        ceiling = tree_path[:-1] + chr(ord(cls.PATH_SEPARATOR) + 1)
+
+        return cls.objects.filter(tree_path__gte=tree_path, tree_path__lt=ceiling)
+
     def ancestor_ids(self):
         """Ids of every ancestor, closest first."""
         ids = []
-        seen = set()
-        node = self.parent
+        node = self
+
+        while node.parent_id is not None and node.parent_id not in ids:
+            stored = self.path_ids(node.tree_path)
+
+            if stored[-2:] == [node.parent_id, node.id]:
+                ids.extend(reversed(stored[:-1]))
+                break
 
-        while node is not None and node.id not in seen:
-            ids.append(node.id)
-            seen.add(node.id)
+            # The parent changed since the path was stored, or it never was
+            ids.append(node.parent_id)
             node = node.parent
 
         return ids
 
     def path(self):
         """The folder chain from the project root down to this folder."""
-        ancestor_ids = self.ancestor_ids()
-        names = dict(
-            Folder.objects.filter(id__in=ancestor_ids).values_list("id", "name")
-        )
+        return Folder.paths_of([self])[self.id]
 
-        chain = [
-            {"id": str(folder_id), "name": names[folder_id]}
-            for folder_id in reversed(ancestor_ids)
-            if folder_id in names
-        ]
-        chain.append({"id": str(self.id), "name": self.name})
+    @classmethod
+    def paths_of(cls, folders):
+        """
+        path() of many folders by id, the names of all their ancestors read in
+        a single query.
+        """
+        folders = {folder.id: folder for folder in folders}
+        ancestors = {
+            folder_id: folder.ancestor_ids() for folder_id, folder in folders.items()
+        }
+        names = {folder_id: folder.name for folder_id, folder in folders.items()}
+        missing = {
+            ancestor_id
+            for ancestor_ids in ancestors.values()
+            for ancestor_id in ancestor_ids
+        } - names.keys()
 
-        return chain
+        if missing:
+            names.update(cls.objects.filter(id__in=missing).values_list("id", "name"))
 
-    def descendant_ids(self):
-        """Ids of every nested folder below this one."""
-        ids = []
-        frontier = [self.id]
+        return {
+            folder_id: [
+                {"id": str(ancestor_id), "name": names[ancestor_id]}
+                for ancestor_id in reversed(ancestor_ids)
+                if ancestor_id in names
+            ]
+            + [{"id": str(folder_id), "name": folders[folder_id].name}]
+            for folder_id, ancestor_ids in ancestors.items()
+        }
 
-        while frontier:
-            frontier = list(
-                Folder.objects.filter(parent_id__in=frontier)
-                .exclude(id__in=ids)
-                .values_list("id", flat=True)
-            )
-            ids.extend(frontier)
+    def subtree(self):
+        """This folder and every folder nested under it."""
+        return Folder.branch(self.tree_path)
 
-        return ids
+    def descendant_ids(self):
+        """Ids of every nested folder below this one."""
+        return list(self.subtree().exclude(id=self.id).values_list("id", flat=True))
 
     def cascade_counts(self):
         """
-        What a recursive delete of this folder would remove. Both item counts
+        What a recursive delete of this folder would remove, read in a single
+        query over the branch joined to the items it holds. Both item counts
         are always reported; the one the folder cannot hold stays at zero.
         """
-        folder_ids = self.descendant_ids()
-        branch = [self.id, *folder_ids]
-        holds_documents = self.resource_type == "documents"
+        held = self.resource_type
+        counts = self.subtree().aggregate(
+            folders=Count("id", distinct=True), items=Count(held)
+        )
 
         return {
-            "folders": len(folder_ids),
-            "documents": (
-                Document.objects.filter(folder_id__in=branch).count()
-                if holds_documents
-                else 0
-            ),
-            "snippets": (
-                0
-                if holds_documents
-                else Snippet.objects.filter(folder_id__in=branch).count()
-            ),
+            "folders": counts["folders"] - 1,
+            "documents": counts["items"] if held == "documents" else 0,
+            "snippets": counts["items"] if held == "snippets" else 0,
         }
 
     def is_empty(self):
@@ -246,11 +338,11 @@ class Folder(models.Model):
         """
         with transaction.atomic():
             if project.id != self.project_id:
-                branch = [self.id, *self.descendant_ids()]
+                branch = self.subtree()
 
-                Folder.objects.filter(id__in=branch).update(project=project)
-                Document.objects.filter(folder_id__in=branch).update(project=project)
-                Snippet.objects.filter(folder_id__in=branch).update(project=project)
+                Document.objects.filter(folder__in=branch).update(project=project)
+                Snippet.objects.filter(folder__in=branch).update(project=project)
+                branch.update(project=project)
 
             self.project = project
             self.parent = parent
@@ -279,8 +371,39 @@ class Folder(models.Model):
             raise ValidationError({"parent": "A folder cannot be its own ancestor."})
 
     def save(self, *args, **kwargs):
+        """
+        Store the tree path under the one of the parent, both read from the
+        database so a stale instance cannot write an outdated chain. A folder
+        changing place carries the paths of its whole branch along.
+        """
         self.full_clean()
-        return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            stored = dict(
+                Folder.objects.filter(id__in=[self.id, self.parent_id]).values_list(
+                    "id", "tree_path"
+                )
+            )
+            old_path = stored.get(self.id)
+            self.tree_path = (
+                stored.get(self.parent_id, "") + self.id.hex + self.PATH_SEPARATOR
+            )
+
+            update_fields = without_counters(self, kwargs.get("update_fields"))
+
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "tree_path"}
+
+            super().save(*args, **kwargs)
+
+            if old_path and old_path != self.tree_path:
+                Folder.branch(old_path).exclude(id=self.id).update(
+                    tree_path=Concat(
+                        Value(self.tree_path),
+                        Substr("tree_path", len(old_path) + 1),
+                        output_field=models.TextField(),
+                    )
+                )
 
 
 class Document(models.Model):
@@ -304,6 +427,13 @@ class Document(models.Model):
         help_text="Content of the document",
     )
 
+    preview = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Plain-text excerpt of the content, shown on gallery cards",
+    )
+
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
@@ -348,6 +478,23 @@ class Document(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Derive the preview whenever the content may have changed, so listings
+        read it as is instead of stripping the Markdown on every request.
+        """
+        update_fields = kwargs.get("update_fields")
+
+        if update_fields is None or "content" in update_fields:
+            self.preview = document_preview(self.content)
+
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "preview"}
+
+        # The counters of the folders it leaves and joins move along
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Snippet(models.Model):
     """Snippet model represents a snippet linked to a project"""
@@ -401,6 +548,11 @@ class Snippet(models.Model):
     def __str__(self):
         return f"{self.title} ({self.language})"
 
+    def save(self, *args, **kwargs):
+        # The counters of the folders it leaves and joins move along
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class TodoList(models.Model):
     """
@@ -408,6 +560,8 @@ class TodoList(models.Model):
     Lists never nest: a todo belongs to at most one of them.
     """
 
+    COUNTERS = ("todo_count",)
+
     id = models.UUIDField(
         primary_key=True,
         default=uuid7,
@@ -424,6 +578,10 @@ class TodoList(models.Model):
         help_text="List associated to project",
     )
 
+    todo_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="TODOs held by the list"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True, help_text="List creation date")
 
     updated_at = models.DateTimeField(
@@ -449,6 +607,7 @@ class TodoList(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
+        kwargs["update_fields"] = without_counters(self, kwargs.get("update_fields"))
         return super().save(*args, **kwargs)
 
 
@@ -532,3 +691,111 @@ class TODO(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
+
+    def save(self, *args, **kwargs):
+        # The counters of the project and list it leaves and joins move along
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class SearchPosting(models.Model):
+    """
+    One term of the inverted index behind the global search: the term occurs in
+    the indexed text of one project, document, snippet or TODO of a user, and
+    weighs on its rank. Postings are rebuilt whenever the indexed object is saved.
+    """
+
+    KIND_CHOICES = [
+        ("projects", "Projects"),
+        ("documents", "Documents"),
+        ("snippets", "Snippets"),
+        ("todos", "TODOs"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text="Owner of the indexed object",
+    )
+
+    kind = models.CharField(
+        max_length=20, choices=KIND_CHOICES, help_text="Kind of the indexed object"
+    )
+
+    object_id = models.UUIDField(help_text="Id of the indexed object")
+
+    term = models.CharField(max_length=64, help_text="Lowercased token of the text")
+
+    weight = models.PositiveIntegerField(
+        default=1,
+        help_text="Occurrences of the term, title ones counting more, for ranking",
+    )
+
+    class Meta:
+        db_table = "devnote_search_postings"
+        verbose_name = "Search posting"
+        verbose_name_plural = "Search postings"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id", "term"], name="unique_search_posting"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "kind", "term"]),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.kind} {self.object_id})"
+
+
+class Change(models.Model):
+    """
+    One entry of the change log behind the incremental sync: the project,
+    folder, document, snippet, TODO list or TODO it names was created or
+    changed, or deleted when the entry is a tombstone. Writing an object again
+    replaces its entry with a new one, so the log holds one entry per object
+    and its ids, growing with every write, make the cursors of the sync.
+    """
+
+    KIND_CHOICES = [
+        ("projects", "Projects"),
+        ("folders", "Folders"),
+        ("documents", "Documents"),
+        ("snippets", "Snippets"),
+        ("todo_lists", "TODO lists"),
+        ("todos", "TODOs"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text="Owner of the changed object",
+    )
+
+    kind = models.CharField(
+        max_length=20, choices=KIND_CHOICES, help_text="Kind of the changed object"
+    )
+
+    object_id = models.UUIDField(help_text="Id of the changed object")
+
+    deleted = models.BooleanField(
+        default=False, help_text="Whether the object was deleted"
+    )
+
+    changed_at = models.DateTimeField(
+        default=timezone.now, help_text="Date of the change"
+    )
+
+    class Meta:
+        db_table = "devnote_changes"
+        verbose_name = "Change"
+        verbose_name_plural = "Changes"
+        indexes = [
+            models.Index(fields=["user", "id"]),
+            models.Index(fields=["object_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}{' deleted' if self.deleted else ''}"
@@ -41,10 +41,8 @@ def markdown_to_plain_text(markdown):
     return WHITESPACE.sub(" ", text).strip()
 
 
-def document_preview(markdown, max_length=MAX_LENGTH):
-    """Truncate on a word boundary, so cards never cut mid-word."""
-    text = markdown_to_plain_text(markdown)
-
+def clip(text, max_length):
+    """Truncate on a word boundary, so excerpts never cut mid-word."""
     if len(text) <= max_length:
         return text
 
@@ -55,3 +53,70 @@ def document_preview(markdown, max_length=MAX_LENGTH):
         clipped = clipped[:last_space]
 
     return f"{clipped.rstrip()}…"
+
+
+def document_preview(markdown, max_length=MAX_LENGTH):
+    """Truncate on a word boundary, so cards never cut mid-word."""
+    return clip(markdown_to_plain_text(markdown), max_length)
+
+
+# Raw characters kept around a match before stripping, so a hit deep inside a
+# long document never runs the rules over the whole of it
+RAW_WINDOW = 2000
+
+# Characters of context shown before the first match
+LEAD_IN = 60
+
+
+def term_pattern(terms):
+    """Words starting with one of the terms, the longest term tried first."""
+    if not terms:
+        return None
+
+    alternatives = "|".join(
+        re.escape(term) for term in sorted(terms, key=len, reverse=True)
+    )
+
+    return re.compile(rf"\b(?:{alternatives})", re.I)
+
+
+def search_excerpt(text, terms, markdown=False, max_length=MAX_LENGTH):
+    """
+    Plain-text window of a search hit around the first word starting with one
+    of the terms, with the [start, end] spans of every matched prefix in it.
+    Without a match in the text, the window is its opening.
+    """
+    if not text:
+        return "", []
+
+    pattern = term_pattern(terms)
+    cut_before = False
+
+    if len(text) > RAW_WINDOW:
+        found = pattern.search(text) if pattern else None
+        start = max(0, found.start() - RAW_WINDOW // 2) if found else 0
+        cut_before = start > 0
+        text = text[start : start + RAW_WINDOW]
+
+    plain = markdown_to_plain_text(text) if markdown else WHITESPACE.sub(" ", text)
+    plain = plain.strip()
+
+    found = pattern.search(plain) if pattern else None
+
+    if found and found.start() > LEAD_IN:
+        space = plain.find(" ", found.start() - LEAD_IN, found.start())
+        plain = plain[space + 1 if space >= 0 else found.start() - LEAD_IN :]
+        cut_before = True
+
+    excerpt = clip(plain, max_length)
+
+    if cut_before:
+        excerpt = f"…{excerpt}"
+
+    highlights = (
+        [[match.start(), match.end()] for match in pattern.finditer(excerpt)]
+        if pattern
+        else []
+    )
+
+    return excerpt, highlights
@@ -0,0 +1,107 @@
+"""
+Deletes too large for Model.delete(), whose collector loads every row a delete
+cascades to before removing any. These go a chunk of ids at a time, children
+before their parents, each chunk a raw DELETE in a transaction of its own.
+
+Raw deletes send no signals: the search postings of what goes are dropped here,
+with tombstones left in the change log when an owner is given; the counters of
+what stays are the caller's to recount. The FTS5 mirrors follow by trigger.
+"""
+
+from django.db import transaction
+from django.db.models.functions import Length
+
+from . import changes, search
+from .models import (
+    TODO,
+    Change,
+    Document,
+    Folder,
+    Project,
+    SearchPosting,
+    Snippet,
+    TodoList,
+)
+
+
+def purge(queryset, chunk_size, unindex=True, owner=None):
+    """
+    Delete the rows of <queryset> <chunk_size> ids at a time, with their search
+    postings when the model is indexed, unless <unindex> is False, and leaving
+    tombstones for the sync of user <owner> when given. Returns how many rows
+    went.
+    """
+    model = queryset.model
+    deleted = 0
+
+    while True:
+        with transaction.atomic():
+            chunk = list(queryset.values_list("id", flat=True)[:chunk_size])
+
+            if not chunk:
+                return deleted
+
+            if unindex and model in search.INDEXED:
+                search.unindex_many(model, chunk)
+
+            if owner is not None:
+                changes.record([(model, pk) for pk in chunk], owner, deleted=True)
+
+            deleted += model.objects.filter(id__in=chunk)._raw_delete(model.objects.db)
+
+
+def purge_folders(folders, chunk_size, unindex=True, owner=None):
+    """
+    Delete folders with the documents and snippets they hold. Deepest first,
+    so no folder goes before the folders inside it. Returns how many folders
+    went.
+    """
+    purge(Document.objects.filter(folder__in=folders), chunk_size, unindex, owner)
+    purge(Snippet.objects.filter(folder__in=folders), chunk_size, unindex, owner)
+
+    return purge(folders.order_by(Length("tree_path").desc()), chunk_size, owner=owner)
+
+
+def purge_user_data(user_id, chunk_size):
+    """
+    Delete the projects of a user and everything in them, children first.
+    Every posting and change log entry of the user goes up front, sparing each
+    chunk a lookup of its own. Returns how many rows went, by model.
+    """
+    projects = Project.objects.filter(user_id=user_id)
+    counts = {
+        SearchPosting: purge(SearchPosting.objects.filter(user_id=user_id), chunk_size),
+        Change: purge(Change.objects.filter(user_id=user_id), chunk_size),
+    }
+
+    for model in (TODO, Document, Snippet):
+        counts[model] = purge(
+            model.objects.filter(project__in=projects), chunk_size, unindex=False
+        )
+
+    counts[Folder] = purge_folders(
+        Folder.objects.filter(project__in=projects), chunk_size, unindex=False
+    )
+    counts[TodoList] = purge(TodoList.objects.filter(project__in=projects), chunk_size)
+    counts[Project] = purge(projects, chunk_size, unindex=False)
+
+    return counts
+
+
+def purge_project(project, chunk_size):
+    """
+    Delete a project and everything in it, children first. Its tombstone goes
+    in the change log up front, standing for the rest, which is dropped from
+    the log with it. Returns how many rows went, by model.
+    """
+    changes.project_deleted(project)
+    counts = {
+        model: purge(model.objects.filter(project=project), chunk_size)
+        for model in (TODO, Document, Snippet)
+    }
+    folders = Folder.objects.filter(project=project)
+    counts[Folder] = purge(folders.order_by(Length("tree_path").desc()), chunk_size)
+    counts[TodoList] = purge(TodoList.objects.filter(project=project), chunk_size)
+    counts[Project] = purge(Project.objects.filter(pk=project.pk), chunk_size)
+
+    return counts
@@ -0,0 +1,104 @@
+"""
+Cached responses of the project listings the sidebar asks for on every render.
+
+An entry is keyed by the user, the full path of the request and the version of
+the user, a counter every write to their projects, TODO lists or TODOs bumps
+as it logs itself in workspace.changes. A bumped version leaves the entries of
+the previous one unread until they expire. The version goes up as the write
+happens and again once it commits, so a response read from the state in
+between is not served past the commit.
+
+Entries and versions live in the "responses" cache of CACHES, set by
+RESPONSE_CACHE: in files shared by the processes of the host by default. The
+cache must be shared by every process serving the API, or a process misses
+the versions bumped by the others and serves their stale entries until they
+expire. A version lost to eviction starts again from the clock, above any
+version it held before.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .etags import if_none_match
+from .models import TODO, Project, TodoList
+
+CACHED = {Project, TodoList, TODO}
+
+# Headers of workspace.etags, served again with a cached response
+KEPT_HEADERS = ("ETag", "Cache-Control")
+
+
+def responses():
+    return caches["responses"]
+
+
+def version_key(user_id):
+    return f"version:{user_id}"
+
+
+def version(user_id):
+    key = version_key(user_id)
+    current = responses().get(key)
+
+    if current is None:
+        responses().add(key, time.time_ns(), timeout=None)
+        current = responses().get(key)
+
+    return current
+
+
+def bump(user_id):
+    """Leave the cached responses of a user behind, now and on commit."""
+
+    def increment():
+        try:
+            responses().incr(version_key(user_id))
+        except ValueError:
+            # Never read, or evicted: the next read starts a new version
+            pass
+
+    increment()
+    transaction.on_commit(increment)
+
+
+def cached(handler):
+    """
+    Serve a GET action of a viewset from the cache of the requesting user,
+    with the ETag and 304s of workspace.etags.
+    """
+
+    @wraps(handler)
+    def serve(view, request, *args, **kwargs):
+        user_id = request.user.pk
+        path = hashlib.blake2b(request.get_full_path().encode(), digest_size=16)
+        key = f"response:{user_id}:{version(user_id)}:{path.hexdigest()}"
+        entry = responses().get(key)
+
+        if entry is None:
+            response = handler(view, request, *args, **kwargs)
+
+            if response.status_code == status.HTTP_200_OK:
+                headers = {
+                    header: response[header]
+                    for header in KEPT_HEADERS
+                    if header in response
+                }
+                responses().set(key, (response.data, headers))
+
+            return response
+
+        data, headers = entry
+        held = if_none_match(request)
+
+        if headers.get("ETag") in held or "*" in held:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(data, headers=headers)
+
+    return serve
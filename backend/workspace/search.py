@@ -0,0 +1,264 @@
+"""
+Inverted index behind the global search. Every project, document, snippet and
+TODO is split into lowercased terms stored as postings of its owner, so a query
+looks terms up through an index instead of scanning the text of every row.
+
+With SEARCH_BACKEND = "fts5", documents, snippets and TODOs are matched through
+the SQLite FTS5 mirrors of workspace.fts5 instead, ranked by bm25. The postings
+are still maintained, and serve whenever FTS5 is missing from the database.
+"""
+
+import base64
+import json
+import re
+from collections import Counter
+from uuid import UUID
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import FloatField, OuterRef, Q, Subquery, Sum
+
+from . import fts5
+from .models import TODO, Document, Project, SearchPosting, Snippet
+
+TOKEN = re.compile(r"\w+")
+
+MAX_TERM_LENGTH = SearchPosting._meta.get_field("term").max_length
+
+# Above every code point, so a range on it catches every term with a prefix
+TERM_CEILING = chr(0x10FFFF)
+
+BATCH_SIZE = 1000
+
+# Weight of a term occurring in a title, against 1 anywhere else
+TITLE_WEIGHT = 10
+
+INDEXED = {
+    Project: ("projects", ("title", "description")),
+    Document: ("documents", ("title", "content")),
+    Snippet: ("snippets", ("title", "content", "language", "description")),
+    TODO: ("todos", ("title", "description", "status", "priority")),
+}
+
+
+def words(text):
+    """Lowercased terms of a text in order, clipped to what a posting holds."""
+    return [term[:MAX_TERM_LENGTH] for term in TOKEN.findall((text or "").lower())]
+
+
+def tokenize(text):
+    """Distinct terms of a text."""
+    return set(words(text))
+
+
+def query_terms(query):
+    """Terms of a query, in the order typed, each one matched as a prefix."""
+    terms = []
+
+    for term in words(query):
+        if term not in terms:
+            terms.append(term)
+
+    return terms
+
+
+def indexed_fields(instance):
+    return INDEXED[type(instance)][1]
+
+
+def kind_of(instance):
+    return INDEXED[type(instance)][0]
+
+
+def owner_id(instance):
+    if isinstance(instance, Project):
+        return instance.user_id
+
+    return instance.project.user_id
+
+
+def weights_of(instance):
+    """
+    What each term of an object weighs toward its score: one per occurrence,
+    TITLE_WEIGHT per occurrence in the title.
+    """
+    weights = Counter()
+
+    for field in indexed_fields(instance):
+        factor = TITLE_WEIGHT if field == "title" else 1
+
+        for term in words(getattr(instance, field)):
+            weights[term] += factor
+
+    return weights
+
+
+def postings_for(instance):
+    """Unsaved postings of an object, for bulk loads."""
+    kind = kind_of(instance)
+    user_id = owner_id(instance)
+
+    return [
+        SearchPosting(
+            user_id=user_id,
+            kind=kind,
+            object_id=instance.id,
+            term=term,
+            weight=weight,
+        )
+        for term, weight in weights_of(instance).items()
+    ]
+
+
+def index(instance):
+    """
+    Bring the postings of an object in line with its text. Only the terms that
+    appeared, vanished or changed weight are written, so saving a long
+    document after a small edit stays cheap.
+    """
+    kind = kind_of(instance)
+    user_id = owner_id(instance)
+    weights = weights_of(instance)
+
+    with transaction.atomic():
+        postings = SearchPosting.objects.filter(kind=kind, object_id=instance.id)
+        existing = {
+            term: (posting_id, weight)
+            for posting_id, term, weight in postings.values_list("id", "term", "weight")
+        }
+
+        stale = existing.keys() - weights.keys()
+        if stale:
+            postings.filter(term__in=stale).delete()
+
+        SearchPosting.objects.bulk_create(
+            [
+                SearchPosting(
+                    user_id=user_id,
+                    kind=kind,
+                    object_id=instance.id,
+                    term=term,
+                    weight=weight,
+                )
+                for term, weight in weights.items()
+                if term not in existing
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        SearchPosting.objects.bulk_update(
+            [
+                SearchPosting(id=posting_id, weight=weights[term])
+                for term, (posting_id, weight) in existing.items()
+                if term in weights and weights[term] != weight
+            ],
+            ["weight"],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def unindex(instance):
+    SearchPosting.objects.filter(kind=kind_of(instance), object_id=instance.id).delete()
+
+
+def index_many(instances):
+    """
+    Index again objects of one model written in bulk, which sends no signals:
+    their postings are all replaced at once rather than diffed one by one.
+    """
+    instances = list(instances)
+
+    if not instances:
+        return
+
+    with transaction.atomic():
+        unindex_many(type(instances[0]), [instance.id for instance in instances])
+        SearchPosting.objects.bulk_create(
+            [posting for instance in instances for posting in postings_for(instance)],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def unindex_many(model, ids):
+    SearchPosting.objects.filter(kind=INDEXED[model][0], object_id__in=ids).delete()
+
+
+def related_to_owner(model):
+    return () if model is Project else ("project",)
+
+
+def reindex(queryset):
+    """Index again every object of a queryset, after a bulk update of it."""
+    for instance in queryset.select_related(*related_to_owner(queryset.model)):
+        index(instance)
+
+
+def uses_fts5(kind):
+    return (
+        settings.SEARCH_BACKEND == "fts5"
+        and kind in fts5.TABLES
+        and fts5.installed(connection)
+    )
+
+
+def filter_matches(queryset, user, kind, query):
+    """
+    Narrow a queryset to the objects of <user> whose text holds every term of
+    the query, each one as a prefix of an indexed term, and annotate their
+    relevance as 'score', best first. The lookups run as subqueries, so the
+    database intersects them in one statement.
+    """
+    terms = query_terms(query)
+
+    if not terms:
+        return queryset.none()
+
+    if uses_fts5(kind):
+        return fts5.filter_matches(queryset, user, kind, terms)
+
+    postings = SearchPosting.objects.filter(user=user, kind=kind)
+    matched = Q()
+
+    for term in terms:
+        prefixed = Q(term__gte=term, term__lt=term + TERM_CEILING)
+        matched |= prefixed
+        queryset = queryset.filter(id__in=postings.filter(prefixed).values("object_id"))
+
+    score = (
+        SearchPosting.objects.filter(matched, kind=kind, object_id=OuterRef("id"))
+        .values("object_id")
+        .annotate(total=Sum("weight"))
+        .values("total")
+    )
+
+    return queryset.annotate(score=Subquery(score, output_field=FloatField())).order_by(
+        "-score", "id"
+    )
+
+
+def after(queryset, position):
+    """The hits ranked past a (score, id) position of filter_matches."""
+    score, object_id = position
+
+    return queryset.filter(Q(score__lt=score) | Q(score=score, id__gt=object_id))
+
+
+def encode_cursor(kind, hit):
+    """Opaque position of the last hit of a page, for the next one."""
+    payload = json.dumps([kind, hit.score, str(hit.id)])
+
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(kind, cursor):
+    """The (score, id) position of a cursor of <kind>, or a ValueError."""
+    try:
+        cursor_kind, score, object_id = json.loads(base64.urlsafe_b64decode(cursor))
+        position = (float(score), UUID(object_id))
+    except (TypeError, ValueError) as error:
+        raise ValueError("Malformed cursor") from error
+
+    if cursor_kind != kind:
+        raise ValueError("Cursor issued for another kind of result")
+
+    return position
@@ -1,7 +1,8 @@
+from django.db import models
 from rest_framework import serializers
 
 from .models import TODO, Document, Folder, Project, Snippet, TodoList
-from .preview import document_preview
+from .preview import search_excerpt, term_pattern
 
 
 class ScopedFolderField(serializers.PrimaryKeyRelatedField):
@@ -28,11 +29,41 @@ class ScopedTodoListField(serializers.PrimaryKeyRelatedField):
         return TodoList.objects.filter(project__user=request.user)
 
 
+class FolderPathListSerializer(serializers.ListSerializer):
+    """
+    Listing of documents or snippets carrying a folder_path: the paths of every
+    folder on the page are resolved together, before the rows serialize.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+
+        if "folder_path" in self.child.fields:
+            folders = {item.folder_id: item.folder for item in items if item.folder_id}
+            self.child.folder_paths = Folder.paths_of(folders.values())
+
+        return [self.child.to_representation(item) for item in items]
+
+
+class FolderPathMixin:
+    """Resolves folder_path, from the paths batched by the listing when there."""
+
+    folder_paths = None
+
+    def get_folder_path(self, obj):
+        """Folders to walk through to reach the item, root first."""
+        if obj.folder_id is None:
+            return []
+
+        if self.folder_paths is not None and obj.folder_id in self.folder_paths:
+            return self.folder_paths[obj.folder_id]
+
+        return obj.folder.path()
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     """Serializer for Project model"""
 
-    open_todos_count = serializers.SerializerMethodField()
-
     class Meta:
         model = Project
         fields = [
@@ -60,15 +91,6 @@ class ProjectSerializer(serializers.ModelSerializer):
             "open_todos_count",
         ]
 
-    def get_open_todos_count(self, obj):
-        """Todos left to do, read from the annotation when the view sets one."""
-        annotated = getattr(obj, "open_todos_count", None)
-
-        if annotated is not None:
-            return annotated
-
-        return obj.todos.filter(status__in=TODO.OPEN_STATUSES).count()
-
     def validate_title(self, value):
         """Validate and clean the project title"""
         value = value.strip()
@@ -101,9 +123,6 @@ class FolderSerializer(serializers.ModelSerializer):
 
     project_id = serializers.UUIDField(read_only=True, source="project.id")
     parent = ScopedFolderField(allow_null=True, required=False)
-    folder_count = serializers.SerializerMethodField()
-    document_count = serializers.SerializerMethodField()
-    snippet_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Folder
@@ -121,18 +140,6 @@ class FolderSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "project_id", "created_at", "updated_at"]
 
-    def get_folder_count(self, obj):
-        count = getattr(obj, "folder_count", None)
-        return obj.children.count() if count is None else count
-
-    def get_document_count(self, obj):
-        count = getattr(obj, "document_count", None)
-        return obj.documents.count() if count is None else count
-
-    def get_snippet_count(self, obj):
-        count = getattr(obj, "snippet_count", None)
-        return obj.snippets.count() if count is None else count
-
     def validate_name(self, value):
         value = value.strip()
         if not value:
@@ -197,7 +204,7 @@ class FolderSerializer(serializers.ModelSerializer):
         return data
 
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(FolderPathMixin, serializers.ModelSerializer):
     """Serializer for Document model"""
 
     project_id = serializers.UUIDField(read_only=True, source="project.id")
@@ -206,6 +213,7 @@ class DocumentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Document
+        list_serializer_class = FolderPathListSerializer
         fields = [
             "id",
             "title",
@@ -231,10 +239,6 @@ class DocumentSerializer(serializers.ModelSerializer):
         if not self.context.get("include_folder_path"):
             self.fields.pop("folder_path", None)
 
-    def get_folder_path(self, obj):
-        """Folders to walk through to reach the document, root first."""
-        return [] if obj.folder is None else obj.folder.path()
-
     def validate_title(self, value):
         value = value.strip()
         if not value:
@@ -267,13 +271,12 @@ class DocumentSerializer(serializers.ModelSerializer):
 
 class DocumentCardSerializer(serializers.ModelSerializer):
     """
-    Document as shown in the gallery: carries a plain-text excerpt instead of the
-    whole Markdown, which a listing never renders.
+    Document as shown in the gallery: carries the stored plain-text excerpt
+    instead of the whole Markdown, which a listing never renders.
     """
 
     project_id = serializers.UUIDField(read_only=True, source="project.id")
     folder = serializers.PrimaryKeyRelatedField(read_only=True)
-    preview = serializers.SerializerMethodField()
 
     class Meta:
         model = Document
@@ -289,11 +292,8 @@ class DocumentCardSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
-    def get_preview(self, obj):
-        return document_preview(obj.content)
 
-
-class SnippetSerializer(serializers.ModelSerializer):
+class SnippetSerializer(FolderPathMixin, serializers.ModelSerializer):
     """Serializer for Snippet model"""
 
     project_id = serializers.UUIDField(read_only=True, source="project.id")
@@ -302,6 +302,7 @@ class SnippetSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Snippet
+        list_serializer_class = FolderPathListSerializer
         fields = [
             "id",
             "title",
@@ -329,10 +330,6 @@ class SnippetSerializer(serializers.ModelSerializer):
         if not self.context.get("include_folder_path"):
             self.fields.pop("folder_path", None)
 
-    def get_folder_path(self, obj):
-        """Folders to walk through to reach the snippet, root first."""
-        return [] if obj.folder is None else obj.folder.path()
-
     def validate_title(self, value):
         """Title cannot be empty or whitespace only"""
         if not value or not value.strip():
@@ -384,7 +381,6 @@ class TodoListSerializer(serializers.ModelSerializer):
     """Serializer for TodoList model"""
 
     project_id = serializers.UUIDField(read_only=True, source="project.id")
-    todo_count = serializers.SerializerMethodField()
 
     class Meta:
         model = TodoList
@@ -403,10 +399,6 @@ class TodoListSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
-    def get_todo_count(self, obj):
-        count = getattr(obj, "todo_count", None)
-        return obj.todos.count() if count is None else count
-
     def validate_name(self, value):
         value = value.strip()
         if not value:
@@ -481,3 +473,225 @@ class TODOSerializer(serializers.ModelSerializer):
             )
 
         return data
+
+
+class BatchTodoListField(ScopedTodoListField):
+    """
+    Todo list reference of a TODO batch, read from the lists of the project
+    the batch serializer loaded once, not fetched item by item.
+    """
+
+    def to_internal_value(self, data):
+        todo_lists = self.context["todo_lists"]
+
+        try:
+            return todo_lists[serializers.UUIDField().to_internal_value(data)]
+        except (KeyError, serializers.ValidationError):
+            self.fail("does_not_exist", pk_value=data)
+
+
+class TodoBatchCreateSerializer(TODOSerializer):
+    list = BatchTodoListField(allow_null=True, required=False)
+
+
+class TodoBatchUpdateSerializer(serializers.ModelSerializer):
+    """Fields a batch may change on an existing TODO, each one optional."""
+
+    id = serializers.UUIDField()
+    list = BatchTodoListField(allow_null=True, required=False)
+
+    class Meta:
+        model = TODO
+        fields = ["id", "status", "priority", "list", "is_pinned", "due_date"]
+        extra_kwargs = {
+            "status": {"required": False},
+            "priority": {"required": False},
+            "is_pinned": {"required": False},
+        }
+
+
+class TodoBatchSerializer(serializers.Serializer):
+    """
+    Batch of TODO creates, updates and deletes within one project, validated
+    as a whole: one invalid item refuses the batch, with the errors reported
+    at the position of each item. The TODOs it touches end up in
+    validated_data["todos"], keyed by id.
+    """
+
+    MAX_ITEMS = 500
+
+    # Bounds each list before its items are validated, the total after
+    create = TodoBatchCreateSerializer(
+        many=True, required=False, default=list, max_length=MAX_ITEMS
+    )
+    update = TodoBatchUpdateSerializer(
+        many=True, required=False, default=list, max_length=MAX_ITEMS
+    )
+    delete = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        default=list,
+        max_length=MAX_ITEMS,
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        project = self.context["project"]
+        self.context["todo_lists"] = {
+            todo_list.id: todo_list for todo_list in project.todo_lists.all()
+        }
+
+    def validate(self, data):
+        total = len(data["create"]) + len(data["update"]) + len(data["delete"])
+
+        if not total:
+            raise serializers.ValidationError(
+                "Send at least one TODO to create, update or delete."
+            )
+
+        if total > self.MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"A batch holds at most {self.MAX_ITEMS} TODOs."
+            )
+
+        updated = [item["id"] for item in data["update"]]
+        todos = (
+            TODO.objects.filter(project=self.context["project"])
+            .select_related("project", "list")
+            .in_bulk(updated + data["delete"])
+        )
+        seen = set()
+        errors = {}
+
+        for section, ids in (("update", updated), ("delete", data["delete"])):
+            problems = {}
+
+            for position, todo_id in enumerate(ids):
+                if todo_id not in todos:
+                    problems[position] = "TODO not found in this project."
+                elif todo_id in seen:
+                    problems[position] = "TODO already appears in this batch."
+
+                seen.add(todo_id)
+
+            if problems and section == "update":
+                errors[section] = [
+                    {"id": [problems[position]]} if position in problems else {}
+                    for position in range(len(ids))
+                ]
+            elif problems:
+                errors[section] = {
+                    position: [problem] for position, problem in problems.items()
+                }
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        data["todos"] = todos
+        return data
+
+
+class MoveBatchSerializer(serializers.Serializer):
+    """
+    Items of a batch move, by id. The destination is read like the one of a
+    single move, so only the ids go through here.
+    """
+
+    MAX_ITEMS = 500
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=MAX_ITEMS
+    )
+
+
+class SearchHitSerializer(serializers.ModelSerializer):
+    """
+    Compact result of the global search: what locates the hit, its relevance
+    score, and a plain-text excerpt around the first matched term with the
+    [start, end] spans of the matches inside it. The excerpt is cut from the
+    first of excerpt_sources holding a match, the first non-empty one else.
+    """
+
+    score = serializers.FloatField(read_only=True)
+
+    excerpt_sources = ()
+    excerpt_is_markdown = False
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        terms = self.context.get("search_terms", [])
+        data["excerpt"], data["highlights"] = search_excerpt(
+            self.excerpt_text(instance, terms),
+            terms,
+            markdown=self.excerpt_is_markdown,
+        )
+        return data
+
+    def excerpt_text(self, instance, terms):
+        texts = [getattr(instance, field) or "" for field in self.excerpt_sources]
+        pattern = term_pattern(terms)
+
+        if pattern is not None:
+            for text in texts:
+                if pattern.search(text):
+                    return text
+
+        return next((text for text in texts if text), "")
+
+
+class ProjectHitSerializer(SearchHitSerializer):
+    excerpt_sources = ("description",)
+
+    class Meta:
+        model = Project
+        fields = ["id", "title", "score"]
+        read_only_fields = fields
+
+
+class DocumentHitSerializer(FolderPathMixin, SearchHitSerializer):
+    project_id = serializers.UUIDField(read_only=True)
+    folder = serializers.PrimaryKeyRelatedField(read_only=True)
+    folder_path = serializers.SerializerMethodField()
+
+    excerpt_sources = ("content",)
+    excerpt_is_markdown = True
+
+    class Meta:
+        model = Document
+        list_serializer_class = FolderPathListSerializer
+        fields = ["id", "title", "project_id", "folder", "folder_path", "score"]
+        read_only_fields = fields
+
+
+class SnippetHitSerializer(FolderPathMixin, SearchHitSerializer):
+    project_id = serializers.UUIDField(read_only=True)
+    folder = serializers.PrimaryKeyRelatedField(read_only=True)
+    folder_path = serializers.SerializerMethodField()
+
+    excerpt_sources = ("description", "content")
+
+    class Meta:
+        model = Snippet
+        list_serializer_class = FolderPathListSerializer
+        fields = [
+            "id",
+            "title",
+            "language",
+            "project_id",
+            "folder",
+            "folder_path",
+            "score",
+        ]
+        read_only_fields = fields
+
+
+class TodoHitSerializer(SearchHitSerializer):
+    project_id = serializers.UUIDField(read_only=True)
+    list = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    excerpt_sources = ("description",)
+
+    class Meta:
+        model = TODO
+        fields = ["id", "title", "status", "priority", "project_id", "list", "score"]
+        read_only_fields = fields
@@ -0,0 +1,109 @@
+"""Model hooks keeping the search index, the counters and the change log in step."""
+
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+
+from . import changes, counters, search
+from .models import Project, TodoList
+
+
+def index_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Reindex an object after a save, unless the save only touched fields the
+    index does not read, like the stamp set when a project is opened.
+    """
+    if raw:
+        return
+
+    if update_fields is not None and not set(update_fields) & set(
+        search.indexed_fields(instance)
+    ):
+        return
+
+    search.index(instance)
+
+
+def unindex_deleted(sender, instance, **kwargs):
+    search.unindex(instance)
+
+
+for model in search.INDEXED:
+    post_save.connect(
+        index_saved, sender=model, dispatch_uid=f"search_index_{model.__name__}"
+    )
+    post_delete.connect(
+        unindex_deleted, sender=model, dispatch_uid=f"search_unindex_{model.__name__}"
+    )
+
+
+def remember_counted(sender, instance, **kwargs):
+    counters.remember(instance)
+
+
+def read_counted(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        counters.saving(instance, update_fields)
+
+
+def count_saved(
+    sender, instance, created=False, raw=False, update_fields=None, **kwargs
+):
+    if not raw:
+        changes.saved(instance, counters.saved(instance, created, update_fields))
+
+
+def uncount_deleted(sender, instance, origin=None, **kwargs):
+    """Move the counters an object leaves, unless its parents go with it."""
+    if changes.deleted_with_project(origin):
+        return
+
+    changes.deleted(instance, counters.deleted(instance), origin)
+
+
+for model in counters.COUNTED:
+    post_init.connect(
+        remember_counted, sender=model, dispatch_uid=f"counted_{model.__name__}"
+    )
+    pre_save.connect(
+        read_counted, sender=model, dispatch_uid=f"read_counted_{model.__name__}"
+    )
+    post_save.connect(count_saved, sender=model, dispatch_uid=f"count_{model.__name__}")
+    post_delete.connect(
+        uncount_deleted, sender=model, dispatch_uid=f"uncount_{model.__name__}"
+    )
+
+
+def log_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        changes.saved(instance)
+
+
+def log_deleted(sender, instance, origin=None, **kwargs):
+    changes.deleted(instance, origin=origin)
+
+
+def log_project_deleted(sender, instance, origin=None, **kwargs):
+    if not changes.deleted_with_account(origin):
+        changes.project_deleted(instance)
+
+
+def log_released(sender, instance, origin=None, **kwargs):
+    """Deleting a list unclassifies its todos, with no signal of their own."""
+    if not changes.deleted_with_project(origin):
+        changes.record_rows(instance.todos.all(), changes.owner_of(instance))
+
+
+# Counted models are logged by the counter hooks, with the rows they move
+for model in changes.KINDS.keys() - counters.COUNTED.keys():
+    post_save.connect(log_saved, sender=model, dispatch_uid=f"log_{model.__name__}")
+
+pre_delete.connect(
+    log_project_deleted, sender=Project, dispatch_uid="log_deleted_Project"
+)
+post_delete.connect(log_deleted, sender=TodoList, dispatch_uid="log_deleted_TodoList")
+pre_delete.connect(log_released, sender=TodoList, dispatch_uid="log_released_todos")
@@ -0,0 +1,303 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from workspace.models import TODO, Document, Folder, Project, Snippet, TodoList
+
+User = get_user_model()
+
+
+class FolderCountersTest(TestCase):
+    """Tests for the counts of direct children kept on folders"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="foldercounters@test.com", password="TestPass123!"
+        )
+        self.project = Project.objects.create(user=self.user, title="Counters")
+        self.folder = Folder.objects.create(name="Docs", project=self.project)
+
+    def counts(self, folder):
+        folder.refresh_from_db()
+        return folder.folder_count, folder.document_count, folder.snippet_count
+
+    def test_creating_children_counts_them(self):
+        Folder.objects.create(name="Child", project=self.project, parent=self.folder)
+        Document.objects.create(title="Doc", project=self.project, folder=self.folder)
+        Document.objects.create(title="Loose", project=self.project)
+
+        self.assertEqual(self.counts(self.folder), (1, 1, 0))
+
+    def test_snippets_count_in_snippet_folders(self):
+        folder = Folder.objects.create(
+            name="Code", project=self.project, resource_type="snippets"
+        )
+        Snippet.objects.create(
+            title="Snippet", content="x", project=self.project, folder=folder
+        )
+
+        self.assertEqual(self.counts(folder), (0, 0, 1))
+
+    def test_deleting_children_uncounts_them(self):
+        child = Folder.objects.create(
+            name="Child", project=self.project, parent=self.folder
+        )
+        document = Document.objects.create(
+            title="Doc", project=self.project, folder=self.folder
+        )
+
+        child.delete()
+        document.delete()
+
+        self.assertEqual(self.counts(self.folder), (0, 0, 0))
+
+    def test_moving_a_document_shifts_both_folders(self):
+        other = Folder.objects.create(name="Other", project=self.project)
+        document = Document.objects.create(
+            title="Doc", project=self.project, folder=self.folder
+        )
+
+        document.folder = other
+        document.save()
+
+        self.assertEqual(self.counts(self.folder), (0, 0, 0))
+        self.assertEqual(self.counts(other), (0, 1, 0))
+
+    def test_moving_a_folder_shifts_both_parents(self):
+        other = Folder.objects.create(name="Other", project=self.project)
+        child = Folder.objects.create(
+            name="Child", project=self.project, parent=self.folder
+        )
+
+        child.move_to(self.project, other)
+
+        self.assertEqual(self.counts(self.folder), (0, 0, 0))
+        self.assertEqual(self.counts(other), (1, 0, 0))
+
+    def test_deleting_a_branch_uncounts_it_from_the_parent(self):
+        child = Folder.objects.create(
+            name="Child", project=self.project, parent=self.folder
+        )
+        grandchild = Folder.objects.create(
+            name="Grandchild", project=self.project, parent=child
+        )
+        Document.objects.create(title="Deep", project=self.project, folder=grandchild)
+
+        child.delete()
+
+        self.assertEqual(self.counts(self.folder), (0, 0, 0))
+
+    def test_saving_a_stale_folder_keeps_its_counters(self):
+        stale = Folder.objects.get(id=self.folder.id)
+        Document.objects.create(title="Doc", project=self.project, folder=self.folder)
+
+        stale.name = "Renamed"
+        stale.save()
+
+        self.assertEqual(self.counts(self.folder), (0, 1, 0))
+
+    def test_saving_a_deferred_document_reads_its_stored_folder(self):
+        other = Folder.objects.create(name="Other", project=self.project)
+        document = Document.objects.create(
+            title="Doc", project=self.project, folder=self.folder
+        )
+        deferred = Document.objects.only("id", "title").get(id=document.id)
+
+        deferred.folder = other
+        deferred.save()
+
+        self.assertEqual(self.counts(self.folder), (0, 0, 0))
+        self.assertEqual(self.counts(other), (0, 1, 0))
+
+    def test_saving_unrelated_fields_runs_no_counter_update(self):
+        document = Document.objects.create(
+            title="Doc", project=self.project, folder=self.folder
+        )
+
+        with CaptureQueriesContext(connection) as captured:
+            document.save(update_fields=["title"])
+
+        self.assertFalse(
+            any('UPDATE "devnote_folders"' in query["sql"] for query in captured)
+        )
+
+
+class TodoCountersTest(TestCase):
+    """Tests for the open TODO count of projects and the count of lists"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="todocounters@test.com", password="TestPass123!"
+        )
+        self.project = Project.objects.create(user=self.user, title="Counters")
+        self.todo_list = TodoList.objects.create(name="Sprint", project=self.project)
+
+    def open_todos(self, project):
+        project.refresh_from_db()
+        return project.open_todos_count
+
+    def todos_in(self, todo_list):
+        todo_list.refresh_from_db()
+        return todo_list.todo_count
+
+    def test_only_open_todos_count_on_the_project(self):
+        TODO.objects.create(title="Open", project=self.project)
+        TODO.objects.create(title="Started", project=self.project, status="in_progress")
+        TODO.objects.create(title="Done", project=self.project, status="done")
+
+        self.assertEqual(self.open_todos(self.project), 2)
+
+    def test_status_changes_move_the_open_count(self):
+        todo = TODO.objects.create(title="Task", project=self.project)
+
+        todo.status = "done"
+        todo.save()
+        self.assertEqual(self.open_todos(self.project), 0)
+
+        todo.status = "pending"
+        todo.save(update_fields=["status"])
+        self.assertEqual(self.open_todos(self.project), 1)
+
+    def test_moving_a_todo_shifts_projects_and_lists(self):
+        other = Project.objects.create(user=self.user, title="Other")
+        todo = TODO.objects.create(
+            title="Task", project=self.project, list=self.todo_list
+        )
+
+        todo.project = other
+        todo.list = None
+        todo.save()
+
+        self.assertEqual(self.open_todos(self.project), 0)
+        self.assertEqual(self.open_todos(other), 1)
+        self.assertEqual(self.todos_in(self.todo_list), 0)
+
+    def test_deleting_a_todo_uncounts_it(self):
+        todo = TODO.objects.create(
+            title="Task", project=self.project, list=self.todo_list
+        )
+
+        todo.delete()
+
+        self.assertEqual(self.open_todos(self.project), 0)
+        self.assertEqual(self.todos_in(self.todo_list), 0)
+
+    def test_deleting_a_project_moves_no_counter(self):
+        """Test : the rows counting what a project holds go with it, untouched"""
+        folder = Folder.objects.create(name="Docs", project=self.project)
+        Document.objects.create(title="Doc", project=self.project, folder=folder)
+        TODO.objects.create(title="Task", project=self.project, list=self.todo_list)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.project.delete()
+
+        counted = (
+            'UPDATE "devnote_folders"',
+            'UPDATE "devnote_projects"',
+            'UPDATE "devnote_todo_lists"',
+        )
+        self.assertFalse(any(query["sql"].startswith(counted) for query in captured))
+
+    def test_saving_a_stale_project_keeps_its_counter(self):
+        stale = Project.objects.get(id=self.project.id)
+        TODO.objects.create(title="Task", project=self.project)
+
+        stale.title = "Renamed"
+        stale.save()
+
+        self.assertEqual(self.open_todos(self.project), 1)
+
+
+class RecountCommandTest(TestCase):
+    """Tests for the repair of drifted counters"""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email="recount@test.com", password="TestPass123!"
+        )
+        self.project = Project.objects.create(user=user, title="Recount")
+        self.folder = Folder.objects.create(name="Docs", project=self.project)
+        self.todo_list = TodoList.objects.create(name="Sprint", project=self.project)
+
+        Folder.objects.create(name="Child", project=self.project, parent=self.folder)
+        Document.objects.create(title="Doc", project=self.project, folder=self.folder)
+        TODO.objects.create(title="Task", project=self.project, list=self.todo_list)
+        TODO.objects.create(title="Done", project=self.project, status="done")
+
+    def test_recount_repairs_every_counter(self):
+        Folder.objects.update(folder_count=7, document_count=7, snippet_count=7)
+        Project.objects.update(open_todos_count=7)
+        TodoList.objects.update(todo_count=7)
+        output = StringIO()
+
+        call_command("recount", stdout=output)
+
+        self.folder.refresh_from_db()
+        self.project.refresh_from_db()
+        self.todo_list.refresh_from_db()
+        self.assertEqual(
+            (
+                self.folder.folder_count,
+                self.folder.document_count,
+                self.folder.snippet_count,
+            ),
+            (1, 1, 0),
+        )
+        self.assertEqual(self.project.open_todos_count, 1)
+        self.assertEqual(self.todo_list.todo_count, 1)
+        self.assertIn("Counters recounted", output.getvalue())
+
+
+class CounterListingsTest(APITestCase):
+    """Tests that listings read the counters instead of counting"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="counterlistings@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(user=self.user, title="Listings")
+        self.folder = Folder.objects.create(name="Docs", project=self.project)
+        self.todo_list = TodoList.objects.create(name="Sprint", project=self.project)
+
+        Document.objects.create(title="Doc", project=self.project, folder=self.folder)
+        TODO.objects.create(title="Task", project=self.project, list=self.todo_list)
+
+    def assert_counts_nothing(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            any(
+                "COUNT(" in query["sql"].upper() and "GROUP BY" in query["sql"].upper()
+                for query in captured
+            )
+        )
+
+        return response
+
+    def test_folder_listing_reads_the_counters(self):
+        response = self.assert_counts_nothing(
+            f"/api/projects/{self.project.id}/folders/"
+        )
+
+        self.assertEqual(response.data["results"][0]["document_count"], 1)
+
+    def test_project_listing_reads_the_counter(self):
+        response = self.assert_counts_nothing("/api/projects/")
+
+        self.assertEqual(response.data["results"][0]["open_todos_count"], 1)
+
+    def test_todo_list_listing_reads_the_counter(self):
+        response = self.assert_counts_nothing(
+            f"/api/projects/{self.project.id}/todo-lists/"
+        )
+
+        self.assertEqual(response.data["results"][0]["todo_count"], 1)
@@ -1,6 +1,13 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
-from workspace.preview import document_preview, markdown_to_plain_text
+from workspace.models import Document, Project
+from workspace.preview import document_preview, markdown_to_plain_text, search_excerpt
+
+User = get_user_model()
 
 
 class MarkdownToPlainTextTest(TestCase):
@@ -108,3 +115,97 @@ class DocumentPreviewTest(TestCase):
 
     def test_empty_content(self):
         self.assertEqual(document_preview(""), "")
+
+
+class StoredPreviewTest(TestCase):
+    """Tests for the preview stored on the document when it is saved"""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username="storedpreviewuser",
+            email="storedpreview@test.com",
+            password="TestPass123!",
+        )
+        self.project = Project.objects.create(title="Preview Project", user=user)
+
+    def test_preview_is_stored_on_create(self):
+        document = Document.objects.create(
+            title="Plan", content="# Plan\n\n**Ship** it", project=self.project
+        )
+
+        document.refresh_from_db()
+        self.assertEqual(document.preview, "Plan Ship it")
+
+    def test_preview_follows_a_content_update(self):
+        document = Document.objects.create(
+            title="Plan", content="Before", project=self.project
+        )
+        document.content = "_After_"
+        document.save(update_fields=["content"])
+
+        document.refresh_from_db()
+        self.assertEqual(document.preview, "After")
+
+    def test_saving_other_fields_leaves_the_preview_alone(self):
+        document = Document.objects.create(
+            title="Plan", content="Body", project=self.project
+        )
+        Document.objects.filter(id=document.id).update(preview="Stale")
+        document.title = "Renamed"
+        document.save(update_fields=["title"])
+
+        document.refresh_from_db()
+        self.assertEqual(document.preview, "Stale")
+
+    def test_backfill_command_fills_missing_previews(self):
+        filled = Document.objects.create(
+            title="Filled", content="**Done**", project=self.project
+        )
+        missing = Document.objects.create(
+            title="Missing", content="`Code` here", project=self.project
+        )
+        Document.objects.filter(id=missing.id).update(preview="")
+        Document.objects.filter(id=filled.id).update(preview="Kept")
+        output = StringIO()
+
+        call_command("backfill_document_previews", stdout=output)
+
+        self.assertEqual(Document.objects.get(id=missing.id).preview, "Code here")
+        self.assertEqual(Document.objects.get(id=filled.id).preview, "Kept")
+        self.assertIn("Updated 1 document previews", output.getvalue())
+
+    def test_backfill_command_can_recompute_every_preview(self):
+        document = Document.objects.create(
+            title="Stale", content="**Fresh**", project=self.project
+        )
+        Document.objects.filter(id=document.id).update(preview="Stale")
+
+        call_command("backfill_document_previews", "--all", stdout=StringIO())
+
+        self.assertEqual(Document.objects.get(id=document.id).preview, "Fresh")
+
+
+class SearchExcerptTest(TestCase):
+    """Tests for the excerpts shown under search hits"""
+
+    def test_match_is_highlighted(self):
+        excerpt, highlights = search_excerpt("Fix the **JWT** check", ["jwt"], True)
+
+        self.assertEqual(excerpt, "Fix the JWT check")
+        self.assertEqual(highlights, [[8, 11]])
+
+    def test_only_word_prefixes_match(self):
+        _excerpt, highlights = search_excerpt("deploy redeploy", ["dep"])
+
+        self.assertEqual(highlights, [[0, 3]])
+
+    def test_window_moves_to_a_distant_match(self):
+        excerpt, highlights = search_excerpt("word " * 1000 + "deploy", ["dep"])
+
+        self.assertTrue(excerpt.startswith("…"))
+        self.assertTrue(excerpt.endswith("deploy"))
+        self.assertEqual(len(highlights), 1)
+
+    def test_without_a_match_the_opening_is_kept(self):
+        self.assertEqual(search_excerpt("plain text", ["zzz"]), ("plain text", []))
+        self.assertEqual(search_excerpt("", ["zzz"]), ("", []))
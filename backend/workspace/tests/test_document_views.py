@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -49,9 +51,10 @@ class DocumentViewTest(APITestCase):
         # Number of documents
         self.assertEqual(len(documents), 1)
 
-        # Content of the document
+        # Listed as a card: the preview stands in for the content
         self.assertEqual(documents[0]["title"], self.document.title)
-        self.assertEqual(documents[0]["content"], self.document.content)
+        self.assertEqual(documents[0]["preview"], self.document.preview)
+        self.assertNotIn("content", documents[0])
 
         # Check UUID is present
         self.assertIn("id", documents[0])
@@ -570,3 +573,63 @@ class ProjectPinnedViewTest(APITestCase):
         self.assertEqual(response.data["count"], 25)
         self.assertEqual(len(response.data["results"]), 20)
         self.assertIsNotNone(response.data["next"])
+
+
+class DocumentColumnsTest(APITestCase):
+    """Tests for the columns each document route loads"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="columnsuser", email="columns@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.project = Project.objects.create(title="Columns Project", user=self.user)
+        self.document = Document.objects.create(
+            title="Long document", content="word " * 20000, project=self.project
+        )
+
+    def document_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [
+            query["sql"]
+            for query in captured
+            if query["sql"].startswith("SELECT")
+            and 'FROM "devnote_documents"' in query["sql"]
+        ]
+
+    def test_listing_does_not_load_the_content(self):
+        """Test that a listing page leaves the bodies in the database"""
+        queries = self.document_queries(f"/api/projects/{self.project.id}/documents/")
+
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertNotIn('"devnote_documents"."content"', sql)
+
+    def test_detail_loads_the_content(self):
+        """Test that opening a document still reads its body"""
+        queries = self.document_queries(f"/api/documents/{self.document.id}/")
+
+        self.assertTrue(any('"devnote_documents"."content"' in sql for sql in queries))
+
+    def test_search_hits_skip_the_stored_preview(self):
+        """Test that search loads the text it excerpts, not the card preview"""
+        queries = self.document_queries("/api/search/?q=word&type=documents")
+
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertNotIn('"devnote_documents"."preview"', sql)
+
+    def test_update_through_a_deferred_listing_keeps_the_preview(self):
+        """Test that saving still refreshes the preview of the content"""
+        response = self.client.patch(
+            f"/api/documents/{self.document.id}/", {"content": "**Short** now"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.preview, "Short now")
@@ -0,0 +1,150 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from workspace.admin import TODOAdmin
+from workspace.models import TODO, Document, Folder, Project, TodoList
+
+User = get_user_model()
+
+
+class ConditionalGetTest(APITestCase):
+    """Tests for the ETags and 304s of the workspace listings and objects"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="etag@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(title="Deploy", user=self.user)
+        self.root = Folder.objects.create(name="Ops", project=self.project)
+        self.folder = Folder.objects.create(
+            name="Runbooks", project=self.project, parent=self.root
+        )
+        self.document = Document.objects.create(
+            title="Rollback",
+            content="x" * 100_000,
+            project=self.project,
+            folder=self.folder,
+        )
+
+    def revalidate(self, url, tag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=tag)
+
+    def assertChanges(self, url, change):
+        """Test : <url> answers 304 to its ETag until <change> runs"""
+        tag = self.client.get(url)["ETag"]
+        self.assertEqual(
+            self.revalidate(url, tag).status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        change()
+
+        response = self.revalidate(url, tag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], tag)
+
+    def test_unchanged_document_is_not_sent_again(self):
+        url = f"/api/documents/{self.document.id}/"
+        response = self.client.get(url)
+
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+        with CaptureQueriesContext(connection) as captured:
+            again = self.revalidate(url, response["ETag"])
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again["ETag"], response["ETag"])
+        self.assertNotIn("content", " ".join(query["sql"] for query in captured))
+
+    def test_weak_and_wildcard_validators_match(self):
+        url = f"/api/documents/{self.document.id}/"
+        tag = self.client.get(url)["ETag"]
+
+        for header in (f'"stale", W/{tag}', "*"):
+            with self.subTest(header=header):
+                self.assertEqual(
+                    self.revalidate(url, header).status_code,
+                    status.HTTP_304_NOT_MODIFIED,
+                )
+
+    def test_document_changes_with_its_folder_path(self):
+        def rename():
+            self.root.name = "Operations"
+            self.root.save()
+
+        self.assertChanges(f"/api/documents/{self.document.id}/", rename)
+
+    def test_listing_changes_on_delete(self):
+        other = Document.objects.create(title="Deploy", project=self.project)
+
+        self.assertChanges("/api/documents/", other.delete)
+
+    def test_folder_changes_with_its_counters(self):
+        self.assertChanges(
+            f"/api/folders/{self.folder.id}/",
+            lambda: Document.objects.create(
+                title="Restore", project=self.project, folder=self.folder
+            ),
+        )
+
+    def test_project_listing_changes_with_its_todos(self):
+        todo = TODO.objects.create(title="Tag the release", project=self.project)
+
+        def close():
+            todo.status = "done"
+            todo.save()
+
+        self.assertChanges("/api/projects/", close)
+
+    def test_todo_lists_change_when_a_todo_moves(self):
+        first = TodoList.objects.create(name="Sprint", project=self.project)
+        second = TodoList.objects.create(name="Backlog", project=self.project)
+        todo = TODO.objects.create(title="Tag", project=self.project, list=first)
+
+        def move():
+            todo.list = second
+            todo.save()
+
+        self.assertChanges(f"/api/projects/{self.project.id}/todo-lists/", move)
+
+    def test_todo_changes_when_its_list_goes(self):
+        todo_list = TodoList.objects.create(name="Sprint", project=self.project)
+        todo = TODO.objects.create(title="Tag", project=self.project, list=todo_list)
+
+        self.assertChanges(f"/api/todos/{todo.id}/", todo_list.delete)
+
+    def test_todos_change_with_an_admin_bulk_status(self):
+        todo = TODO.objects.create(title="Tag", project=self.project)
+        todo_admin = TODOAdmin(TODO, admin.site)
+
+        def mark_as_done():
+            with mock.patch.object(TODOAdmin, "message_user"):
+                todo_admin.mark_as_done(None, TODO.objects.filter(id=todo.id))
+
+        self.assertChanges(f"/api/todos/{todo.id}/", mark_as_done)
+
+    def test_validators_are_per_user(self):
+        url = "/api/projects/?archived=true"
+        tag = self.client.get(url)["ETag"]
+
+        other = User.objects.create_user(
+            email="other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=other)
+
+        self.assertEqual(self.revalidate(url, tag).status_code, status.HTTP_200_OK)
+
+    def test_missing_objects_still_not_found(self):
+        for url in ("/api/documents/not-a-uuid/", f"/api/todos/{self.project.id}/"):
+            with self.subTest(url=url):
+                response = self.revalidate(url, "*")
+
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+                self.assertNotIn("ETag", response)
@@ -189,6 +189,70 @@ class FolderModelTest(TestCase):
         )
 
 
+class FolderTreePathTest(TestCase):
+    """Tests for the materialized path indexing the folder tree"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="treepathuser", email="treepath@test.com", password="TestPass123!"
+        )
+        self.project = Project.objects.create(title="Tree", user=self.user)
+        self.root = Folder.objects.create(name="Root", project=self.project)
+        self.child = Folder.objects.create(
+            name="Child", project=self.project, parent=self.root
+        )
+        self.leaf = Folder.objects.create(
+            name="Leaf", project=self.project, parent=self.child
+        )
+
+    def test_path_chains_the_ids_from_the_root(self):
+        self.assertEqual(self.root.tree_path, f"{self.root.id.hex}/")
+        self.assertEqual(
+            Folder.path_ids(self.leaf.tree_path),
+            [self.root.id, self.child.id, self.leaf.id],
+        )
+
+    def test_ancestors_need_no_query(self):
+        leaf = Folder.objects.get(id=self.leaf.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(leaf.ancestor_ids(), [self.child.id, self.root.id])
+
+    def test_descendants_and_counts_stay_one_query_each(self):
+        with self.assertNumQueries(1):
+            self.assertCountEqual(
+                self.root.descendant_ids(), [self.child.id, self.leaf.id]
+            )
+
+        with self.assertNumQueries(1):
+            self.root.cascade_counts()
+
+    def test_moving_a_folder_repaths_its_branch(self):
+        other = Folder.objects.create(name="Other", project=self.project)
+
+        self.child.move_to(self.project, other)
+
+        self.leaf.refresh_from_db()
+        self.assertEqual(
+            Folder.path_ids(self.leaf.tree_path),
+            [other.id, self.child.id, self.leaf.id],
+        )
+        self.assertEqual(self.root.descendant_ids(), [])
+
+    def test_stale_instance_keeps_the_stored_chain(self):
+        stale_leaf = Folder.objects.get(id=self.leaf.id)
+        other = Folder.objects.create(name="Other", project=self.project)
+        self.child.move_to(self.project, other)
+
+        stale_leaf.name = "Renamed"
+        stale_leaf.save()
+
+        self.assertEqual(
+            Folder.path_ids(stale_leaf.tree_path),
+            [other.id, self.child.id, self.leaf.id],
+        )
+
+
 class DocumentFolderFieldTest(TestCase):
     """Tests for the folder field added to Document"""
 
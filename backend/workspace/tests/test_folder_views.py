@@ -4,7 +4,8 @@ from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from workspace.models import Document, Folder, Project
+from workspace.models import Document, Folder, Project, SearchPosting, Snippet
+from workspace.views import delete_folder_branch
 
 User = get_user_model()
 
@@ -610,6 +611,17 @@ class ContentsPayloadTest(APITestCase):
         self.assertLessEqual(len(entry["preview"]), 221)
         self.assertTrue(entry["preview"].endswith("…"))
 
+    def test_listing_never_loads_document_content(self):
+        """Test that the gallery reads the stored preview, not the Markdown"""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(f"/api/projects/{self.project.id}/contents/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.entry(response)["preview"])
+        self.assertFalse(
+            any('"devnote_documents"."content"' in query["sql"] for query in captured)
+        )
+
     def test_payload_stays_small_for_long_documents(self):
         """Test that the response no longer carries whole document bodies"""
         for index in range(10):
@@ -643,6 +655,128 @@ class ContentsPayloadTest(APITestCase):
         self.assertNotIn("preview", response.data)
 
 
+class ContentsCursorPaginationTest(APITestCase):
+    """Tests for the cursor mode of the contents listings"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="contentscursoruser",
+            email="contentscursor@test.com",
+            password="TestPass123!",
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.project = Project.objects.create(title="Cursor Project", user=self.user)
+        self.folder = Folder.objects.create(name="Archives", project=self.project)
+        self.url = f"/api/folders/{self.folder.id}/contents/"
+
+        for index in range(15):
+            Folder.objects.create(
+                name=f"Child {index:02d}", project=self.project, parent=self.folder
+            )
+
+        for index in range(15):
+            Document.objects.create(
+                title=f"Document {index:02d}", project=self.project, folder=self.folder
+            )
+
+    def walk(self, url, params=None):
+        """Follow the next links from a first page, returning every page"""
+        pages = []
+        response = self.client.get(url, params)
+
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+
+            if response.data["next"] is None:
+                return pages
+
+            response = self.client.get(response.data["next"])
+
+    def test_cursor_pages_match_numbered_pages(self):
+        """Test that both modes list the same entries in the same order"""
+        numbered = self.walk(self.url)
+        cursored = self.walk(self.url, {"pagination": "cursor", "limit": 7})
+
+        self.assertEqual(len(cursored), 5)
+        self.assertEqual(
+            [entry["id"] for page in cursored for entry in page["results"]],
+            [entry["id"] for page in numbered for entry in page["results"]],
+        )
+
+    def test_cursor_page_shape_skips_the_count(self):
+        """Test that a cursor page is not counted unless asked for"""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url, {"pagination": "cursor"})
+
+        self.assertEqual(set(response.data.keys()), {"next", "results"})
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertFalse(any("COUNT(*)" in query["sql"].upper() for query in captured))
+
+        counted = self.client.get(self.url, {"pagination": "cursor", "count": "true"})
+
+        self.assertEqual(counted.data["count"], 30)
+
+    def test_deep_page_seeks_without_offset(self):
+        """Test that a page past the first one is seeked, not offset"""
+        first = self.client.get(self.url, {"pagination": "cursor", "limit": 20})
+
+        with CaptureQueriesContext(connection) as captured:
+            second = self.client.get(first.data["next"])
+
+        self.assertEqual(len(second.data["results"]), 10)
+        self.assertTrue(
+            all(entry["type"] == "document" for entry in second.data["results"])
+        )
+
+        row_queries = [
+            query["sql"].upper()
+            for query in captured
+            if "devnote_documents" in query["sql"] or "devnote_folders" in query["sql"]
+        ]
+
+        self.assertTrue(row_queries)
+        for sql in row_queries:
+            self.assertNotIn("OFFSET", sql)
+            self.assertNotIn("COUNT(*)", sql)
+
+    def test_cursor_survives_entries_inserted_before_it(self):
+        """Test that new entries ahead of a cursor do not shift its page"""
+        first = self.client.get(self.url, {"pagination": "cursor", "limit": 10})
+        Folder.objects.create(name="Aardvark", project=self.project, parent=self.folder)
+
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(second.data["results"][0]["name"], "Child 10")
+
+    def test_root_contents_accepts_a_cursor(self):
+        """Test that the project root pages by cursor too"""
+        Document.objects.create(title="Root document", project=self.project)
+
+        pages = self.walk(
+            f"/api/projects/{self.project.id}/contents/",
+            {"pagination": "cursor", "limit": 1},
+        )
+
+        self.assertEqual(
+            [page["results"][0]["type"] for page in pages], ["folder", "document"]
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test that a tampered cursor yields a 400"""
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cursor", response.data)
+
+    def test_unknown_pagination_mode_is_rejected(self):
+        """Test that only the page and cursor modes are accepted"""
+        response = self.client.get(self.url, {"pagination": "offset"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class FolderCountsTest(APITestCase):
     """Tests for the direct counts exposed on folder payloads"""
 
@@ -734,6 +868,112 @@ class FolderCountsTest(APITestCase):
         self.assertEqual(response.data["document_count"], 1)
 
 
+class FolderBranchDeleteTest(APITestCase):
+    """Tests for the chunked delete of a folder with its branch"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="branchdeleteuser",
+            email="branchdelete@test.com",
+            password="TestPass123!",
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.project = Project.objects.create(title="Branches", user=self.user)
+        self.parent = Folder.objects.create(name="Parent", project=self.project)
+        self.folder = Folder.objects.create(
+            name="Doomed", project=self.project, parent=self.parent
+        )
+        self.sibling = Folder.objects.create(
+            name="Sibling", project=self.project, parent=self.parent
+        )
+
+    def grow(self, depth, documents_per_folder):
+        """Nest <depth> folders under self.folder, each holding documents."""
+        folder = self.folder
+        documents = []
+
+        for level in range(depth):
+            documents += [
+                Document.objects.create(
+                    title=f"Deploy notes {level}-{index}",
+                    project=self.project,
+                    folder=folder,
+                )
+                for index in range(documents_per_folder)
+            ]
+            folder = Folder.objects.create(
+                name=f"Level {level}", project=self.project, parent=folder
+            )
+
+        return documents
+
+    def test_branch_goes_in_chunks(self):
+        """Test : chunks smaller than the branch still delete all of it"""
+        documents = self.grow(depth=4, documents_per_folder=3)
+        kept = Document.objects.create(
+            title="Deploy notes kept", project=self.project, folder=self.sibling
+        )
+
+        delete_folder_branch(self.folder, chunk_size=2)
+
+        self.assertEqual(
+            set(Folder.objects.values_list("id", flat=True)),
+            {self.parent.id, self.sibling.id},
+        )
+        self.assertEqual(list(Document.objects.all()), [kept])
+        self.assertFalse(
+            SearchPosting.objects.filter(
+                object_id__in=[document.id for document in documents]
+            )
+        )
+        self.assertTrue(SearchPosting.objects.filter(object_id=kept.id))
+
+        self.parent.refresh_from_db()
+        self.assertEqual(self.parent.folder_count, 1)
+
+    def test_snippet_branch_goes_too(self):
+        folder = Folder.objects.create(
+            name="Helpers", project=self.project, resource_type="snippets"
+        )
+        child = Folder.objects.create(
+            name="Nested",
+            project=self.project,
+            parent=folder,
+            resource_type="snippets",
+        )
+        Snippet.objects.create(
+            title="Helper", content="pass", project=self.project, folder=child
+        )
+
+        response = self.client.delete(f"/api/folders/{folder.id}/?confirm=true")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Snippet.objects.exists())
+        self.assertFalse(Folder.objects.filter(id__in=[folder.id, child.id]))
+
+    def test_queries_do_not_grow_with_the_branch(self):
+        """Test : a branch within one chunk is one statement per table"""
+        counts = []
+
+        for depth, documents_per_folder in ((2, 2), (6, 8)):
+            self.grow(depth, documents_per_folder)
+
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.delete(
+                    f"/api/folders/{self.folder.id}/?confirm=true"
+                )
+
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            counts.append(len(captured))
+
+            self.folder = Folder.objects.create(
+                name="Doomed", project=self.project, parent=self.parent
+            )
+
+        self.assertEqual(counts[0], counts[1])
+
+
 class DocumentFolderViewTest(APITestCase):
     """Tests for the folder field on the Document endpoints"""
 
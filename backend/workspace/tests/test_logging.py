@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from devnote.log import JSONFormatter, QueuedHandler
+
+
+class Collector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((threading.current_thread(), record))
+
+
+def record_of(message, *args, exc_info=None, **extra):
+    record = logging.LogRecord(
+        "accounts", logging.INFO, __file__, 1, message, args, exc_info
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+class JSONFormatterTest(SimpleTestCase):
+    """Tests for the JSON lines of the log file"""
+
+    def test_records_are_json_objects(self):
+        entry = json.loads(
+            JSONFormatter().format(record_of("Deleted %d rows", 3, user_id=7))
+        )
+
+        self.assertEqual(entry["message"], "Deleted 3 rows")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "accounts")
+        self.assertEqual(entry["user_id"], 7)
+        self.assertNotIn("args", entry)
+
+    def test_exceptions_are_kept(self):
+        try:
+            raise ValueError("boom")
+        except ValueError as error:
+            record = record_of("Failed", exc_info=(ValueError, error, None))
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertIn("ValueError: boom", entry["exception"])
+
+
+class QueuedHandlerTest(SimpleTestCase):
+    """Tests for the handing of records to the listener thread"""
+
+    def setUp(self):
+        self.handler = QueuedHandler(
+            [{"class": "workspace.tests.test_logging.Collector", "level": "INFO"}]
+        )
+        self.addCleanup(self.handler.close)
+        (self.collector,) = self.handler.targets
+
+        self.logger = logging.getLogger("devnote.tests.queue")
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def test_records_are_emitted_off_the_logging_thread(self):
+        self.logger.info("Queued")
+        self.handler.close()
+
+        ((thread, record),) = self.collector.records
+        self.assertIsNot(thread, threading.current_thread())
+        self.assertEqual(record.getMessage(), "Queued")
+
+    def test_messages_are_rendered_when_logged(self):
+        names = ["first"]
+        self.logger.info("Names: %s", names)
+        names.append("second")
+        self.handler.close()
+
+        ((_, record),) = self.collector.records
+        self.assertEqual(record.getMessage(), "Names: ['first']")
+
+    def test_disabled_levels_format_nothing(self):
+        class Unprintable:
+            def __str__(self):
+                raise AssertionError("formatted")
+
+        self.logger.debug("User %s", Unprintable())
+        self.handler.close()
+
+        self.assertEqual(self.collector.records, [])
+
+    def test_listener_starts_with_the_first_record(self):
+        self.assertIsNone(self.handler.listener)
+
+        self.logger.info("First")
+
+        self.assertTrue(self.handler.listener._thread.is_alive())
+
+    def test_forked_process_starts_its_own_listener(self):
+        self.logger.info("Parent")
+        parent = self.handler.listener
+
+        with mock.patch("devnote.log.os.getpid", return_value=-1):
+            self.logger.info("Child")
+            self.assertIsNot(self.handler.listener, parent)
+            self.handler.close()
+
+        parent.stop()
+        self.assertEqual(
+            [record.getMessage() for _, record in self.collector.records],
+            ["Parent", "Child"],
+        )
+
+    def test_full_queue_drops_records(self):
+        handler = QueuedHandler([], maxsize=1)
+        self.addCleanup(handler.close)
+        # As if listening, without a listener taking the records off
+        handler.pid = os.getpid()
+        self.addCleanup(setattr, handler, "pid", None)
+
+        for message in ("Kept", "Dropped"):
+            handler.handle(record_of(message))
+
+        self.assertEqual(handler.queue.qsize(), 1)
+        self.assertEqual(handler.dropped, 1)
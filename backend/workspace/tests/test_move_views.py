@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -628,3 +630,259 @@ class FolderMoveTest(MoveTestCase):
         self.assertEqual(len(entries), 1)
         self.assertEqual(entries[0]["type"], "folder")
         self.assertEqual(entries[0]["id"], str(folder.id))
+
+
+class BulkMoveTestCase(MoveTestCase):
+    """Shared helpers of the batch moves"""
+
+    def bulk_move(self, kind, items, **destination):
+        payload = {"ids": [str(item.id) for item in items]}
+        payload.update(
+            (field, str(value.id) if value is not None else None)
+            for field, value in destination.items()
+        )
+
+        return self.client.post(
+            f"/api/projects/{self.origin.id}/{kind}/bulk-move/", payload, format="json"
+        )
+
+    def statuses(self, response):
+        return [entry["status"] for entry in response.data["results"]]
+
+
+class DocumentBulkMoveTest(BulkMoveTestCase):
+    """Tests for POST /api/projects/{id}/documents/bulk-move/"""
+
+    def test_documents_land_in_one_folder(self):
+        """Test : every document joins the folder, the counters follow"""
+        source = self.make_folder("Inbox")
+        target = self.make_folder("Vault", project=self.destination)
+        documents = [
+            self.make_document(f"Note {index}", folder=source) for index in range(3)
+        ]
+        loose = self.make_document("Loose")
+
+        response = self.bulk_move(
+            "documents", [*documents, loose], project=self.destination, folder=target
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["moved"], 4)
+        self.assertEqual(self.statuses(response), ["moved"] * 4)
+
+        for document in [*documents, loose]:
+            document.refresh_from_db()
+            self.assertEqual(document.project, self.destination)
+            self.assertEqual(document.folder, target)
+
+        source.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual(source.document_count, 0)
+        self.assertEqual(target.document_count, 4)
+
+    def test_items_outside_the_project_are_skipped(self):
+        """Test : foreign and unknown ids are reported, the rest still moves"""
+        document = self.make_document("Notes")
+        foreign = self.make_document("Theirs", project=self.foreign)
+        elsewhere = self.make_document("Elsewhere", project=self.destination)
+
+        response = self.bulk_move(
+            "documents", [foreign, document, elsewhere], project=self.destination
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.statuses(response), ["skipped", "moved", "skipped"])
+        self.assertEqual(response.data["results"][1]["id"], document.id)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.project, self.foreign)
+
+    def test_the_destination_is_checked_before_anything_moves(self):
+        """Test : a snippet folder refuses the whole batch"""
+        document = self.make_document("Notes")
+        folder = self.make_folder("Helpers", resource_type="snippets")
+
+        response = self.bulk_move("documents", [document], folder=folder)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("folder", response.data)
+        document.refresh_from_db()
+        self.assertIsNone(document.folder)
+
+    def test_move_to_a_foreign_project_denied(self):
+        response = self.bulk_move(
+            "documents", [self.make_document("Notes")], project=self.foreign
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_empty_batch_rejected(self):
+        response = self.bulk_move("documents", [])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ids", response.data)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        """Test : moving 30 documents runs as many queries as moving 3"""
+        target = self.make_folder("Vault")
+        counts = []
+
+        for size in (3, 30):
+            documents = [
+                self.make_document(
+                    f"Note {index}", folder=self.make_folder(f"F{size}-{index}")
+                )
+                for index in range(size)
+            ]
+
+            with CaptureQueriesContext(connection) as captured:
+                response = self.bulk_move("documents", documents, folder=target)
+
+            self.assertEqual(response.data["moved"], size)
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class SnippetBulkMoveTest(BulkMoveTestCase):
+    """Tests for POST /api/projects/{id}/snippets/bulk-move/"""
+
+    def test_snippets_reach_the_root_of_another_project(self):
+        folder = self.make_folder("Helpers", resource_type="snippets")
+        snippets = [
+            self.make_snippet(f"Helper {index}", folder=folder) for index in range(2)
+        ]
+
+        response = self.bulk_move("snippets", snippets, project=self.destination)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["moved"], 2)
+
+        for snippet in snippets:
+            snippet.refresh_from_db()
+            self.assertEqual(snippet.project, self.destination)
+            self.assertIsNone(snippet.folder)
+
+        folder.refresh_from_db()
+        self.assertEqual(folder.snippet_count, 0)
+
+
+class FolderBulkMoveTest(BulkMoveTestCase):
+    """Tests for POST /api/projects/{id}/folders/bulk-move/"""
+
+    def assertPathsHold(self):
+        for folder in Folder.objects.select_related("parent"):
+            parent_path = folder.parent.tree_path if folder.parent else ""
+            self.assertEqual(folder.tree_path, f"{parent_path}{folder.id.hex}/")
+
+    def test_branches_follow_their_folders(self):
+        """Test : subfolders, documents and paths travel with each folder"""
+        first = self.make_folder("First")
+        second = self.make_folder("Second", parent=self.make_folder("Deep"))
+        child = self.make_folder("Nested", parent=first)
+        document = self.make_document("Nested doc", folder=child)
+        target = self.make_folder("Vault", project=self.destination)
+
+        response = self.bulk_move(
+            "folders", [first, second], project=self.destination, parent=target
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.statuses(response), ["moved", "moved"])
+
+        for entry in (first, second, child, document):
+            entry.refresh_from_db()
+            self.assertEqual(entry.project, self.destination)
+
+        self.assertEqual(first.parent, target)
+        self.assertEqual(second.parent, target)
+        self.assertEqual(child.parent, first)
+        self.assertEqual(child.ancestor_ids(), [first.id, target.id])
+        self.assertPathsHold()
+
+        target.refresh_from_db()
+        self.assertEqual(target.folder_count, 2)
+        self.assertEqual(Folder.objects.get(name="Deep").folder_count, 0)
+
+    def test_a_folder_moved_with_its_ancestor_is_flattened(self):
+        """Test : a folder and its subfolder both end up under the destination"""
+        folder = self.make_folder("Archives")
+        child = self.make_folder("Nested", parent=folder)
+        deep = self.make_folder("Deeper", parent=child)
+        target = self.make_folder("Vault")
+
+        response = self.bulk_move("folders", [folder, child], parent=target)
+
+        self.assertEqual(self.statuses(response), ["moved", "moved"])
+        child.refresh_from_db()
+        deep.refresh_from_db()
+        self.assertEqual(child.parent, target)
+        self.assertEqual(deep.ancestor_ids(), [child.id, target.id])
+        self.assertPathsHold()
+
+    def test_folders_which_cannot_go_there_are_skipped(self):
+        """Test : own branch, other kind and taken names are reported"""
+        target = self.make_folder("Vault")
+        inner = self.make_folder("Inner", parent=target)
+        self.make_folder("Taken", parent=inner)
+        taken = self.make_folder("Taken")
+        helpers = self.make_folder("Helpers", resource_type="snippets")
+        first = self.make_folder("Twin", parent=self.make_folder("A"))
+        second = self.make_folder("Twin", parent=self.make_folder("B"))
+        free = self.make_folder("Free")
+
+        response = self.bulk_move(
+            "folders", [target, taken, helpers, first, second, free], parent=inner
+        )
+
+        self.assertEqual(
+            self.statuses(response),
+            ["skipped", "skipped", "skipped", "moved", "skipped", "moved"],
+        )
+        self.assertEqual(response.data["moved"], 2)
+        self.assertIn("own branch", response.data["results"][0]["detail"])
+        self.assertIn("already exists", response.data["results"][1]["detail"])
+        self.assertIn("same kind", response.data["results"][2]["detail"])
+        self.assertIn("already exists", response.data["results"][4]["detail"])
+
+        taken.refresh_from_db()
+        second.refresh_from_db()
+        self.assertIsNone(taken.parent)
+        self.assertNotEqual(second.parent, inner)
+        self.assertPathsHold()
+
+    def test_folders_of_both_kinds_reach_the_root(self):
+        """Test : at the root, a homonym of the other kind does not block"""
+        documents = self.make_folder("Shared", parent=self.make_folder("Docs"))
+        snippets = self.make_folder(
+            "Shared",
+            parent=self.make_folder("Code", resource_type="snippets"),
+            resource_type="snippets",
+        )
+
+        response = self.bulk_move("folders", [documents, snippets], parent=None)
+
+        self.assertEqual(self.statuses(response), ["moved", "moved"])
+        self.assertPathsHold()
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        """Test : moving 20 branches runs as many queries as moving 2"""
+        counts = []
+
+        for size in (2, 20):
+            target = self.make_folder(f"Vault {size}", project=self.destination)
+            folders = [self.make_folder(f"F{size}-{index}") for index in range(size)]
+
+            for folder in folders:
+                self.make_document(
+                    "Doc", folder=self.make_folder("Child", parent=folder)
+                )
+
+            with CaptureQueriesContext(connection) as captured:
+                response = self.bulk_move(
+                    "folders", folders, project=self.destination, parent=target
+                )
+
+            self.assertEqual(response.data["moved"], size)
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
@@ -1,8 +1,19 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from workspace.models import TODO, Project
+from workspace.models import (
+    TODO,
+    Change,
+    Document,
+    Folder,
+    Project,
+    SearchPosting,
+    Snippet,
+    TodoList,
+)
 
 User = get_user_model()
 
@@ -111,6 +122,56 @@ class ProjectViewTest(APITestCase):
         # Verify the project was deleted
         self.assertEqual(Project.objects.count(), 0)
 
+    def test_delete_project_takes_everything_in_it(self):
+        """Test : the project goes with its contents, postings and log entries"""
+        folder = Folder.objects.create(name="Runbooks", project=self.project)
+        Folder.objects.create(name="Old", project=self.project, parent=folder)
+        Document.objects.create(title="Rollback", project=self.project, folder=folder)
+        Snippet.objects.create(title="Restart", project=self.project)
+        todo_list = TodoList.objects.create(name="Sprint", project=self.project)
+        TODO.objects.create(title="Tag", project=self.project, list=todo_list)
+
+        response = self.client.delete(f"/api/projects/{self.project.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        for model in (Project, Folder, Document, Snippet, TodoList, TODO):
+            with self.subTest(model=model.__name__):
+                self.assertFalse(model.objects.exists())
+
+        self.assertFalse(SearchPosting.objects.exists())
+        (tombstone,) = Change.objects.all()
+        self.assertEqual(tombstone.object_id, self.project.id)
+        self.assertTrue(tombstone.deleted)
+
+    def test_delete_project_queries_do_not_grow_with_it(self):
+        """Test : deleting a project of 40 items runs as many queries as of 4"""
+
+        def project(size):
+            project = Project.objects.create(title=f"Size {size}", user=self.user)
+            folder = Folder.objects.create(name="Notes", project=project)
+
+            for index in range(size):
+                Document.objects.create(
+                    title=f"Doc {index}", project=project, folder=folder
+                )
+                TODO.objects.create(title=f"Task {index}", project=project)
+
+            return project
+
+        counts = []
+
+        for size in (4, 40):
+            target = project(size)
+
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.delete(f"/api/projects/{target.id}/")
+
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
+
     def test_user_isolation(self):
         """Test that users cannot access each other's projects"""
         # Create a second user and project
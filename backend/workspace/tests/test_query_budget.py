@@ -0,0 +1,189 @@
+import logging
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from devnote import query_budget
+from devnote.query_budget import QueryBudgetExceeded, QueryReport, query_shape
+from workspace.models import TODO, Document, Folder, Project, Snippet, TodoList
+from workspace.views import ProjectViewSet
+
+User = get_user_model()
+
+
+def run(report, sql):
+    report.record(lambda *args: None, sql, (), False, {})
+
+
+class QueryReportTest(SimpleTestCase):
+    """Tests for the accounting of the queries of one request"""
+
+    def test_placeholder_runs_are_folded(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            query_shape("SELECT * FROM t WHERE id IN (%s, %s)"),
+        )
+
+    def test_repeated_selects_are_flagged(self):
+        report = QueryReport(endpoint="view.list")
+
+        for _ in range(5):
+            run(report, "SELECT name FROM t WHERE id = %s")
+
+        run(report, "SELECT 1")
+
+        self.assertEqual(report.count, 6)
+        self.assertEqual(
+            report.repeated(threshold=5), [("SELECT name FROM t WHERE id = %s", 5)]
+        )
+
+    def test_repeated_writes_are_not_flagged(self):
+        report = QueryReport(endpoint="view.create")
+
+        for _ in range(5):
+            run(report, "UPDATE t SET n = n + 1 WHERE id = %s")
+
+        self.assertEqual(report.repeated(threshold=5), [])
+
+    def test_budget(self):
+        report = QueryReport(endpoint="view.list", budget=1)
+        run(report, "SELECT 1")
+        self.assertFalse(report.over_budget())
+
+        run(report, "SELECT 2")
+        self.assertTrue(report.over_budget())
+
+    def test_unbudgeted_queries_are_counted_apart(self):
+        report = QueryReport(endpoint="view.list", budget=1)
+        request = mock.Mock(query_report=report)
+
+        with query_budget.unbudgeted(request):
+            run(report, "SELECT 1")
+
+        run(report, "SELECT 2")
+
+        self.assertEqual(report.count, 2)
+        self.assertEqual(report.budgeted, 1)
+        self.assertFalse(report.over_budget())
+
+
+class QueryBudgetMiddlewareTest(APITestCase):
+    """Tests for the budgets enforced on the views"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="budget@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(user=self.user, title="Budget")
+
+    def test_requests_are_reported_per_action(self):
+        reports = []
+        query_budget.listeners.append(reports.append)
+        self.addCleanup(query_budget.listeners.remove, reports.append)
+
+        self.client.get("/api/projects/")
+
+        (report,) = reports
+        self.assertEqual(report.endpoint, "ProjectViewSet.list")
+        self.assertEqual(report.budget, ProjectViewSet.query_budget["list"])
+        self.assertGreater(report.count, 0)
+
+    def test_budgets_hold_under_real_authentication(self):
+        """Test : the user lookup of a JWT cookie is left out of the budgets"""
+        self.client.force_authenticate(user=None)
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = str(token)
+
+        for url in ("/api/projects/", f"/api/projects/{self.project.id}/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_strict_mode_fails_a_request_over_budget(self):
+        with mock.patch.object(ProjectViewSet, "query_budget", {"list": 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/projects/")
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_lenient_mode_logs_a_request_over_budget(self):
+        with mock.patch.object(ProjectViewSet, "query_budget", {"list": 0}):
+            with self.assertLogs("devnote", "WARNING") as logs:
+                response = self.client.get("/api/projects/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("over its budget of 0", logs.output[0])
+
+    def test_queries_of_each_request_are_logged(self):
+        """Test : the count and time of a request reach the configured logs"""
+        with self.assertLogs("devnote", "INFO") as logs:
+            self.client.get("/api/projects/")
+
+        (record,) = [
+            record for record in logs.records if "queries in" in record.getMessage()
+        ]
+        self.assertIn("ProjectViewSet.list ran", record.getMessage())
+        self.assertTrue(logging.getLogger("devnote").isEnabledFor(record.levelno))
+
+    def test_listing_budgets_hold_for_full_pages(self):
+        """Test : the budgets do not grow with the number of listed rows"""
+        folder = Folder.objects.create(name="Docs", project=self.project)
+        snippets = Folder.objects.create(
+            name="Code", project=self.project, resource_type="snippets"
+        )
+        todo_list = TodoList.objects.create(name="Sprint", project=self.project)
+
+        for index in range(25):
+            child = Folder.objects.create(
+                name=f"Child {index}", project=self.project, parent=folder
+            )
+            Document.objects.create(
+                title=f"Deploy {index}", project=self.project, folder=child
+            )
+            Document.objects.create(
+                title=f"Pinned {index}", project=self.project, is_pinned=True
+            )
+            Snippet.objects.create(
+                title=f"Deploy {index}",
+                content="x",
+                project=self.project,
+                folder=snippets,
+                is_pinned=True,
+            )
+            TODO.objects.create(
+                title=f"Deploy {index}",
+                project=self.project,
+                list=todo_list,
+                is_pinned=True,
+            )
+
+        project_url = f"/api/projects/{self.project.id}"
+        urls = [
+            "/api/projects/",
+            f"{project_url}/",
+            "/api/projects/recent/",
+            f"{project_url}/contents/",
+            f"{project_url}/pinned/",
+            f"/api/folders/{folder.id}/",
+            f"/api/folders/{folder.id}/contents/",
+            f"/api/folders/{folder.id}/contents/?pagination=cursor",
+            f"{project_url}/folders/",
+            f"{project_url}/documents/",
+            f"{project_url}/snippets/",
+            f"{project_url}/snippets/pinned/",
+            f"{project_url}/todo-lists/",
+            f"{project_url}/todos/",
+            f"{project_url}/todos/pinned/",
+            f"/api/search/?q=deploy&project={self.project.id}",
+        ]
+
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,147 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from devnote import ratelimit
+from devnote.ratelimit import MemoryStore, SlidingWindowLimiter, SQLiteStore, parse_rate
+
+User = get_user_model()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 6000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingStore(MemoryStore):
+    def __init__(self):
+        super().__init__()
+        self.trips = 0
+
+    def add(self, *args):
+        self.trips += 1
+        return super().add(*args)
+
+
+class SlidingWindowLimiterTest(SimpleTestCase):
+    """Tests for the counting of hits over a sliding window"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = CountingStore()
+
+    def limiter(self, local_share=0.0):
+        return SlidingWindowLimiter(self.store, local_share, clock=self.clock)
+
+    def hits(self, limiter, count, limit=5):
+        return [limiter.hit("caller", limit, 60) for _ in range(count)]
+
+    def test_rates(self):
+        self.assertEqual(parse_rate("30/m"), (30, 60))
+        self.assertEqual(parse_rate("100/5s"), (100, 5))
+
+        with self.assertRaises(ImproperlyConfigured):
+            parse_rate("30 per minute")
+
+    def test_hits_over_the_limit_are_limited(self):
+        self.assertEqual(self.hits(self.limiter(), 6), [False] * 5 + [True])
+
+    def test_previous_window_weighs_by_its_overlap(self):
+        limiter = self.limiter()
+        self.hits(limiter, 5)
+
+        # The previous window still covers the whole sliding window
+        self.clock.now += 60
+        self.assertEqual(self.hits(limiter, 1), [True])
+
+        # Only a sixth of it is left
+        self.clock.now += 50
+        self.assertEqual(self.hits(limiter, 1), [False])
+
+    def test_callers_far_under_their_limit_skip_the_store(self):
+        limiter = self.limiter(local_share=0.1)
+
+        self.assertNotIn(True, self.hits(limiter, 90, limit=100))
+        self.assertLess(self.store.trips, 20)
+
+    def test_small_limits_always_go_to_the_store(self):
+        limiter = self.limiter(local_share=0.1)
+        self.hits(limiter, 5)
+
+        self.assertEqual(self.store.trips, 5)
+
+    def test_local_grants_never_overshoot_a_single_process(self):
+        limiter = self.limiter(local_share=0.1)
+
+        limited = self.hits(limiter, 120, limit=100)
+
+        self.assertEqual(limited.index(True), 100)
+
+
+class SQLiteStoreTest(SimpleTestCase):
+    """Tests for the counters shared by the processes of a host"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "ratelimit.sqlite3"
+
+    def test_limiters_share_their_counts(self):
+        first = SlidingWindowLimiter(SQLiteStore(self.path))
+        second = SlidingWindowLimiter(SQLiteStore(self.path))
+
+        outcomes = [
+            limiter.hit("caller", 4, 60) for limiter in (first, second, first, second)
+        ]
+        outcomes.append(second.hit("caller", 4, 60))
+
+        self.assertEqual(outcomes, [False, False, False, False, True])
+
+    def test_counts_are_kept_per_window(self):
+        store = SQLiteStore(self.path)
+
+        store.add("caller", 10, 2, 1e12)
+        store.add("caller", 11, 3, 1e12)
+        store.add("other", 11, 7, 1e12)
+
+        self.assertEqual(store.add("caller", 11, 1, 1e12), (4, 2))
+
+        store.clear()
+        self.assertEqual(store.add("caller", 11, 1, 1e12), (1, 0))
+
+
+@override_settings(RATELIMIT_ENABLE=True)
+class SearchRateLimitTest(APITestCase):
+    """Tests for the limit on the search endpoint"""
+
+    def setUp(self):
+        ratelimit.reset()
+        self.addCleanup(ratelimit.reset)
+
+        self.user = User.objects.create_user(
+            email="ratelimit@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_search_is_limited_per_user(self):
+        for _ in range(30):
+            response = self.client.get("/api/search/?q=deploy")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get("/api/search/?q=deploy")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        other = User.objects.create_user(
+            email="other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.get("/api/search/?q=deploy")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
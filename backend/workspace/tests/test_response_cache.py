@@ -0,0 +1,154 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from workspace import response_cache
+from workspace.models import TODO, Project, TodoList
+
+User = get_user_model()
+
+
+def responses(backend, location="responses"):
+    return {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "responses": {"BACKEND": backend, "LOCATION": location},
+    }
+
+
+class ResponseCacheTest(APITestCase):
+    """Tests for the cached responses of the project listings"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="cache@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(title="Deploy", user=self.user)
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, **headers)
+
+        return response, len(captured)
+
+    def assertServedFromCache(self, url):
+        """Test : <url> runs no query the second time it is asked"""
+        first, _queries = self.get(url)
+        again, queries = self.get(url)
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data, first.data)
+        self.assertEqual(again.get("ETag"), first.get("ETag"))
+        self.assertEqual(queries, 0)
+
+    def test_listings_are_served_from_the_cache(self):
+        for url in ("/api/projects/", "/api/projects/recent/"):
+            with self.subTest(url=url):
+                self.assertServedFromCache(url)
+
+    def test_each_query_is_cached_apart(self):
+        self.client.get("/api/projects/")
+        response, _queries = self.get("/api/projects/?archived=true")
+
+        self.assertEqual(response.data["count"], 0)
+
+    def test_todo_writes_leave_the_cache_behind(self):
+        self.client.get("/api/projects/")
+        todo = TODO.objects.create(title="Tag", project=self.project)
+
+        response, _queries = self.get("/api/projects/")
+        self.assertEqual(response.data["results"][0]["open_todos_count"], 1)
+
+        todo.status = "done"
+        todo.save()
+
+        response, _queries = self.get("/api/projects/")
+        self.assertEqual(response.data["results"][0]["open_todos_count"], 0)
+
+    def test_bulk_todo_writes_leave_the_cache_behind(self):
+        self.client.get("/api/projects/")
+        self.client.post(
+            f"/api/projects/{self.project.id}/todos/bulk/",
+            {"create": [{"title": "Tag"}, {"title": "Ship"}]},
+            format="json",
+        )
+
+        response, _queries = self.get("/api/projects/")
+        self.assertEqual(response.data["results"][0]["open_todos_count"], 2)
+
+    def test_opening_a_project_reorders_the_recent_rail(self):
+        other = Project.objects.create(title="Release", user=self.user)
+        self.client.post(f"/api/projects/{self.project.id}/open/")
+        self.client.get("/api/projects/recent/")
+
+        self.client.post(f"/api/projects/{other.id}/open/")
+
+        response, _queries = self.get("/api/projects/recent/")
+        self.assertEqual(response.data[0]["id"], str(other.id))
+
+    def test_other_writes_keep_the_cache(self):
+        self.client.get("/api/projects/")
+        TodoList.objects.create(name="Sprint", project=self.project)
+        self.client.get("/api/projects/")
+
+        # Documents are not shown by the listings
+        response = self.client.post(
+            f"/api/projects/{self.project.id}/documents/",
+            {"title": "Notes"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        _response, queries = self.get("/api/projects/")
+        self.assertEqual(queries, 0)
+
+    def test_cached_listing_answers_304(self):
+        tag = self.client.get("/api/projects/")["ETag"]
+        response, queries = self.get("/api/projects/", HTTP_IF_NONE_MATCH=tag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(queries, 0)
+
+    def test_responses_are_per_user(self):
+        self.client.get("/api/projects/")
+        other = User.objects.create_user(
+            email="other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=other)
+
+        response, _queries = self.get("/api/projects/")
+        self.assertEqual(response.data["count"], 0)
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            backend = "django.core.cache.backends.filebased.FileBasedCache"
+
+            with override_settings(CACHES=responses(backend, directory)):
+                self.assertServedFromCache("/api/projects/")
+
+    def test_file_backend_shares_the_version_between_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            backend = "django.core.cache.backends.filebased.FileBasedCache"
+
+            with override_settings(CACHES=responses(backend, directory)):
+                self.client.get("/api/projects/")
+
+                # The write of another process, with a cache of its own
+                other = FileBasedCache(directory, {})
+                other.incr(response_cache.version_key(self.user.pk))
+
+                _response, queries = self.get("/api/projects/")
+                self.assertGreater(queries, 0)
+
+    @override_settings(CACHES=responses("django.core.cache.backends.dummy.DummyCache"))
+    def test_cache_off(self):
+        self.client.get("/api/projects/")
+        _response, queries = self.get("/api/projects/")
+
+        self.assertGreater(queries, 0)
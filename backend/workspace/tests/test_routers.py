@@ -0,0 +1,87 @@
+from unittest import mock
+from uuid import uuid4
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve
+
+from devnote.routers import ReadReplicaMiddleware, ReadReplicaRouter
+from workspace.models import TODO
+
+
+@override_settings(READ_DATABASE_ALIAS="read")
+class ReadReplicaRoutingTest(SimpleTestCase):
+    """Tests for the routing of safe reads to the read database"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReadReplicaRouter()
+
+    def reads_of(self, method, path, writes=False):
+        """Where a request to <path> reads from, then again after a write."""
+        seen = []
+
+        def get_response(request):
+            match = resolve(request.path)
+            middleware.process_view(request, match.func, match.args, match.kwargs)
+            seen.append(self.router.db_for_read(TODO))
+
+            if writes:
+                self.router.db_for_write(TODO)
+                seen.append(self.router.db_for_read(TODO))
+
+            return HttpResponse()
+
+        middleware = ReadReplicaMiddleware(get_response)
+        middleware(self.factory.generic(method, path))
+
+        return seen
+
+    def test_listings_and_search_read_from_the_replica(self):
+        project = uuid4()
+
+        for path in (
+            "/api/projects/",
+            f"/api/projects/{project}/",
+            "/api/projects/recent/",
+            f"/api/projects/{project}/contents/",
+            f"/api/projects/{project}/todo-lists/",
+            f"/api/folders/{uuid4()}/contents/",
+            "/api/todos/pinned/",
+            "/api/search/",
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.reads_of("GET", path), ["read"])
+
+    def test_writes_and_other_actions_stay_on_the_primary(self):
+        self.assertEqual(self.reads_of("POST", "/api/todos/"), [None])
+        self.assertEqual(
+            self.reads_of("POST", f"/api/projects/{uuid4()}/open/"), [None]
+        )
+        self.assertEqual(self.reads_of("GET", "/api/auth/me/"), [None])
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        self.assertEqual(
+            self.reads_of("GET", "/api/documents/", writes=True), ["read", None]
+        )
+
+    def test_reads_in_a_transaction_go_to_the_primary(self):
+        with mock.patch.object(connections["default"], "in_atomic_block", True):
+            self.assertEqual(self.reads_of("GET", "/api/documents/"), [None])
+
+    def test_routing_ends_with_the_request(self):
+        self.reads_of("GET", "/api/documents/")
+
+        self.assertIsNone(self.router.db_for_read(TODO))
+
+    def test_writes_and_migrations_only_go_to_the_primary(self):
+        self.assertEqual(self.router.db_for_write(TODO), "default")
+        self.assertFalse(self.router.allow_migrate("read", "workspace"))
+        self.assertIsNone(self.router.allow_migrate("default", "workspace"))
+
+    @override_settings(READ_DATABASE_ALIAS=None)
+    def test_middleware_off_without_a_read_database(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReadReplicaMiddleware(HttpResponse)
@@ -0,0 +1,116 @@
+import sqlite3
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from workspace import fts5
+from workspace.models import TODO, Document, Project, SearchPosting, Snippet
+
+
+def sqlite_has_fts5():
+    probe = sqlite3.connect(":memory:")
+
+    try:
+        probe.execute("CREATE VIRTUAL TABLE probe USING fts5(x)")
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        probe.close()
+
+    return True
+
+
+@skipUnless(sqlite_has_fts5(), "SQLite built without FTS5")
+@override_settings(SEARCH_BACKEND="fts5")
+class SearchFts5Test(APITestCase):
+    """Tests for the global search served by the FTS5 mirrors"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="fts@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(user=self.user, title="FTS Project")
+        self.url = reverse("search")
+
+    def search(self, query, search_type):
+        response = self.client.get(self.url, {"q": query, "type": search_type})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [hit["title"] for hit in response.data[search_type]]
+
+    def test_mirrors_are_installed_by_the_migration(self):
+        self.assertTrue(fts5.is_installed(connection))
+
+    def test_mirrors_are_looked_up_once_per_connection(self):
+        self.search("deploy", "documents")
+
+        with CaptureQueriesContext(connection) as captured:
+            self.search("deploy", "documents")
+
+        self.assertFalse(any("sqlite_master" in query["sql"] for query in captured))
+
+    def test_title_matches_rank_first(self):
+        Document.objects.create(
+            project=self.project, title="Notes", content="about the deploy"
+        )
+        Document.objects.create(project=self.project, title="Deploy", content="")
+
+        self.assertEqual(self.search("deploy", "documents"), ["Deploy", "Notes"])
+
+    def test_cursor_pages_through_ranked_hits(self):
+        for index in range(5):
+            Document.objects.create(
+                project=self.project, title=f"Deploy {index}", content="deploy " * index
+            )
+
+        params = {"q": "deploy", "type": "documents", "limit": 2}
+        seen = []
+
+        while True:
+            response = self.client.get(self.url, params)
+            seen += [hit["title"] for hit in response.data["documents"]]
+
+            if response.data["next"]["documents"] is None:
+                break
+            params["cursor"] = response.data["next"]["documents"]
+
+        self.assertEqual(sorted(seen), [f"Deploy {index}" for index in range(5)])
+
+    def test_every_term_is_a_prefix(self):
+        Snippet.objects.create(
+            project=self.project, title="Retry", content="def backoff(): pass"
+        )
+        Snippet.objects.create(project=self.project, title="Retry", content="loop")
+
+        self.assertEqual(self.search("ret back", "snippets"), ["Retry"])
+
+    def test_triggers_follow_updates_and_deletes(self):
+        todo = TODO.objects.create(project=self.project, title="Ship release")
+
+        todo.title = "Write changelog"
+        todo.save()
+        self.assertEqual(self.search("ship", "todos"), [])
+        self.assertEqual(self.search("changelog", "todos"), ["Write changelog"])
+
+        todo.delete()
+        self.assertEqual(self.search("changelog", "todos"), [])
+
+    def test_other_users_never_match(self):
+        other = User.objects.create_user(email="other@example.com", password="pass")
+        other_project = Project.objects.create(user=other, title="Theirs")
+        Document.objects.create(project=other_project, title="Secret deploy")
+
+        self.assertEqual(self.search("deploy", "documents"), [])
+
+    def test_postings_serve_without_fts5(self):
+        Document.objects.create(project=self.project, title="Fallback plan")
+        self.assertTrue(SearchPosting.objects.filter(term="fallback").exists())
+
+        with mock.patch.object(fts5, "installed", return_value=False):
+            self.assertEqual(self.search("fall", "documents"), ["Fallback plan"])
@@ -0,0 +1,151 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from workspace import search
+from workspace.models import TODO, Document, Project, SearchPosting, Snippet
+
+User = get_user_model()
+
+
+class TokenizeTest(TestCase):
+    """Tests for the splitting of text into index terms"""
+
+    def test_terms_are_lowercased_and_distinct(self):
+        self.assertEqual(
+            search.tokenize("Fix the JWT fix, then fix_it"),
+            {"fix", "the", "jwt", "then", "fix_it"},
+        )
+
+    def test_empty_text_has_no_terms(self):
+        self.assertEqual(search.tokenize(""), set())
+        self.assertEqual(search.tokenize(None), set())
+
+    def test_long_terms_are_clipped(self):
+        (term,) = search.tokenize("a" * 200)
+        self.assertEqual(len(term), search.MAX_TERM_LENGTH)
+
+    def test_query_terms_keep_typing_order(self):
+        self.assertEqual(search.query_terms("JWT auth jwt"), ["jwt", "auth"])
+
+
+class SearchIndexTest(TestCase):
+    """Tests for the postings kept by the model hooks"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="index@test.com", password="TestPass123!"
+        )
+        self.project = Project.objects.create(user=self.user, title="Index Project")
+
+    def terms(self, instance):
+        return set(
+            SearchPosting.objects.filter(object_id=instance.id).values_list(
+                "term", flat=True
+            )
+        )
+
+    def test_saving_indexes_every_field(self):
+        snippet = Snippet.objects.create(
+            project=self.project,
+            title="Retry helper",
+            content="def backoff(): pass",
+            language="python",
+            description="Exponential",
+        )
+
+        self.assertEqual(
+            self.terms(snippet),
+            {"retry", "helper", "def", "backoff", "pass", "python", "exponential"},
+        )
+        self.assertTrue(
+            SearchPosting.objects.filter(
+                object_id=snippet.id, user=self.user, kind="snippets"
+            ).exists()
+        )
+
+    def test_editing_replaces_stale_terms(self):
+        document = Document.objects.create(
+            project=self.project, title="Draft", content="old words"
+        )
+
+        document.content = "new words"
+        document.save()
+
+        self.assertEqual(self.terms(document), {"draft", "new", "words"})
+
+    def test_weights_count_occurrences_and_favor_titles(self):
+        document = Document.objects.create(
+            project=self.project, title="Deploy", content="deploy twice, deploy"
+        )
+
+        weights = dict(
+            SearchPosting.objects.filter(object_id=document.id).values_list(
+                "term", "weight"
+            )
+        )
+        self.assertEqual(weights["deploy"], search.TITLE_WEIGHT + 2)
+        self.assertEqual(weights["twice"], 1)
+
+        document.content = "deploy"
+        document.save()
+
+        weight = SearchPosting.objects.get(object_id=document.id, term="deploy").weight
+        self.assertEqual(weight, search.TITLE_WEIGHT + 1)
+
+    def test_deleting_drops_the_postings(self):
+        todo = TODO.objects.create(project=self.project, title="Ship it")
+        todo_id = todo.id
+
+        todo.delete()
+
+        self.assertFalse(SearchPosting.objects.filter(object_id=todo_id).exists())
+
+    def test_cascade_delete_drops_the_postings(self):
+        document = Document.objects.create(project=self.project, title="Gone soon")
+
+        self.project.delete()
+
+        self.assertFalse(SearchPosting.objects.filter(object_id=document.id).exists())
+
+    def test_save_of_unindexed_fields_skips_the_index(self):
+        self.project.title = "Renamed"
+        self.project.save(update_fields=["is_favorite"])
+
+        self.assertEqual(self.terms(self.project), {"index", "project"})
+
+    def test_filter_matches_requires_every_term_as_prefix(self):
+        match = Document.objects.create(
+            project=self.project, title="Authentication", content="JWT rotation"
+        )
+        Document.objects.create(project=self.project, title="Authentication")
+
+        found = search.filter_matches(
+            Document.objects.all(), self.user, "documents", "auth rot"
+        )
+
+        self.assertEqual(list(found), [match])
+
+    def test_filter_matches_without_terms_finds_nothing(self):
+        Document.objects.create(project=self.project, title="Anything")
+
+        found = search.filter_matches(
+            Document.objects.all(), self.user, "documents", "#"
+        )
+
+        self.assertFalse(found.exists())
+
+    def test_rebuild_command_restores_the_index(self):
+        document = Document.objects.create(
+            project=self.project, title="Kept", content="after rebuild"
+        )
+        SearchPosting.objects.all().delete()
+
+        output = StringIO()
+        call_command("rebuild_search_index", stdout=output)
+
+        self.assertEqual(self.terms(document), {"kept", "after", "rebuild"})
+        self.assertEqual(self.terms(self.project), {"index", "project"})
+        self.assertIn("Search index rebuilt", output.getvalue())
@@ -1,9 +1,11 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from accounts.models import User
-from workspace.models import TODO, Document, Project, Snippet
+from workspace.models import TODO, Document, Folder, Project, Snippet
 
 
 class SearchView(APITestCase):
@@ -184,3 +186,130 @@ class SearchView(APITestCase):
 
         response = self.client.get(self.url, {"q": "auth", "project": "not-a-uuid"})
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SearchPaginationTest(APITestCase):
+    """Tests for the ranked, capped and cursor-paged search results"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="pages@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(user=self.user, title="Pages Project")
+        self.url = reverse("search")
+
+    def test_results_are_capped_with_a_next_cursor(self):
+        """Test : each type returns at most ?limit= hits and a cursor"""
+        for index in range(5):
+            Document.objects.create(project=self.project, title=f"Deploy {index}")
+
+        response = self.client.get(self.url, {"q": "deploy", "limit": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["documents"]), 2)
+        self.assertIsNotNone(response.data["next"]["documents"])
+        self.assertIsNone(response.data["next"]["todos"])
+
+    def test_cursor_walks_every_hit_once(self):
+        """Test : following the cursors returns every hit exactly once"""
+        created = {
+            str(Document.objects.create(project=self.project, title=f"Deploy {i}").id)
+            for i in range(7)
+        }
+        seen = []
+        params = {"q": "deploy", "type": "documents", "limit": 3}
+
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [str(hit["id"]) for hit in response.data["documents"]]
+
+            cursor = response.data["next"]["documents"]
+            if cursor is None:
+                break
+            params["cursor"] = cursor
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(set(seen), created)
+
+    def test_hits_are_ranked_by_score(self):
+        """Test : a title match outranks a body match"""
+        Document.objects.create(
+            project=self.project, title="Notes", content="about the deploy"
+        )
+        Document.objects.create(project=self.project, title="Deploy guide")
+
+        response = self.client.get(self.url, {"q": "deploy", "type": "documents"})
+
+        hits = response.data["documents"]
+        self.assertEqual([hit["title"] for hit in hits], ["Deploy guide", "Notes"])
+        self.assertGreater(hits[0]["score"], hits[1]["score"])
+
+    def test_document_hit_is_compact(self):
+        """Test : a hit carries an excerpt, never the whole content"""
+        Document.objects.create(
+            project=self.project,
+            title="Runbook",
+            content="# Steps\n\n" + "filler " * 2000 + "then **deploy** it",
+        )
+
+        response = self.client.get(self.url, {"q": "deploy", "type": "documents"})
+
+        (hit,) = response.data["documents"]
+        self.assertNotIn("content", hit)
+        self.assertEqual(hit["folder_path"], [])
+        self.assertIn("deploy", hit["excerpt"])
+        self.assertLess(len(hit["excerpt"]), 300)
+
+        start, end = hit["highlights"][0]
+        self.assertEqual(hit["excerpt"][start:end], "deploy")
+
+    def test_cursor_without_type_is_rejected(self):
+        """Test : a cursor only pages the type it was issued for"""
+        response = self.client.get(self.url, {"q": "deploy", "cursor": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "INVALID_CURSOR")
+
+        response = self.client.get(
+            self.url, {"q": "deploy", "type": "documents", "cursor": "not-base64!"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_folder_paths_do_not_cost_a_query_per_hit(self):
+        """Test : the paths of a page of hits resolve in constant queries"""
+        parent = Folder.objects.create(name="Parent", project=self.project)
+
+        def search_queries():
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(
+                    self.url, {"q": "deploy", "type": "documents", "limit": 50}
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(captured), response.data["documents"]
+
+        for index in range(2):
+            folder = Folder.objects.create(
+                name=f"Nested {index}", project=self.project, parent=parent
+            )
+            Document.objects.create(
+                project=self.project, title=f"Deploy {index}", folder=folder
+            )
+
+        few_queries, _hits = search_queries()
+
+        for index in range(2, 12):
+            folder = Folder.objects.create(
+                name=f"Nested {index}", project=self.project, parent=parent
+            )
+            Document.objects.create(
+                project=self.project, title=f"Deploy {index}", folder=folder
+            )
+
+        many_queries, hits = search_queries()
+
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(len(hits), 12)
+        for hit in hits:
+            self.assertEqual([step["name"] for step in hit["folder_path"]][0], "Parent")
+            self.assertEqual(len(hit["folder_path"]), 2)
@@ -0,0 +1,75 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from devnote.sqlite_load import ALIAS, connections_for, run_load
+
+
+class SQLiteProductionProfileTest(SimpleTestCase):
+    """Tests for the production profile of SQLite connections"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_pragmas_apply_on_connect(self):
+        connections = connections_for(
+            Path(self.directory) / "profile.sqlite3", settings.SQLITE_PRODUCTION_PROFILE
+        )
+        self.addCleanup(connections.close_all)
+
+        with connections[ALIAS].cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in (
+                    "journal_mode",
+                    "synchronous",
+                    "busy_timeout",
+                    "temp_store",
+                )
+            }
+
+        # NORMAL is 1, MEMORY is 2, the timeout is in milliseconds
+        self.assertEqual(
+            pragmas,
+            {
+                "journal_mode": "wal",
+                "synchronous": 1,
+                "busy_timeout": 20000,
+                "temp_store": 2,
+            },
+        )
+
+    def test_writers_are_never_locked_out(self):
+        result = run_load(
+            settings.SQLITE_PRODUCTION_PROFILE,
+            "production",
+            seconds=0.5,
+            writers=4,
+            readers=4,
+            directory=self.directory,
+        )
+
+        self.assertEqual(result.errors, 0)
+        self.assertGreater(result.writes, 0)
+        self.assertGreater(result.reads, 0)
+
+    def test_loadtest_command(self):
+        output = StringIO()
+        call_command(
+            "sqlite_loadtest",
+            "--seconds",
+            "0.2",
+            "--writers",
+            "2",
+            "--readers",
+            "2",
+            stdout=output,
+        )
+
+        self.assertIn("the throughput of the bare one", output.getvalue())
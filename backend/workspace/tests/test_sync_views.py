@@ -0,0 +1,229 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from workspace.models import TODO, Change, Document, Folder, Project, Snippet, TodoList
+from workspace.purge import purge_user_data
+
+User = get_user_model()
+
+
+class SyncViewTest(APITestCase):
+    """Tests for the incremental sync of /api/sync/"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="sync@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(title="Deploy", user=self.user)
+        self.folder = Folder.objects.create(name="Runbooks", project=self.project)
+        self.document = Document.objects.create(
+            title="Rollback", project=self.project, folder=self.folder
+        )
+        self.todo_list = TodoList.objects.create(name="Sprint", project=self.project)
+        self.todo = TODO.objects.create(
+            title="Tag the release", project=self.project, list=self.todo_list
+        )
+
+    def sync(self, since=None):
+        params = {"since": since} if since else {}
+        response = self.client.get("/api/sync/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response.data
+
+    def ids(self, data, kind, key="changes"):
+        return {
+            str(item["id"] if key == "changes" else item) for item in data[key][kind]
+        }
+
+    def test_first_sync_sends_everything(self):
+        data = self.sync()
+
+        self.assertFalse(data["more"])
+        self.assertEqual(self.ids(data, "projects"), {str(self.project.id)})
+        self.assertEqual(self.ids(data, "folders"), {str(self.folder.id)})
+        self.assertEqual(self.ids(data, "documents"), {str(self.document.id)})
+        self.assertEqual(self.ids(data, "todo_lists"), {str(self.todo_list.id)})
+        self.assertEqual(self.ids(data, "todos"), {str(self.todo.id)})
+        self.assertEqual(data["changes"]["snippets"], [])
+        self.assertNotIn("folder_path", data["changes"]["documents"][0])
+
+    def test_nothing_new_since_the_cursor(self):
+        cursor = self.sync()["cursor"]
+        data = self.sync(cursor)
+
+        self.assertEqual(data["cursor"], cursor)
+        self.assertTrue(all(not rows for rows in data["changes"].values()))
+        self.assertTrue(all(not ids for ids in data["deleted"].values()))
+
+    def test_changes_and_tombstones_since_the_cursor(self):
+        cursor = self.sync()["cursor"]
+
+        self.document.title = "Roll back"
+        self.document.save()
+        gone = self.todo.id
+        self.todo.delete()
+
+        data = self.sync(cursor)
+
+        self.assertEqual(data["changes"]["documents"][0]["title"], "Roll back")
+        self.assertEqual(self.ids(data, "todos", "deleted"), {str(gone)})
+        # The counters of the project and the list moved with the delete
+        self.assertEqual(data["changes"]["folders"], [])
+        self.assertEqual(self.ids(data, "projects"), {str(self.project.id)})
+        self.assertEqual(data["changes"]["todo_lists"][0]["todo_count"], 0)
+        self.assertEqual(data["changes"]["todos"], [])
+
+    def test_log_keeps_one_entry_per_object(self):
+        for title in ("One", "Two", "Three"):
+            self.document.title = title
+            self.document.save()
+
+        self.assertEqual(Change.objects.filter(object_id=self.document.id).count(), 1)
+
+    def test_log_ids_never_fall_back_under_a_cursor(self):
+        cursor = self.sync()["cursor"]
+
+        # The document now holds the latest entry, replaced on every save
+        self.document.save()
+        self.document.save()
+
+        self.assertEqual(
+            self.ids(self.sync(cursor), "documents"), {str(self.document.id)}
+        )
+
+    def test_deleted_project_stands_for_its_contents(self):
+        cursor = self.sync()["cursor"]
+        gone = self.project.id
+        self.project.delete()
+
+        data = self.sync(cursor)
+
+        self.assertEqual(self.ids(data, "projects", "deleted"), {str(gone)})
+        self.assertEqual(sum(len(ids) for ids in data["deleted"].values()), 1)
+        self.assertFalse(Change.objects.filter(deleted=False).exists())
+
+    def test_deleted_list_releases_its_todos(self):
+        cursor = self.sync()["cursor"]
+        gone = self.todo_list.id
+        self.todo_list.delete()
+
+        data = self.sync(cursor)
+
+        self.assertEqual(self.ids(data, "todo_lists", "deleted"), {str(gone)})
+        self.assertIsNone(data["changes"]["todos"][0]["list"])
+
+    def test_deleted_folder_branch_leaves_tombstones(self):
+        cursor = self.sync()["cursor"]
+        response = self.client.delete(f"/api/folders/{self.folder.id}/?confirm=true")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        data = self.sync(cursor)
+
+        self.assertEqual(self.ids(data, "folders", "deleted"), {str(self.folder.id)})
+        self.assertEqual(
+            self.ids(data, "documents", "deleted"), {str(self.document.id)}
+        )
+
+    def test_bulk_writes_are_logged(self):
+        cursor = self.sync()["cursor"]
+        response = self.client.post(
+            f"/api/projects/{self.project.id}/todos/bulk/",
+            {
+                "create": [{"title": "Write the notes"}],
+                "update": [{"id": str(self.todo.id), "status": "done"}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self.sync(cursor)
+
+        self.assertEqual(len(data["changes"]["todos"]), 2)
+        self.assertEqual(data["changes"]["projects"][0]["open_todos_count"], 1)
+        self.assertEqual(self.ids(data, "todo_lists"), {str(self.todo_list.id)})
+
+    def test_folder_renames_leave_no_stale_path(self):
+        """Test : items name their folder by id, a rename touches the folder"""
+        scripts = Folder.objects.create(
+            name="Scripts", project=self.project, resource_type="snippets"
+        )
+        Snippet.objects.create(title="Restart", project=self.project, folder=scripts)
+        cursor = self.sync()["cursor"]
+
+        response = self.client.patch(
+            f"/api/folders/{self.folder.id}/", {"name": "Playbooks"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self.sync(cursor)
+
+        self.assertEqual(self.ids(data, "folders"), {str(self.folder.id)})
+        self.assertEqual(data["changes"]["documents"], [])
+
+        for kind in ("documents", "snippets"):
+            with self.subTest(kind=kind):
+                (item,) = self.sync()["changes"][kind]
+                self.assertNotIn("folder_path", item)
+                self.assertIn("folder", item)
+
+    def test_moves_to_another_project_are_logged(self):
+        other = Project.objects.create(title="Release", user=self.user)
+        cursor = self.sync()["cursor"]
+
+        response = self.client.post(
+            f"/api/folders/{self.folder.id}/move/",
+            {"project": str(other.id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self.sync(cursor)
+
+        self.assertEqual(data["changes"]["documents"][0]["project_id"], str(other.id))
+        self.assertEqual(self.ids(data, "folders"), {str(self.folder.id)})
+
+    @mock.patch("workspace.views.SYNC_PAGE_SIZE", 2)
+    def test_pages_until_nothing_more(self):
+        synced = set()
+        cursor = None
+
+        for _page in range(5):
+            data = self.sync(cursor)
+            cursor = data["cursor"]
+            synced |= {
+                str(item["id"]) for rows in data["changes"].values() for item in rows
+            }
+
+            if not data["more"]:
+                break
+
+        self.assertFalse(data["more"])
+        self.assertEqual(len(synced), 5)
+
+    def test_other_users_are_not_synced(self):
+        other = User.objects.create_user(
+            email="other@test.com", password="TestPass123!"
+        )
+        Project.objects.create(title="Theirs", user=other)
+
+        data = self.sync()
+
+        self.assertEqual(self.ids(data, "projects"), {str(self.project.id)})
+
+    def test_invalid_cursor_is_rejected(self):
+        for cursor in ("not-a-cursor", "WyJ4Il0=", "Wy0xXQ=="):
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/sync/", {"since": cursor})
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("since", response.data)
+
+    def test_account_data_purge_drops_the_log(self):
+        purge_user_data(self.user.id, 100)
+
+        self.assertFalse(Change.objects.filter(user=self.user).exists())
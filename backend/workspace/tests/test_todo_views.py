@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from workspace.models import TODO, Project
+from workspace.models import TODO, Project, SearchPosting, TodoList
+from workspace.serializers import TodoBatchSerializer
 
 User = get_user_model()
 
@@ -409,3 +412,183 @@ class TODOPinnedViewTest(APITestCase):
         response = self.client.get(f"/api/projects/{self.project.id}/todos/pinned/")
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TODOBulkViewTest(APITestCase):
+    """Tests for the batch endpoint /api/projects/{id}/todos/bulk/"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="bulk@test.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(title="Board", user=self.user)
+        self.sprint = TodoList.objects.create(name="Sprint", project=self.project)
+        self.backlog = TodoList.objects.create(name="Backlog", project=self.project)
+        self.todos = [
+            TODO.objects.create(
+                title=f"Task {index}", project=self.project, list=self.sprint
+            )
+            for index in range(3)
+        ]
+        self.url = f"/api/projects/{self.project.id}/todos/bulk/"
+
+    def post(self, batch):
+        return self.client.post(self.url, batch, format="json")
+
+    def test_batch_is_applied(self):
+        first, second, third = self.todos
+        response = self.post(
+            {
+                "create": [{"title": "Deploy docs", "list": str(self.backlog.id)}],
+                "update": [
+                    {"id": str(first.id), "status": "done"},
+                    {"id": str(second.id), "list": str(self.backlog.id)},
+                ],
+                "delete": [str(third.id)],
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (created,) = response.data["created"]
+        self.assertEqual(created["title"], "Deploy docs")
+        self.assertEqual(
+            [todo["id"] for todo in response.data["updated"]],
+            [str(first.id), str(second.id)],
+        )
+        self.assertEqual(response.data["updated"][0]["status"], "done")
+        self.assertEqual(response.data["deleted"], [third.id])
+
+        self.assertFalse(TODO.objects.filter(id=third.id).exists())
+        self.assertEqual(TODO.objects.get(id=first.id).status, "done")
+        self.assertEqual(TODO.objects.get(id=second.id).list, self.backlog)
+
+    def test_batch_keeps_counters_and_search_in_step(self):
+        first, _, third = self.todos
+        self.post(
+            {
+                "create": [{"title": "Deploy docs", "list": str(self.backlog.id)}],
+                "update": [{"id": str(first.id), "status": "done"}],
+                "delete": [str(third.id)],
+            }
+        )
+
+        self.project.refresh_from_db()
+        self.sprint.refresh_from_db()
+        self.backlog.refresh_from_db()
+        self.assertEqual(self.project.open_todos_count, 2)
+        self.assertEqual(self.sprint.todo_count, 2)
+        self.assertEqual(self.backlog.todo_count, 1)
+
+        postings = SearchPosting.objects.filter(kind="todos")
+        self.assertTrue(postings.filter(term="deploy").exists())
+        self.assertTrue(postings.filter(object_id=first.id, term="done").exists())
+        self.assertFalse(postings.filter(object_id=first.id, term="pending"))
+        self.assertFalse(postings.filter(object_id=third.id))
+
+    def test_one_invalid_item_refuses_the_batch(self):
+        response = self.post(
+            {
+                "create": [{"title": "Fine"}, {"title": "  "}],
+                "update": [{"id": str(self.todos[0].id), "status": "done"}],
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["create"][0], {})
+        self.assertIn("title", response.data["create"][1])
+        self.assertEqual(TODO.objects.count(), 3)
+        self.assertEqual(TODO.objects.get(id=self.todos[0].id).status, "pending")
+
+    def test_todos_of_other_projects_are_refused(self):
+        other = Project.objects.create(title="Other", user=self.user)
+        foreign = TODO.objects.create(title="Elsewhere", project=other)
+
+        response = self.post(
+            {
+                "update": [
+                    {"id": str(self.todos[0].id), "status": "done"},
+                    {"id": str(foreign.id), "status": "done"},
+                ],
+                "delete": [str(foreign.id)],
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["update"][0], {})
+        self.assertIn("id", response.data["update"][1])
+        self.assertIn(0, response.data["delete"])
+
+    def test_lists_of_other_projects_are_refused(self):
+        other = Project.objects.create(title="Other", user=self.user)
+        foreign_list = TodoList.objects.create(name="Elsewhere", project=other)
+
+        response = self.post(
+            {"update": [{"id": str(self.todos[0].id), "list": str(foreign_list.id)}]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("list", response.data["update"][0])
+
+    def test_a_todo_appears_once_per_batch(self):
+        todo_id = str(self.todos[0].id)
+
+        response = self.post(
+            {"update": [{"id": todo_id, "status": "done"}], "delete": [todo_id]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(0, response.data["delete"])
+
+    def test_empty_batch_is_refused(self):
+        response = self.post({})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_oversized_batch_is_refused_before_its_items(self):
+        """Test : a list over MAX_ITEMS is refused whole, its items unread"""
+        response = self.post({"create": [{}] * (TodoBatchSerializer.MAX_ITEMS + 1)})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data["create"])
+
+    def test_batch_on_foreign_project_is_refused(self):
+        stranger = User.objects.create_user(
+            email="stranger@test.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=stranger)
+
+        response = self.post({"delete": [str(self.todos[0].id)]})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(TODO.objects.count(), 3)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        """Test : a batch of 24 TODOs runs as many queries as one of 6"""
+
+        def batch(size):
+            todos = [
+                TODO.objects.create(title=f"Task {index}", project=self.project)
+                for index in range(size)
+            ]
+
+            return {
+                "create": [{"title": f"New {index}"} for index in range(size)],
+                "update": [
+                    {"id": str(todo.id), "status": "done"} for todo in todos[::2]
+                ],
+                "delete": [str(todo.id) for todo in todos[1::2]],
+            }
+
+        counts = []
+
+        for size in (6, 24):
+            payload = batch(size)
+
+            with CaptureQueriesContext(connection) as captured:
+                response = self.post(payload)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
@@ -90,6 +90,7 @@ class TodoListSerializerTestCase(TestCase):
         TODO.objects.create(title="One", project=self.project, list=todo_list)
         TODO.objects.create(title="Two", project=self.project, list=todo_list)
         TODO.objects.create(title="Loose", project=self.project)
+        todo_list.refresh_from_db()
 
         serializer = self.get_serializer(instance=todo_list)
 
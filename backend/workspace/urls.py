@@ -8,6 +8,7 @@ from .views import (
     ProjectViewSet,
     SearchView,
     SnippetViewSet,
+    SyncView,
     TodoListViewSet,
     TODOViewSet,
 )
@@ -35,4 +36,5 @@ urlpatterns = [
     path("", include(router.urls)),
     path("", include(projects_router.urls)),
     path("search/", SearchView.as_view(), name="search"),
+    path("sync/", SyncView.as_view(), name="sync"),
 ]
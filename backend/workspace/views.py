@@ -1,26 +1,45 @@
+import base64
+import json
 import logging
+from collections import defaultdict
+from functools import reduce
+from operator import or_
 from uuid import UUID
 
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db import transaction
-from django.db.models import Count, F, Q
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 from django.utils.decorators import method_decorator
-from django_ratelimit.decorators import ratelimit
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
-from .models import TODO, Document, Folder, Project, Snippet, TodoList
+from devnote.ratelimit import ratelimit
+
+from . import changes, counters, search
+from .etags import ConditionalGetMixin
+from .models import TODO, Change, Document, Folder, Project, Snippet, TodoList
+from .purge import purge_folders, purge_project
+from .response_cache import cached
 from .serializers import (
     DocumentCardSerializer,
+    DocumentHitSerializer,
     DocumentSerializer,
     FolderSerializer,
+    MoveBatchSerializer,
+    ProjectHitSerializer,
     ProjectSerializer,
+    SnippetHitSerializer,
     SnippetSerializer,
+    TodoBatchSerializer,
+    TodoHitSerializer,
     TodoListSerializer,
     TODOSerializer,
 )
@@ -30,9 +49,23 @@ logger = logging.getLogger("workspace")
 RECENT_PROJECTS_LIMIT = 4
 RECENT_PROJECTS_MAX = 20
 
+SEARCH_PAGE_SIZE = 10
+SYNC_PAGE_SIZE = 500
+SEARCH_PAGE_MAX = 50
+
+CONTENTS_PAGE_MAX = 100
 
-class ProjectViewSet(viewsets.ModelViewSet):
+
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
+    query_budget = {"list": 3, "retrieve": 2, "recent": 1, "contents": 5, "pinned": 3}
+    read_replica_actions = {"list", "retrieve", "recent", "contents", "pinned"}
+    etag_aggregates = {
+        "opened": Max("last_opened_at"),
+        "archived": Max("archived_at"),
+        "open_todos": Sum("open_todos_count"),
+    }
+    etag_depends_on = (TODO,)
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -41,16 +74,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
         one shelf at a time: the active projects, or the archived ones under
         ?archived=true. Every other route reaches a project whatever its shelf.
         """
-        queryset = (
-            Project.objects.filter(user=self.request.user)
-            .annotate(
-                open_todos_count=Count(
-                    "todos",
-                    filter=Q(todos__status__in=TODO.OPEN_STATUSES),
-                    distinct=True,
-                )
-            )
-            .order_by("-created_at")
+        queryset = Project.objects.filter(user=self.request.user).order_by(
+            "-created_at"
         )
 
         if self.action == "list":
@@ -58,6 +83,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @cached
+    def list(self, request, *args, **kwargs):
+        """Served from the response cache, see workspace.response_cache."""
+        return super().list(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Automatically associate the project with the logged-in user"""
         project = serializer.save(user=self.request.user)
@@ -66,6 +96,15 @@ class ProjectViewSet(viewsets.ModelViewSet):
             f"created by user {self.request.user.username}"
         )
 
+    def perform_destroy(self, instance):
+        """
+        Delete the project through workspace.purge, in chunks of ids: the
+        collector of Model.delete() would load every row of it first, and send
+        the signals of each. The chunks share one transaction.
+        """
+        with transaction.atomic():
+            purge_project(instance, settings.PROJECT_DELETE_CHUNK_SIZE)
+
     @action(detail=True, methods=["post"])
     def open(self, request, *args, **kwargs):
         """
@@ -99,6 +138,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(self.get_serializer(project).data)
 
     @action(detail=False, methods=["get"])
+    @cached
     def recent(self, request, *args, **kwargs):
         """
         Projects the user opened most recently, at most ?limit= of them.
@@ -158,7 +198,8 @@ class ChainedQuerysets:
     """
     Presents several querysets as one sliceable sequence, so the standard
     paginator can page across them while only fetching the rows of the
-    requested page.
+    requested page. Each queryset is ordered by a key then its id, which lets
+    page_after() seek a page from a position instead of counting and offsetting.
     """
 
     def __init__(self, *querysets):
@@ -197,6 +238,57 @@ class ChainedQuerysets:
 
         return items
 
+    def keyset(self, segment):
+        """The (field, descending) a segment is ordered by, ahead of its id."""
+        key = self.querysets[segment].query.order_by[0]
+
+        return key.lstrip("-"), key.startswith("-")
+
+    def position_of(self, segment, entry):
+        """The (segment, key, id) position of an entry, for a cursor."""
+        field, _descending = self.keyset(segment)
+        model_field = self.querysets[segment].model._meta.get_field(field)
+
+        return segment, model_field.value_to_string(entry), str(entry.id)
+
+    def seek(self, segment, key, entry_id):
+        """The entries of a segment ranked past a key and id."""
+        field, descending = self.keyset(segment)
+        queryset = self.querysets[segment]
+        key = queryset.model._meta.get_field(field).to_python(key)
+        past = "lt" if descending else "gt"
+
+        return queryset.filter(
+            Q(**{f"{field}__{past}": key})
+            | Q(**{field: key, f"id__{past}": UUID(entry_id)})
+        )
+
+    def page_after(self, position, size):
+        """
+        Up to <size> entries following a (segment, key, id) position, from the
+        start when it is None, and whether more entries follow. A page costs the
+        same wherever it falls, as no segment is counted or offset.
+        """
+        entries = []
+        segment = 0
+
+        if position is not None:
+            segment, key, entry_id = position
+
+        for index in range(segment, len(self.querysets)):
+            queryset = self.querysets[index]
+
+            if position is not None and index == segment:
+                queryset = self.seek(index, key, entry_id)
+
+            wanted = size + 1 - len(entries)
+            entries.extend((index, entry) for entry in queryset[:wanted])
+
+            if len(entries) > size:
+                break
+
+        return entries[:size], len(entries) > size
+
 
 RESOURCE_TYPES = [choice[0] for choice in Folder.RESOURCE_TYPE_CHOICES]
 
@@ -272,7 +364,10 @@ def resolve_move_project(request, current_project):
 
 
 def resolve_move_folder(request, field, project, resource_type):
-    """Destination folder of a move, None for the root of the project."""
+    """
+    Destination folder of a move, None for the root of the project. A None
+    <resource_type> accepts a folder of either kind.
+    """
     value = request.data.get(field)
 
     if value in (None, ""):
@@ -288,7 +383,7 @@ def resolve_move_folder(request, field, project, resource_type):
     if folder.project_id != project.id:
         raise ValidationError({field: "Folder must belong to the destination project."})
 
-    if folder.resource_type != resource_type:
+    if resource_type is not None and folder.resource_type != resource_type:
         raise ValidationError({field: f"Folder does not hold {resource_type}."})
 
     return folder
@@ -317,6 +412,65 @@ def resolve_move_list(request, project):
     return todo_list
 
 
+def apply_todo_batch(project, batch):
+    """
+    Write a validated TodoBatchSerializer batch in one transaction, a bulk
+    statement per kind of change. Bulk writes send no signals, so the search
+    postings, the counters of the project and its lists and the change log
+    are brought in line afterwards, in bulk too.
+
+    Returns the created TODOs, the updated ones, and the ids deleted.
+    """
+    todos = batch["todos"]
+    now = timezone.now()
+
+    created = [TODO(project=project, **item) for item in batch["create"]]
+    updated = []
+    changed = set()
+
+    for item in batch["update"]:
+        todo = todos[item["id"]]
+
+        for field, value in item.items():
+            if field != "id":
+                setattr(todo, field, value)
+                changed.add(field)
+
+        todo.updated_at = now
+        updated.append(todo)
+
+    deleted = batch["delete"]
+
+    with transaction.atomic():
+        TODO.objects.bulk_create(created)
+
+        if changed:
+            TODO.objects.bulk_update(updated, [*changed, "updated_at"])
+
+        if deleted:
+            search.unindex_many(TODO, deleted)
+            # Raw, as a plain delete would load the TODOs to signal each one
+            TODO.objects.filter(id__in=deleted)._raw_delete(TODO.objects.db)
+
+        reindexed = changed & set(search.INDEXED[TODO][1])
+        search.index_many(created + (updated if reindexed else []))
+        counters.recount(Project.objects.filter(id=project.id))
+        counters.recount(project.todo_lists.all())
+
+        lists = project.todo_lists.values_list("pk", flat=True)
+        changes.record(
+            [
+                (Project, project.id),
+                *((TodoList, pk) for pk in lists),
+                *((TODO, todo.id) for todo in created + updated),
+            ],
+            project.user_id,
+        )
+        changes.record([(TODO, pk) for pk in deleted], project.user_id, deleted=True)
+
+    return created, updated, deleted
+
+
 def guard_folder_name(folder, project, parent):
     """A folder cannot join a place where its name is already taken."""
     siblings = Folder.objects.filter(
@@ -332,13 +486,279 @@ def guard_folder_name(folder, project, parent):
         )
 
 
-def folders_with_counts(queryset):
-    """Annotate direct children and item counts, for the gallery cards."""
-    return queryset.annotate(
-        folder_count=Count("children", distinct=True),
-        document_count=Count("documents", distinct=True),
-        snippet_count=Count("snippets", distinct=True),
-    ).order_by("name")
+def read_move_ids(request):
+    """Ids of the items of a batch move, in the order sent, each one once."""
+    serializer = MoveBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    return list(dict.fromkeys(serializer.validated_data["ids"]))
+
+
+def move_results(ids, problems):
+    """Outcome of each item of a batch move, in the order of <ids>."""
+    return [
+        (
+            {"id": item_id, "status": "skipped", "detail": problems[item_id]}
+            if item_id in problems
+            else {"id": item_id, "status": "moved"}
+        )
+        for item_id in ids
+    ]
+
+
+def apply_item_move(model, source, ids, project, folder):
+    """
+    Move the documents or snippets of <ids> filed in <source> to <folder> of
+    <project>, with a single UPDATE, then recount the folders they left and
+    joined. They keep their owner, so their search postings still hold.
+
+    Returns why each id left out was not moved, keyed by id.
+    """
+    found = dict(
+        model.objects.filter(project=source, id__in=ids).values_list("id", "folder_id")
+    )
+    problems = {
+        item_id: "Not found in this project." for item_id in ids if item_id not in found
+    }
+
+    if not found:
+        return problems
+
+    recounted = {*found.values(), folder and folder.id} - {None}
+
+    with transaction.atomic():
+        model.objects.filter(id__in=found).update(
+            project=project, folder=folder, updated_at=timezone.now()
+        )
+        counters.recount(Folder.objects.filter(id__in=recounted))
+        changes.record(
+            [*((model, pk) for pk in found), *((Folder, pk) for pk in recounted)],
+            project.user_id,
+        )
+
+    return problems
+
+
+def movable_folders(folders, ids, project, parent):
+    """
+    The folders of a batch move which may join <parent> of <project>, and why
+    the others may not, keyed by id. Names are checked in the order sent, so
+    of two homonyms only the first moves.
+    """
+    blocked = set() if parent is None else {parent.id, *parent.ancestor_ids()}
+    problems = {}
+    movable = []
+
+    for folder_id in ids:
+        folder = folders.get(folder_id)
+
+        if folder is None:
+            problems[folder_id] = "Not found in this project."
+        elif parent is not None and folder.resource_type != parent.resource_type:
+            problems[folder_id] = "Parent folder must hold the same kind of resource."
+        elif folder.id in blocked:
+            problems[folder_id] = "A folder cannot be moved into its own branch."
+        else:
+            movable.append(folder)
+
+    taken = set(
+        Folder.objects.filter(project=project, parent=parent)
+        .exclude(id__in=[folder.id for folder in movable])
+        .values_list("resource_type", "name")
+    )
+    named = []
+
+    for folder in movable:
+        # Names are unique per kind of folder at the root; inside a folder,
+        # every child already is of its kind
+        key = (folder.resource_type, folder.name)
+
+        if key in taken:
+            problems[folder.id] = f"A folder named '{folder.name}' already exists here."
+        else:
+            taken.add(key)
+            named.append(folder)
+
+    return named, problems
+
+
+def apply_folder_move(source, ids, project, parent):
+    """
+    Move the folders of <ids> filed in <source>, with everything nested under
+    them, to <parent> of <project>. Each statement covers the whole batch: the
+    branches change project together, and their tree paths are rewritten with
+    one UPDATE per depth the folders leave, deepest first, so a folder moved
+    along with one of its ancestors is out of the way of the ancestor's rewrite.
+
+    Returns the folders moved, and why the others were not, keyed by id.
+    """
+    folders = Folder.objects.filter(project=source).in_bulk(ids)
+    moving, problems = movable_folders(folders, ids, project, parent)
+
+    if not moving:
+        return moving, problems
+
+    # Length of the path of the parent each folder leaves, the part rewritten
+    leaving = defaultdict(list)
+
+    for folder in moving:
+        leaving[len(folder.tree_path) - len(folder.id.hex) - 1].append(folder)
+
+    now = timezone.now()
+    recounted = {folder.parent_id for folder in moving} | {parent and parent.id}
+    recounted.discard(None)
+    moved = [(Folder, pk) for pk in recounted | {folder.id for folder in moving}]
+
+    with transaction.atomic():
+        if project.id != source.id:
+            branches = reduce(
+                or_, (Folder.branch(folder.tree_path) for folder in moving)
+            )
+
+            # Stamped as moved, which the ETags of workspace.etags rely on
+            for model, rows in (
+                (Document, Document.objects.filter(folder__in=branches)),
+                (Snippet, Snippet.objects.filter(folder__in=branches)),
+                (Folder, branches),
+            ):
+                moved.extend((model, pk) for pk in rows.values_list("pk", flat=True))
+                rows.update(project=project, updated_at=now)
+
+        Folder.objects.filter(id__in=[folder.id for folder in moving]).update(
+            parent=parent, updated_at=now
+        )
+
+        for cut in sorted(leaving, reverse=True):
+            reduce(
+                or_, (Folder.branch(folder.tree_path) for folder in leaving[cut])
+            ).update(
+                tree_path=Concat(
+                    Value(parent.tree_path if parent else ""),
+                    Substr("tree_path", cut + 1),
+                    output_field=models.TextField(),
+                )
+            )
+
+        counters.recount(Folder.objects.filter(id__in=recounted))
+        changes.record(moved, project.user_id)
+
+    return moving, problems
+
+
+def delete_folder_branch(folder, chunk_size=None):
+    """
+    Delete a folder with every folder, document and snippet of its branch,
+    <chunk_size> ids at a time through workspace.purge: Model.delete() would
+    have its collector load the whole branch first. The chunks share one
+    transaction, so a failure deletes nothing, and the parent left is
+    recounted once they are through.
+    """
+    owner = folder.project.user_id
+
+    with transaction.atomic():
+        purge_folders(
+            folder.subtree(),
+            chunk_size or settings.FOLDER_DELETE_CHUNK_SIZE,
+            owner=owner,
+        )
+        counters.recount(Folder.objects.filter(id=folder.parent_id))
+
+        if folder.parent_id:
+            changes.record([(Folder, folder.parent_id)], owner)
+
+
+def read_contents_cursor(request, segments):
+    """
+    The (segment, key, id) position a cursor-paged listing resumes from, None
+    for its first page.
+    """
+    cursor = request.query_params.get("cursor")
+
+    if not cursor:
+        return None
+
+    try:
+        segment, key, entry_id = json.loads(base64.urlsafe_b64decode(cursor))
+        UUID(entry_id)
+    except (TypeError, ValueError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+    if not isinstance(segment, int) or not 0 <= segment < segments:
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+    return segment, key, entry_id
+
+
+def encode_contents_cursor(position):
+    payload = json.dumps(list(position))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def uses_contents_cursor(request):
+    """
+    Whether a contents listing is paged by cursor, asked by ?pagination=cursor
+    or implied by a ?cursor= from a previous page.
+    """
+    value = request.query_params.get("pagination")
+
+    if value not in (None, "cursor", "page"):
+        raise ValidationError({"pagination": "Must be cursor or page."})
+
+    return value == "cursor" or "cursor" in request.query_params
+
+
+def cursor_paginated_response(view, entries, represent):
+    """
+    One page of a chained listing seeked from ?cursor=. The total is only
+    counted under ?count=true, since it costs a COUNT(*) per segment.
+    """
+    request = view.request
+    size = read_limit(request, view.paginator.page_size, CONTENTS_PAGE_MAX)
+    position = read_contents_cursor(request, len(entries.querysets))
+    page, has_more = entries.page_after(position, size)
+
+    next_url = None
+    if has_more:
+        cursor = encode_contents_cursor(entries.position_of(*page[-1]))
+        next_url = replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+
+    data = {"next": next_url, "results": [represent(entry) for _, entry in page]}
+
+    if request.query_params.get("count") == "true":
+        data = {"count": entries.count(), **data}
+
+    return Response(data)
+
+
+def rendered_sources(serializer_class):
+    """
+    Model fields a serializer reads: the sources of its fields, and the text
+    a search hit cuts its excerpt from.
+    """
+    serializer = serializer_class(context={})
+    sources = {
+        field.source.split(".")[0]
+        for field in serializer.fields.values()
+        if not field.write_only
+    }
+
+    return sources | set(getattr(serializer_class, "excerpt_sources", ()))
+
+
+def defer_unrendered(queryset, serializer_class):
+    """
+    Defer the text columns a serializer never renders, so a listing of long
+    documents does not load their bodies to throw them away.
+    """
+    sources = rendered_sources(serializer_class)
+    unrendered = [
+        field.name
+        for field in queryset.model._meta.concrete_fields
+        if isinstance(field, models.TextField) and field.name not in sources
+    ]
+
+    return queryset.defer(*unrendered)
 
 
 def paginated_contents(
@@ -346,12 +766,15 @@ def paginated_contents(
 ):
     """
     Serialize direct subfolders then direct items as one paginated stream;
-    every entry carries a 'type' telling the two apart.
+    every entry carries a 'type' telling the two apart. Pages are numbered,
+    or seeked from a cursor under ?pagination=cursor.
     """
     context = view.get_serializer_context()
     entries = ChainedQuerysets(
-        folders_with_counts(folders).select_related("project", "parent"),
-        items.select_related("project", "folder"),
+        folders.select_related("project", "parent").order_by("name", "id"),
+        defer_unrendered(items, item_serializer)
+        .select_related("project", "folder")
+        .order_by("-created_at", "-id"),
     )
 
     def represent(entry):
@@ -363,6 +786,9 @@ def paginated_contents(
             **item_serializer(entry, context=context).data,
         }
 
+    if uses_contents_cursor(view.request):
+        return cursor_paginated_response(view, entries, represent)
+
     page = view.paginate_queryset(entries)
 
     if page is not None:
@@ -371,11 +797,39 @@ def paginated_contents(
     return Response([represent(entry) for entry in entries[0:None]])
 
 
-class ProjectScopedViewSet(viewsets.ModelViewSet):
+def move_items_response(view, request, model, resource_type):
+    """
+    Batch move of the documents or snippets of the project of <view>, to the
+    destination read once from the request.
+    """
+    source = view.get_project()
+
+    if source is None:
+        raise PermissionDenied("Project not found or access denied.")
+
+    ids = read_move_ids(request)
+    project = resolve_move_project(request, source)
+    folder = resolve_move_folder(request, "folder", project, resource_type)
+    problems = apply_item_move(model, source, ids, project, folder)
+
+    logger.info(
+        f"{len(ids) - len(problems)} {resource_type} moved from project {source.id} "
+        f"to project {project.id} by user {request.user.username}"
+    )
+
+    return Response(
+        {"moved": len(ids) - len(problems), "results": move_results(ids, problems)}
+    )
+
+
+class ProjectScopedViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Shared plumbing for resources nested under a project."""
 
     permission_classes = [IsAuthenticated]
 
+    # The GET actions served from the read database, see devnote.routers
+    read_replica_actions = {"list", "retrieve"}
+
     def get_project(self):
         project_pk = self.kwargs.get("project_pk")
 
@@ -429,6 +883,10 @@ class FolderViewSet(ProjectScopedViewSet):
     """
 
     serializer_class = FolderSerializer
+    query_budget = {"list": 4, "retrieve": 3, "contents": 6, "bulk_move": 21}
+    read_replica_actions = {"list", "retrieve", "contents"}
+    etag_aggregates = {counter: Sum(counter) for counter in Folder.COUNTERS}
+    etag_depends_on = (Folder, Document, Snippet)
 
     def get_queryset(self):
         """Returns only the folders of the logged-in user"""
@@ -443,7 +901,7 @@ class FolderViewSet(ProjectScopedViewSet):
 
         queryset = self.filter_by_relation(queryset, "parent", "parent")
 
-        return folders_with_counts(queryset).select_related("project", "parent")
+        return queryset.select_related("project", "parent").order_by("name", "id")
 
     def perform_create(self, serializer):
         """Assign project from URL and verify ownership"""
@@ -486,13 +944,14 @@ class FolderViewSet(ProjectScopedViewSet):
                 status=status.HTTP_409_CONFLICT,
             )
 
+        delete_folder_branch(folder)
         logger.info(
             f"Folder '{folder.name}' (ID: {folder.id}) deleted with "
             f"{counts['folders']} subfolder(s) and {held_count} {held}(s) "
             f"by user {request.user.username}"
         )
 
-        return super().destroy(request, *args, **kwargs)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=["get"])
     def contents(self, request, *args, **kwargs):
@@ -535,8 +994,20 @@ class FolderViewSet(ProjectScopedViewSet):
         guard_folder_name(folder, project, parent)
 
         counts = folder.cascade_counts()
+        leaves_project = project.id != folder.project_id
         folder.move_to(project, parent)
 
+        if leaves_project:
+            # The branch changed project by bulk update, unlogged
+            branch = folder.subtree()
+
+            for rows in (
+                branch,
+                Document.objects.filter(folder__in=branch),
+                Snippet.objects.filter(folder__in=branch),
+            ):
+                changes.record_rows(rows, project.user_id)
+
         logger.info(
             f"Folder '{folder.name}' (ID: {folder.id}) moved to project "
             f"{project.id} with {counts['folders']} subfolder(s), "
@@ -546,6 +1017,34 @@ class FolderViewSet(ProjectScopedViewSet):
 
         return Response(self.get_serializer(folder).data)
 
+    @action(detail=False, methods=["post"], url_path="bulk-move")
+    def bulk_move(self, request, *args, **kwargs):
+        """
+        Move many folders of a project, with their branches, to one parent or
+        the root of one project:
+
+            {"ids": [<uuid>], "project": <uuid>, "parent": <uuid>}
+
+        The destination is resolved once and every folder checked against it;
+        the ones which cannot go there are skipped, the others moved together.
+        """
+        source = self.get_project()
+
+        if source is None:
+            raise PermissionDenied("Project not found or access denied.")
+
+        ids = read_move_ids(request)
+        project = resolve_move_project(request, source)
+        parent = resolve_move_folder(request, "parent", project, None)
+        moved, problems = apply_folder_move(source, ids, project, parent)
+
+        logger.info(
+            f"{len(moved)} folder(s) moved from project {source.id} to project "
+            f"{project.id} by user {request.user.username}"
+        )
+
+        return Response({"moved": len(moved), "results": move_results(ids, problems)})
+
 
 def copy_title(title, taken, max_length):
     """
@@ -565,7 +1064,21 @@ def copy_title(title, taken, max_length):
 
 
 class DocumentViewSet(ProjectScopedViewSet):
+    """
+    The listing returns gallery cards, carrying the stored preview; the full
+    Markdown is only loaded by the routes acting on a single document.
+    """
+
     serializer_class = DocumentSerializer
+    query_budget = {"list": 4, "retrieve": 3, "bulk_move": 12}
+    # The folders named by folder_path
+    etag_depends_on = (Folder,)
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return DocumentCardSerializer
+
+        return super().get_serializer_class()
 
     def get_queryset(self):
         """Returns only the documents of the logged-in user"""
@@ -576,6 +1089,7 @@ class DocumentViewSet(ProjectScopedViewSet):
             queryset = queryset.filter(project__id=project_pk)
 
         queryset = self.filter_by_relation(queryset, "folder", "folder")
+        queryset = defer_unrendered(queryset, self.get_serializer_class())
 
         return queryset.select_related("project", "folder")
 
@@ -632,6 +1146,15 @@ class DocumentViewSet(ProjectScopedViewSet):
 
         return Response(self.get_serializer(document).data)
 
+    @action(detail=False, methods=["post"], url_path="bulk-move")
+    def bulk_move(self, request, *args, **kwargs):
+        """
+        Move many documents of a project to one folder, or the root, of one
+        project: {"ids": [<uuid>], "project": <uuid>, "folder": <uuid>}. Ids
+        not found in the project are skipped, the others moved together.
+        """
+        return move_items_response(self, request, Document, "documents")
+
 
 class SnippetViewSet(ProjectScopedViewSet):
     """
@@ -642,6 +1165,9 @@ class SnippetViewSet(ProjectScopedViewSet):
     """
 
     serializer_class = SnippetSerializer
+    query_budget = {"list": 4, "retrieve": 3, "pinned": 3, "bulk_move": 12}
+    read_replica_actions = {"list", "retrieve", "pinned"}
+    etag_depends_on = (Folder,)
 
     def get_queryset(self):
         """Returns only the snippet of the logged_in user"""
@@ -652,6 +1178,7 @@ class SnippetViewSet(ProjectScopedViewSet):
             queryset = queryset.filter(project__id=project_pk)
 
         queryset = self.filter_by_relation(queryset, "folder", "folder")
+        queryset = defer_unrendered(queryset, self.get_serializer_class())
 
         return queryset.select_related("project", "folder")
 
@@ -730,6 +1257,15 @@ class SnippetViewSet(ProjectScopedViewSet):
 
         return Response(self.get_serializer(snippet).data)
 
+    @action(detail=False, methods=["post"], url_path="bulk-move")
+    def bulk_move(self, request, *args, **kwargs):
+        """
+        Move many snippets of a project to one folder, or the root, of one
+        project: {"ids": [<uuid>], "project": <uuid>, "folder": <uuid>}. Ids
+        not found in the project are skipped, the others moved together.
+        """
+        return move_items_response(self, request, Snippet, "snippets")
+
 
 class TodoListViewSet(ProjectScopedViewSet):
     """
@@ -739,6 +1275,9 @@ class TodoListViewSet(ProjectScopedViewSet):
     """
 
     serializer_class = TodoListSerializer
+    query_budget = {"list": 4}
+    etag_aggregates = {"todos": Sum("todo_count")}
+    etag_depends_on = (TODO,)
 
     def get_queryset(self):
         """Returns only the todo lists of the logged-in user"""
@@ -748,11 +1287,7 @@ class TodoListViewSet(ProjectScopedViewSet):
         if project_pk:
             queryset = queryset.filter(project__id=project_pk)
 
-        return (
-            queryset.annotate(todo_count=Count("todos", distinct=True))
-            .select_related("project")
-            .order_by("name")
-        )
+        return queryset.select_related("project").order_by("name")
 
     def perform_create(self, serializer):
         """Assign project from URL and verify ownership"""
@@ -791,6 +1326,10 @@ class TODOViewSet(ProjectScopedViewSet):
     """
 
     serializer_class = TODOSerializer
+    query_budget = {"list": 4, "retrieve": 3, "pinned": 3, "bulk": 21}
+    read_replica_actions = {"list", "retrieve", "pinned"}
+    # Deleting a list unclassifies its todos without stamping them
+    etag_aggregates = {"listed": Count("list")}
 
     def get_queryset(self):
         """Return only the Todo of the logged user"""
@@ -863,18 +1402,94 @@ class TODOViewSet(ProjectScopedViewSet):
 
         return Response(self.get_serializer(todo).data)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create, update and delete TODOs of a project in one request, for
+        kanban drags and "mark all done":
+
+            {"create": [<todo>], "update": [{"id": <uuid>, <field>: <value>}],
+             "delete": [<uuid>]}
+
+        Updates may change status, priority, list, is_pinned and due_date. The
+        batch is validated as a whole, then written in a single transaction.
+        """
+        context = self.get_serializer_context()
+        project = context.get("project")
+
+        if project is None:
+            raise PermissionDenied("Project not found or access denied.")
+
+        serializer = TodoBatchSerializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        created, updated, deleted = apply_todo_batch(project, serializer.validated_data)
+
+        logger.info(
+            f"TODO batch in project {project.id} by user {request.user.username}: "
+            f"{len(created)} created, {len(updated)} updated, {len(deleted)} deleted"
+        )
+
+        return Response(
+            {
+                "created": TODOSerializer(created, many=True, context=context).data,
+                "updated": TODOSerializer(updated, many=True, context=context).data,
+                "deleted": deleted,
+            }
+        )
+
+
+def search_projects(user, project):
+    projects = Project.objects.filter(user=user)
+    return projects if project is None else projects.filter(id=project.id)
+
+
+def search_documents(user, project):
+    documents = Document.objects.filter(project__user=user).select_related("folder")
+    return documents if project is None else documents.filter(project=project)
+
+
+def search_snippets(user, project):
+    snippets = Snippet.objects.filter(project__user=user).select_related("folder")
+    return snippets if project is None else snippets.filter(project=project)
+
+
+def search_todos(user, project):
+    todos = TODO.objects.filter(project__user=user)
+    return todos if project is None else todos.filter(project=project)
+
 
 @method_decorator(ratelimit(key="user", rate="30/m", method="GET"), name="get")
 class SearchView(APIView):
     """
     Global search across Documents, Snippets and TODOs
     GET /api/search/?q=<query>&type=<documents|snippets|todos>
+
+    Every term of the query must start a word of the matched object; the
+    words are looked up in the search index, never in the stored text
+
+    Each type returns at most ?limit= compact hits, best score first, and
+    next[<type>] holds a cursor for the following ones, to send back with
+    ?type=<type>&cursor=<cursor>
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
+    # One query per type, the ?project= lookup, and the FTS5 probe, run once
+    # per database connection
+    query_budget = 6
+
+    # Long scans stay off the primary, out of the way of writers
+    read_replica_actions = {"get"}
+
     MAX_QUERY_LENGTH = 200
 
+    SCOPES = {
+        "projects": (search_projects, ProjectHitSerializer),
+        "documents": (search_documents, DocumentHitSerializer),
+        "snippets": (search_snippets, SnippetHitSerializer),
+        "todos": (search_todos, TodoHitSerializer),
+    }
+
     def get(self, request):
         if getattr(request, "limited", False):
             return Response(
@@ -923,71 +1538,164 @@ class SearchView(APIView):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
+        cursor = request.query_params.get("cursor")
+        position = None
+
+        if cursor:
+            try:
+                if not search_type:
+                    raise ValueError("A cursor belongs to one type of result")
+
+                position = search.decode_cursor(search_type, cursor)
+            except ValueError:
+                return Response(
+                    {
+                        "error": 'Invalid cursor for this "type"',
+                        "code": "INVALID_CURSOR",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        limit = read_limit(request, SEARCH_PAGE_SIZE, SEARCH_PAGE_MAX)
+        context = {"search_terms": search.query_terms(query)}
         results = {}
+        next_cursors = {}
+
+        for kind in [search_type] if search_type else VALID_TYPES:
+            scope, serializer_class = self.SCOPES[kind]
+            hits = search.filter_matches(
+                defer_unrendered(scope(user, project), serializer_class),
+                user,
+                kind,
+                query,
+            )
+
+            if position is not None:
+                hits = search.after(hits, position)
+
+            page = list(hits[: limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit]
 
-        # Search in Projects
-        if not search_type or search_type == "projects":
-            projects = Project.objects.filter(user=user).filter(
-                Q(title__icontains=query) | Q(description__icontains=query)
+            results[kind] = serializer_class(page, many=True, context=context).data
+            next_cursors[kind] = (
+                search.encode_cursor(kind, page[-1]) if has_more else None
             )
 
-            if project is not None:
-                projects = projects.filter(id=project.id)
+        results["next"] = next_cursors
 
-            from .serializers import ProjectSerializer as PS
+        return Response(results, status=status.HTTP_200_OK)
 
-            results["projects"] = PS(projects, many=True).data
 
-        # Search in Documents
-        if not search_type or search_type == "documents":
-            documents = (
-                Document.objects.filter(project__user=user)
-                .filter(Q(title__icontains=query) | Q(content__icontains=query))
-                .select_related("project", "folder")
-            )
+def read_sync_cursor(request):
+    """The id of the last change a client holds, 0 for its first sync."""
+    cursor = request.query_params.get("since")
 
-            if project is not None:
-                documents = documents.filter(project=project)
-            results["documents"] = DocumentSerializer(
-                documents, many=True, context={"include_folder_path": True}
-            ).data
+    if not cursor:
+        return 0
 
-        # Search in Snippets
-        if not search_type or search_type == "snippets":
-            snippets = (
-                Snippet.objects.filter(project__user=user)
-                .filter(
-                    Q(title__icontains=query)
-                    | Q(content__icontains=query)
-                    | Q(language__icontains=query)
-                    | Q(description__icontains=query)
-                )
-                .select_related("project", "folder")
-            )
+    try:
+        (change_id,) = json.loads(base64.urlsafe_b64decode(cursor))
+    except (TypeError, ValueError):
+        raise ValidationError({"since": "Invalid cursor."})
 
-            if project is not None:
-                snippets = snippets.filter(project=project)
+    if not isinstance(change_id, int) or change_id < 0:
+        raise ValidationError({"since": "Invalid cursor."})
 
-            results["snippets"] = SnippetSerializer(
-                snippets, many=True, context={"include_folder_path": True}
-            ).data
+    return change_id
 
-        # Search in TODOs
-        if not search_type or search_type == "todos":
-            todos = (
-                TODO.objects.filter(project__user=user)
-                .filter(
-                    Q(title__icontains=query)
-                    | Q(description__icontains=query)
-                    | Q(status__icontains=query)
-                    | Q(priority__icontains=query)
+
+def encode_sync_cursor(change_id):
+    return base64.urlsafe_b64encode(json.dumps([change_id]).encode()).decode()
+
+
+def synced_objects(model, user):
+    if model is Project:
+        return Project.objects.filter(user=user)
+
+    return model.objects.filter(project__user=user).select_related("project")
+
+
+class SyncView(APIView):
+    """
+    Incremental sync of the workspace
+    GET /api/sync/?since=<cursor>
+
+    changes holds every project, folder, document, snippet, TODO list and TODO
+    created or changed since the cursor, as it is now, and deleted the ids of
+    those which went. A deleted project stands for everything it held, which
+    is not listed on its own
+
+    Without a cursor everything comes. The cursor answered goes in the next
+    sync, right away while more is true
+
+    Documents and snippets name their folder by id, without the folder_path
+    of the listings: a rename or move of a folder logs the folder alone, so
+    the path a client holds is rebuilt from the folders it synced
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    # The page of the change log, and one query per kind of object changed
+    query_budget = 7
+
+    read_replica_actions = {"get"}
+
+    SCOPES = {
+        "projects": (Project, ProjectSerializer),
+        "folders": (Folder, FolderSerializer),
+        "documents": (Document, DocumentSerializer),
+        "snippets": (Snippet, SnippetSerializer),
+        "todo_lists": (TodoList, TodoListSerializer),
+        "todos": (TODO, TODOSerializer),
+    }
+
+    def get(self, request):
+        since = read_sync_cursor(request)
+        page = list(
+            Change.objects.filter(user=request.user, id__gt=since).order_by("id")[
+                : SYNC_PAGE_SIZE + 1
+            ]
+        )
+        has_more = len(page) > SYNC_PAGE_SIZE
+        page = page[:SYNC_PAGE_SIZE]
+
+        # The log keeps one entry per object, but a write racing another may
+        # leave two for a moment: the latest wins
+        latest = {entry.object_id: entry for entry in page}
+        changed = defaultdict(list)
+        deleted = {kind: [] for kind in self.SCOPES}
+
+        for entry in latest.values():
+            (deleted if entry.deleted else changed)[entry.kind].append(entry.object_id)
+
+        results = {}
+
+        for kind, (model, serializer_class) in self.SCOPES.items():
+            objects = []
+
+            if changed[kind]:
+                objects = list(
+                    synced_objects(model, request.user)
+                    .filter(id__in=changed[kind])
+                    .order_by("id")
                 )
-                .select_related("project")
-            )
 
-            if project is not None:
-                todos = todos.filter(project=project)
+            # Deleted since their entry was read
+            found = {obj.id for obj in objects}
+            deleted[kind] += [pk for pk in changed[kind] if pk not in found]
 
-            results["todos"] = TODOSerializer(todos, many=True).data
+            results[kind] = serializer_class(
+                objects,
+                many=True,
+                context={"request": request, "include_folder_path": False},
+            ).data
 
-        return Response(results, status=status.HTTP_200_OK)
+        return Response(
+            {
+                "cursor": encode_sync_cursor(page[-1].id if page else since),
+                "more": has_more,
+                "changes": results,
+                "deleted": deleted,
+            }
+        )
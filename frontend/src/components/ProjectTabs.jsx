@@ -5,7 +5,7 @@ import SearchField from "./SearchField.jsx";
 import SnippetsPanel from "./SnippetsPanel.jsx";
 import TodosPanel from "./TodosPanel.jsx";
 import { useLocalStorageState } from "../hooks/useLocalStorageState.js";
-import { search } from "../services/searchService.js";
+import { searchAll } from "../services/searchService.js";
 
 const TABS = [
   { key: "documents", label: "Documents" },
@@ -90,8 +90,8 @@ export default function ProjectTabs({
     setSearchStatus("searching");
 
     try {
-      const data = await search(term, currentTab, projectId);
-      setSectionSearch({ term, results: data[currentTab] ?? [] });
+      const results = await searchAll(term, currentTab, projectId);
+      setSectionSearch({ term, results });
       setSearchStatus("done");
     } catch (searchError) {
       console.error("Section search error:", searchError);
@@ -57,10 +57,7 @@ export default function SearchResults({
               {items.map((item) => {
                 const projectId =
                   key === "projects" ? item.id : item.project_id;
-                const meta =
-                  key === "projects"
-                    ? item.description || ""
-                    : item.content || item.description || "";
+                const meta = item.excerpt || "";
 
                 return (
                   <div
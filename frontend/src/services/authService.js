@@ -79,3 +79,9 @@ export const deleteAccount = async (currentPassword) => {
   });
   return response.data;
 };
+
+// Where a deletion answered with 202 stands: pending, running, done or failed
+export const getAccountDeletion = async (deletionId) => {
+  const response = await api.get(`/auth/account/delete/${deletionId}/`);
+  return response.data;
+};
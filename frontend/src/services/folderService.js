@@ -63,9 +63,11 @@ export const getLevelContents = async (
   }
 
   const response = folderId
-    ? await api.get(`/folders/${folderId}/contents/`)
+    ? await api.get(`/folders/${folderId}/contents/`, {
+        params: { pagination: "cursor" },
+      })
     : await api.get(`/projects/${projectId}/contents/`, {
-        params: { resource_type: resourceType },
+        params: { resource_type: resourceType, pagination: "cursor" },
       });
   return response.data;
 };
@@ -1,5 +1,8 @@
 import api from "./api.js";
 
+// Largest page of hits the API hands out per type
+const SEARCH_PAGE_MAX = 50;
+
 export const search = async (query, type = null, projectId = null) => {
   const params = { q: query };
   if (type) params.type = type;
@@ -8,3 +11,42 @@ export const search = async (query, type = null, projectId = null) => {
   const response = await api.get("/search/", { params });
   return response.data;
 };
+
+// Pages the section search follows at most: search is rate limited to 30
+// requests a minute, so a huge result set must not spend them all
+const SECTION_SEARCH_PAGES_MAX = 10;
+
+// Refusals of the search rate limit, a 429 or the 403 of the limiter
+const isThrottled = (error) => [403, 429].includes(error.response?.status);
+
+/* The hits of one type, following the cursors of next[type] page after page,
+   for the section search which filters a whole panel at once. It stops after
+   SECTION_SEARCH_PAGES_MAX pages, and keeps the hits gathered so far when the
+   rate limit refuses a later page. */
+export const searchAll = async (query, type, projectId = null) => {
+  const params = { q: query, type, limit: SEARCH_PAGE_MAX };
+  if (projectId) params.project = projectId;
+
+  const hits = [];
+  let cursor = null;
+
+  for (let page = 0; page < SECTION_SEARCH_PAGES_MAX; page += 1) {
+    let response;
+
+    try {
+      response = await api.get("/search/", {
+        params: cursor ? { ...params, cursor } : params,
+      });
+    } catch (error) {
+      if (page > 0 && isThrottled(error)) break;
+      throw error;
+    }
+
+    hits.push(...(response.data[type] ?? []));
+    cursor = response.data.next?.[type] ?? null;
+
+    if (!cursor) break;
+  }
+
+  return hits;
+};
@@ -0,0 +1,9 @@
+import api from "./api.js";
+
+export const getChanges = async (since = null) => {
+  const params = {};
+  if (since) params.since = since;
+
+  const response = await api.get("/sync/", { params });
+  return response.data;
+};